@@ -0,0 +1,88 @@
+import pathlib
+import random
+import time
+
+import pygame
+
+from GameFiles import Map, MapData, PotionExploded, SpatialHash
+
+ENEMY_COUNTS = (60, 300, 1000)
+"""The demo map has about 60 stalkers, custom maps have hundreds."""
+
+POTIONS = 20
+"""How many exploded potions check for enemies each frame."""
+
+FRAMES = 100
+
+ENEMY_SIZE = 32
+
+
+class BenchmarkEnemy:
+    def __init__(self, x: int, y: int):
+        self.rect: pygame.Rect = pygame.Rect(x, y, ENEMY_SIZE, ENEMY_SIZE)
+
+
+def time_frames(map_: Map, enemy_count: int, use_index: bool) -> tuple[float, float, int]:
+    """
+    Moves the enemies around randomly and checks every potion against them.
+    Returns the average time per frame spent keeping the index up to date and checking for collisions,
+    in milliseconds, and the average pair checks per frame.
+    """
+
+    random.seed(0)
+
+    enemies = [BenchmarkEnemy(random.randint(0, map_.x_max), random.randint(0, map_.y_max))
+               for _ in range(enemy_count)]
+    potion_rects = [
+        pygame.Rect(random.randint(0, map_.x_max), random.randint(0, map_.y_max),
+                    PotionExploded.LIGHT_RADIUS_SQRT_2, PotionExploded.LIGHT_RADIUS_SQRT_2)
+        for _ in range(POTIONS)
+    ]
+
+    enemy_index = SpatialHash(Map.TILE_SIZE)
+    for enemy in enemies:
+        enemy_index.insert_rect(enemy, enemy.rect)
+
+    pair_checks = 0
+    collisions = 0
+
+    index_time = 0
+    check_time = 0
+
+    for _ in range(FRAMES):
+        for enemy in enemies:
+            enemy.rect.move_ip(random.randint(-3, 3), random.randint(-3, 3))
+
+        start = time.perf_counter()
+        if use_index:
+            for enemy in enemies:
+                enemy_index.insert_rect(enemy, enemy.rect)
+        index_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for potion_rect in potion_rects:
+            candidates = enemy_index.query_rect(potion_rect) if use_index else enemies
+
+            for enemy in candidates:
+                pair_checks += 1
+                if potion_rect.colliderect(enemy.rect):
+                    collisions += 1
+        check_time += time.perf_counter() - start
+
+    return index_time / FRAMES * 1000, check_time / FRAMES * 1000, pair_checks // FRAMES
+
+
+def main():
+    map_ = Map(MapData.from_file(pathlib.Path("GameFiles/Maps/demo.mapdata")))
+
+    for enemy_count in ENEMY_COUNTS:
+        for use_index in (False, True):
+            index_time, check_time, pair_checks = time_frames(map_, enemy_count, use_index)
+
+            print(f"{enemy_count:>5} enemies, {'spatial hash' if use_index else 'every enemy ':<12} - "
+                  f"index {index_time:6.3f} ms, checks {check_time:6.3f} ms, "
+                  f"{pair_checks:>6} pair checks per frame")
+
+
+if __name__ == "__main__":
+    main()
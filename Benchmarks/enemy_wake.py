@@ -0,0 +1,75 @@
+import pathlib
+import random
+import time
+
+import pygame
+
+from GameFiles import Camera, EnemyHandler, Map, MapData, ParticleHandler, Player, PotionHandler
+
+ENEMY_COUNTS = (60, 300, 1000)
+"""The demo map has about 60 stalkers, custom maps have hundreds."""
+
+FRAMES = 100
+
+WINDOW_SIZE = 1280, 720
+
+
+def time_frames(map_data: MapData, map_: Map, enemy_count: int, update_every_enemy: bool) -> float:
+    """
+    Places stalkers in random rooms, away from the player, and updates them with the player standing still.
+    Returns the average time per frame in milliseconds.
+    """
+
+    random.seed(0)
+
+    player_room_id = 0
+    enemy_rooms = [room_id for room_id, room in enumerate(map_.rooms) if room and room_id != player_room_id]
+
+    map_data.enemies = []
+    for _ in range(enemy_count):
+        room_id = random.choice(enemy_rooms)
+        map_data.enemies.append(("stalker", random.choice(map_.rooms[room_id]), room_id))
+
+    enemy_handler = EnemyHandler()
+    enemy_handler.setup_enemies_from(map_data, map_)
+
+    player = Player()
+    player.rect.center = (map_.rooms[player_room_id][0][0] * Map.TILE_SIZE + Map.TILE_SIZE_2,
+                          map_.rooms[player_room_id][0][1] * Map.TILE_SIZE + Map.TILE_SIZE_2)
+
+    camera = Camera(pygame.Surface(WINDOW_SIZE))
+    camera.center_on(player.rect)
+
+    particle_handler = ParticleHandler()
+    potion_handler = PotionHandler()
+
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        if update_every_enemy:
+            # Like before the wake index, every dormant enemy checks for the player itself
+            for enemy in enemy_handler.enemies:
+                enemy.update(player, map_, particle_handler, potion_handler)
+                enemy.move(map_)
+                enemy.draw(camera)
+        else:
+            enemy_handler.update_move_and_draw_enemies(player, map_, particle_handler, potion_handler, camera)
+
+    assert not any(enemy.updating for enemy in enemy_handler.enemies), "An enemy woke up"
+
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+
+def main():
+    map_data = MapData.from_file(pathlib.Path("GameFiles/Maps/demo.mapdata"))
+    map_ = Map(map_data)
+
+    for enemy_count in ENEMY_COUNTS:
+        for update_every_enemy in (True, False):
+            frame_time = time_frames(map_data, map_, enemy_count, update_every_enemy)
+
+            print(f"{enemy_count:>5} dormant enemies, {'every enemy' if update_every_enemy else 'wake index':<11} - "
+                  f"{frame_time:6.3f} ms per frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import pathlib
+import random
+import time
+from collections import deque
+
+from GameFiles import Map, MapData, MapGenerator
+from GameFiles.FlowField import FlowField
+
+MAP_SIZES = (64, 256)
+"""The width and height of the generated maps, in tiles, on top of the demo map."""
+
+TILES_PER_ROOM = 100
+"""The rooms placed in the generated maps are their tiles divided by this."""
+
+ENEMY_COUNT = 300
+"""How many enemies look up their next tile each frame."""
+
+CHECK_TARGETS = 5
+"""How many player tiles the flow field is checked for on each map."""
+
+FRAMES_PER_TILE = 128 // 3
+"""How many frames the player takes to walk across a tile, the tile size over the player speed."""
+
+WALK_FRAMES = 60 * 30
+"""How long the player walks around for when checking the flow field keeps up."""
+
+
+def build(flow_field: FlowField, target: tuple[int, int]) -> list[float]:
+    """
+    Builds the field for the target, returning the time of each update in milliseconds.
+    """
+
+    update_times = []
+
+    flow_field.set_target(*target)
+    while flow_field.is_building():
+        start = time.perf_counter()
+        flow_field.update()
+        update_times.append((time.perf_counter() - start) * 1000)
+
+    return update_times
+
+
+def distances_to(map_: Map, target: tuple[int, int]) -> dict[tuple[int, int], int]:
+    """
+    The steps from every empty tile that can reach the target, found by a plain breadth first search.
+    """
+
+    distances = {target: 0}
+    frontier = deque((target,))
+
+    while frontier:
+        tile_x, tile_y = frontier.popleft()
+
+        for x_step in (-1, 0, 1):
+            for y_step in (-1, 0, 1):
+                neighbour = tile_x + x_step, tile_y + y_step
+
+                if not (0 <= neighbour[0] < map_.width and 0 <= neighbour[1] < map_.height):
+                    continue
+                if map_.occupancy[neighbour[1] * map_.width + neighbour[0]] or neighbour in distances:
+                    continue
+                if x_step and y_step and (map_.occupancy[tile_y * map_.width + neighbour[0]]
+                                          or map_.occupancy[neighbour[1] * map_.width + tile_x]):
+                    continue
+
+                distances[neighbour] = distances[(tile_x, tile_y)] + 1
+                frontier.append(neighbour)
+
+    return distances
+
+
+def check_flow_field(map_: Map, empty_tiles: list[tuple[int, int]]) -> None:
+    """
+    Raises an AssertionError unless every empty tile steps one tile closer to the target,
+    so following the flow field always takes the shortest way.
+    """
+
+    for target in random.sample(empty_tiles, min(CHECK_TARGETS, len(empty_tiles))):
+        build(map_.flow_field, target)
+        distances = distances_to(map_, target)
+
+        for tile in empty_tiles:
+            next_tile = map_.flow_field.next_tile(*tile)
+
+            if next_tile is None:
+                assert tile == target or tile not in distances, f"{tile} does not reach {target}"
+            else:
+                assert distances[next_tile] == distances[tile] - 1, f"{tile} does not go towards {target}"
+
+
+def check_moving_target(map_: Map, empty_tiles: list[tuple[int, int]]) -> tuple[int, int]:
+    """
+    Walks a player to a neighbouring tile every FRAMES_PER_TILE frames, setting the target and updating each frame.
+    Raises an AssertionError unless fields keep being completed, and each for a tile the player has stood on.
+    Returns how many fields were completed and the most frames the player went without a new field.
+    """
+
+    flow_field = map_.flow_field
+    player_tile = random.choice(empty_tiles)
+    visited_tiles = {player_tile}
+
+    completed_fields = 0
+    frames_without_field = 0
+    most_frames_without_field = 0
+
+    for frame in range(WALK_FRAMES):
+        if frame and frame % FRAMES_PER_TILE == 0:
+            tile_x, tile_y = player_tile
+            neighbours = [(tile_x + x_step, tile_y + y_step) for x_step in (-1, 0, 1) for y_step in (-1, 0, 1)
+                          if (x_step or y_step) and 0 <= tile_x + x_step < map_.width
+                          and 0 <= tile_y + y_step < map_.height
+                          and not map_.occupancy[(tile_y + y_step) * map_.width + tile_x + x_step]]
+            if neighbours:
+                player_tile = random.choice(neighbours)
+                visited_tiles.add(player_tile)
+
+        target = flow_field.target
+        flow_field.set_target(*player_tile)
+        flow_field.update()
+
+        if flow_field.target != target:
+            assert flow_field.target in visited_tiles, f"A field was completed for {flow_field.target}, never walked on"
+            completed_fields += 1
+            frames_without_field = 0
+        else:
+            frames_without_field += 1
+            most_frames_without_field = max(most_frames_without_field, frames_without_field)
+
+    assert completed_fields > 1, f"Only {completed_fields} fields were completed while the player walked"
+
+    return completed_fields, most_frames_without_field
+
+
+def main():
+    random.seed(0)
+
+    maps = [("demo", Map(MapData.from_file(pathlib.Path("GameFiles/Maps/demo.mapdata"))))]
+    map_generator = MapGenerator(seed=0)
+    maps += [(f"{size}x{size}", Map(map_generator.generate(size, size, size * size // TILES_PER_ROOM)))
+             for size in MAP_SIZES]
+
+    for name, map_ in maps:
+        empty_tiles = [(tile_x, tile_y) for tile_y in range(map_.height) for tile_x in range(map_.width)
+                       if not map_.occupancy[tile_y * map_.width + tile_x]]
+
+        check_flow_field(map_, empty_tiles)
+
+        update_times = build(map_.flow_field, random.choice(empty_tiles))
+
+        # Every enemy looks up its next tile, the chasing cost per frame
+        enemy_tiles = [random.choice(empty_tiles) for _ in range(ENEMY_COUNT)]
+        start = time.perf_counter()
+        for enemy_tile in enemy_tiles:
+            map_.flow_field.next_tile(*enemy_tile)
+        lookup_time = (time.perf_counter() - start) * 1000
+
+        completed_fields, most_frames_without_field = check_moving_target(map_, empty_tiles)
+
+        print(f"{name:<8} {len(empty_tiles):>6} empty tiles - built over {len(update_times):>3} frames, "
+              f"slowest frame {max(update_times):6.3f} ms, total {sum(update_times):7.3f} ms, "
+              f"{ENEMY_COUNT} enemies look up their next tile in {lookup_time:6.3f} ms")
+        print(f"{'':<8} a walking player got {completed_fields:>3} complete fields in {WALK_FRAMES} frames, "
+              f"at most {most_frames_without_field:>3} frames apart")
+
+
+if __name__ == "__main__":
+    main()
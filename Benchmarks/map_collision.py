@@ -0,0 +1,157 @@
+import pathlib
+import random
+import time
+from typing import Callable
+
+import pygame
+
+from GameFiles import Camera, Entity, Map, MapData, MapGenerator
+
+QUERIES = 100_000
+
+REPEATS = 5
+"""The queries are timed this many times and the fastest is kept, to reduce noise."""
+
+ENTITY_SIZE = 48
+"""About the size of the player and the enemies."""
+
+CHECK_MAPS = 20
+"""How many random maps the merged tiles are checked on, on top of the demo map."""
+
+CHECK_GENERATED_SEEDS = (0, 1, 2, 3, 4)
+"""The seeds of the generated maps the merged tiles are checked on, their rooms and corridors merge differently."""
+
+CHECK_GENERATED_SIZE = 40
+"""The width and height of the generated maps, in tiles."""
+
+CHECK_GENERATED_ROOMS = 12
+"""How many rooms are placed in each generated map."""
+
+CHECK_WALKS = 200
+"""How many entities walk around each map when checking the merged tiles."""
+
+CHECK_STEPS = 200
+"""How many moves each entity makes when checking the merged tiles."""
+
+
+class UnitTileMap(Map):
+    """
+    Collides against every tile on its own, like before the tiles were merged.
+    """
+
+    def tiles_touching(self, rect: pygame.Rect) -> list[pygame.Rect]:
+        return self._tiles_in_range(rect.left // self.TILE_SIZE, rect.right // self.TILE_SIZE + 1,
+                                    rect.top // self.TILE_SIZE, rect.bottom // self.TILE_SIZE + 1)
+
+
+class WalkingEntity(Entity):
+    def update(self, *args, **kwargs) -> None:
+        pass
+
+    def move(self, *args, **kwargs) -> None:
+        pass
+
+    def draw(self, camera: Camera) -> None:
+        pass
+
+
+def time_queries(name: str, query: Callable[[int, int], object], positions: list[tuple[int, int]]) -> None:
+    """
+    Prints the average time of the query over the positions, in microseconds.
+    """
+
+    time_elapsed = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for x, y in positions:
+            query(x, y)
+        time_elapsed = min(time_elapsed, time.perf_counter() - start)
+
+    print(f"{name:<20} {time_elapsed / len(positions) * 1_000_000:6.3f} us per call")
+
+
+def random_map_data(width: int, height: int) -> MapData:
+    """
+    A map with a solid border and randomly placed walls inside.
+    """
+
+    map_data = MapData(width, height)
+
+    for tile_y in range(height):
+        for tile_x in range(width):
+            on_border = tile_x in (0, width - 1) or tile_y in (0, height - 1)
+            map_data.tiles[tile_y * width + tile_x] = 1 if on_border or random.random() < 0.35 else 0
+
+    return map_data
+
+
+def check_merged_collisions(map_data: MapData) -> tuple[int, int]:
+    """
+    Walks entities around the map, resolving collisions against the merged tiles and against every tile.
+    Raises an AssertionError if they ever end up in different places, also when asserts are turned off.
+    Entities start outside the walls, like every entity in the game.
+    Returns the amount of tiles and the amount of merged tiles of the map.
+    """
+
+    merged_map = Map(map_data)
+    unit_map = UnitTileMap(map_data)
+
+    for _ in range(CHECK_WALKS):
+        size = random.randint(8, 120), random.randint(8, 120)
+
+        position = random.randint(0, merged_map.x_max - size[0]), random.randint(0, merged_map.y_max - size[1])
+        while unit_map.tiles_touching(pygame.Rect(position, size)):
+            position = random.randint(0, merged_map.x_max - size[0]), random.randint(0, merged_map.y_max - size[1])
+
+        merged_entity = WalkingEntity(*position, *size, 1)
+        unit_entity = WalkingEntity(*position, *size, 1)
+
+        for _ in range(CHECK_STEPS):
+            x, y = random.randint(-40, 40), random.randint(-40, 40)
+
+            merged_entity.move_x(merged_map, x)
+            merged_entity.move_y(merged_map, y)
+            unit_entity.move_x(unit_map, x)
+            unit_entity.move_y(unit_map, y)
+
+            if merged_entity.rect != unit_entity.rect:
+                raise AssertionError(f"{merged_entity.rect} != {unit_entity.rect}")
+
+    return len(merged_map.tiles), len(merged_map.merged_tiles)
+
+
+def main():
+    map_ = Map(MapData.from_file(pathlib.Path("GameFiles/Maps/demo.mapdata")))
+
+    random.seed(0)
+    check_maps = [MapData.from_file(pathlib.Path("GameFiles/Maps/demo.mapdata"))]
+    check_maps += [random_map_data(random.randint(3, 30), random.randint(3, 30)) for _ in range(CHECK_MAPS)]
+    check_maps += [MapGenerator(seed).generate(CHECK_GENERATED_SIZE, CHECK_GENERATED_SIZE, CHECK_GENERATED_ROOMS)
+                   for seed in CHECK_GENERATED_SEEDS]
+
+    tile_count = merged_tile_count = 0
+    for map_data in check_maps:
+        map_tile_count, map_merged_tile_count = check_merged_collisions(map_data)
+        tile_count += map_tile_count
+        merged_tile_count += map_merged_tile_count
+
+    print(f"Merged tiles collide the same as unit tiles on {len(check_maps)} maps, "
+          f"{tile_count} tiles merged into {merged_tile_count}")
+
+    random.seed(0)
+    positions = [(random.randint(0, map_.x_max), random.randint(0, map_.y_max)) for _ in range(QUERIES)]
+
+    rect = pygame.Rect(0, 0, ENTITY_SIZE, ENTITY_SIZE)
+
+    def tiles_touching(x: int, y: int) -> list[pygame.Rect]:
+        rect.topleft = x, y
+        return map_.tiles_touching(rect)
+
+    time_queries("tiles_touching", tiles_touching, positions)
+    time_queries("surrounding_tiles", map_.surrounding_tiles, positions)
+    time_queries("position_in_tile", lambda x, y: map_.position_in_tile((x, y)), positions)
+    time_queries("tile_for_position", lambda x, y: map_.tile_for_position((x, y)), positions)
+
+
+if __name__ == "__main__":
+    main()
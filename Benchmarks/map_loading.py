@@ -0,0 +1,98 @@
+import pathlib
+import random
+import sys
+import tempfile
+import time
+
+from GameFiles import MapData
+
+MAP_SIZES = (100, 500, 1000)
+"""The width and height of the maps, in tiles."""
+
+ENEMY_COUNT = 1000
+
+REPEATS = 3
+"""Each load is timed this many times and the fastest is kept, to reduce noise."""
+
+
+def random_map_data(size: int) -> MapData:
+    """
+    A random map with a solid border, a room and enemies in it.
+    """
+
+    map_data = MapData(size, size)
+
+    for tile_y in range(size):
+        for tile_x in range(size):
+            on_border = tile_x in (0, size - 1) or tile_y in (0, size - 1)
+            map_data.tiles[tile_y * size + tile_x] = 1 if on_border or random.random() < 0.3 else 0
+
+    map_data.player_spawn = 1, 1
+    map_data.rooms = [((1, 1), (size - 2, size - 2))]
+    map_data.enemies = [("stalker", (random.randrange(1, size - 1), random.randrange(1, size - 1)), 0)
+                        for _ in range(ENEMY_COUNT)]
+    map_data.upgrades = [("u_direct_damage", (1, 1), (0, 0))]
+    map_data.lights = [((1, 1), (0, 0), 100, 300)]
+
+    return map_data
+
+
+def time_load(load) -> tuple[float, MapData]:
+    """
+    Returns the fastest time of the load in milliseconds, and the map data it loaded.
+    """
+
+    time_elapsed = float("inf")
+    map_data = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        map_data = load()
+        time_elapsed = min(time_elapsed, time.perf_counter() - start)
+
+    return time_elapsed * 1000, map_data
+
+
+def same_map_data(map_data: MapData, other: MapData) -> bool:
+    return ((map_data.width, map_data.height, map_data.tiles, map_data.player_spawn,
+             map_data.rooms, map_data.enemies, map_data.upgrades, map_data.lights)
+            == (other.width, other.height, other.tiles, other.player_spawn,
+                other.rooms, other.enemies, other.upgrades, other.lights))
+
+
+def main():
+    random.seed(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in MAP_SIZES:
+            path = pathlib.Path(directory, f"{size}.mapdata")
+            map_data = random_map_data(size)
+
+            start = time.perf_counter()
+            map_data.to_file(path)
+            write_time = (time.perf_counter() - start) * 1000
+
+            text_time, text_map_data = time_load(lambda: MapData._from_text_file(path))  # NOQA: the uncached parse
+
+            start = time.perf_counter()
+            compiled_map_data = MapData.from_file(path)
+            compile_time = (time.perf_counter() - start) * 1000
+
+            cached_time, cached_map_data = time_load(lambda: MapData.from_file(path))
+
+            assert same_map_data(map_data, text_map_data), "The written map data reads back differently"
+            assert same_map_data(text_map_data, compiled_map_data), "The compiled map data differs"
+            assert same_map_data(text_map_data, cached_map_data), "The cached map data differs"
+
+            print(f"{size:>4}x{size:<4} - write {write_time:8.3f} ms, text {text_time:8.3f} ms, "
+                  f"first load {compile_time:8.3f} ms, cached {cached_time:8.3f} ms, "
+                  f"{sys.getsizeof(cached_map_data.tiles) / (size * size):5.3f} bytes per tile")
+
+        # Changing the source must not load the stale cache
+        path = pathlib.Path(directory, f"{MAP_SIZES[0]}.mapdata")
+        random_map_data(MAP_SIZES[0]).to_file(path)
+        assert same_map_data(MapData.from_file(path), MapData._from_text_file(path)), "A stale cache was loaded"  # NOQA
+        print("Changing a .mapdata file compiles it again")
+
+
+if __name__ == "__main__":
+    main()
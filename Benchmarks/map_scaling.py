@@ -0,0 +1,95 @@
+import pathlib
+import time
+
+import pygame
+
+from GameFiles import (Camera, EnemyHandler, Map, MapGenerator, ParticleHandler, Player, PotionExploded, PotionHandler,
+                       Shadows, ShrinkingLightSource)
+
+MAP_SIZES = (32, 64, 128, 256)
+"""The width and height of the generated maps, in tiles."""
+
+TILES_PER_ROOM = 100
+"""The rooms placed are the tiles of the map divided by this."""
+
+ENEMY_DENSITY = 0.05
+
+FRAMES = 30
+
+LIGHT_SOURCES = 50
+"""How many exploded potion lights burn in the generated rooms while timing the shadows."""
+
+WINDOW_SIZE = 1280, 720
+
+
+def time_ms(function, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = function(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+    map_generator = MapGenerator(seed=0)
+
+    particle_handler = ParticleHandler()
+    particle_handler.add_particle_directory(pathlib.Path("GameFiles/Particles"))
+    potion_handler = PotionHandler()
+
+    print(f"{'size':>9} {'rooms':>6} {'enemies':>8} {'generate':>9} {'map':>9} {'shadows':>9} "
+          f"{'shadow frame':>13} {'enemy frame':>12} {'particle frame':>15}   (milliseconds)")
+
+    for size in MAP_SIZES:
+        generate_time, map_data = time_ms(map_generator.generate, size, size, size * size // TILES_PER_ROOM,
+                                          ENEMY_DENSITY)
+        map_time, map_ = time_ms(Map, map_data)
+
+        shadows = Shadows()
+        shadows_time, _ = time_ms(shadows.setup_for_map, map_)
+
+        # Exploded potion lights spread over the rooms, updated and rendered every frame
+        camera = Camera(pygame.Surface(WINDOW_SIZE))
+        camera.set_min_max_position(*map_.min_max_positions())
+
+        player = Player()
+        player.setup_from(map_data, map_)
+        camera.center_on(player.rect)
+
+        for light_index in range(LIGHT_SOURCES):
+            (x, y), _ = map_data.rooms[light_index % len(map_data.rooms)]
+            shadows.add_updating_light_source(ShrinkingLightSource(
+                x * Map.TILE_SIZE + Map.TILE_SIZE_2, y * Map.TILE_SIZE + Map.TILE_SIZE_2,
+                PotionExploded.BRIGHTNESS, PotionExploded.LIGHT_RADIUS, FRAMES * 2
+            ))
+
+        start = time.perf_counter()
+        for _ in range(FRAMES):
+            shadows.update()
+            shadows.render(camera)
+        shadow_frame_time = (time.perf_counter() - start) / FRAMES * 1000
+
+        enemy_handler = EnemyHandler()
+        enemy_handler.setup_enemies_from(map_data, map_)
+
+        start = time.perf_counter()
+        for _ in range(FRAMES):
+            enemy_handler.update_move_and_draw_enemies(player, map_, particle_handler, potion_handler, camera)
+        enemy_frame_time = (time.perf_counter() - start) / FRAMES * 1000
+
+        # Every enemy dies at once, bursting into particles
+        particle_handler.clear_particles()
+        for enemy in list(enemy_handler.enemies):
+            enemy.deal_damage(enemy.health)
+        enemy_handler.update_move_and_draw_enemies(player, map_, particle_handler, potion_handler, camera)
+
+        start = time.perf_counter()
+        for _ in range(FRAMES):
+            particle_handler.update_and_draw_particles(camera)
+        particle_frame_time = (time.perf_counter() - start) / FRAMES * 1000
+
+        print(f"{size:>4}x{size:<4} {len(map_data.rooms):>6} {len(map_data.enemies):>8} {generate_time:>9.3f} "
+              f"{map_time:>9.3f} {shadows_time:>9.3f} {shadow_frame_time:>13.3f} {enemy_frame_time:>12.3f} "
+              f"{particle_frame_time:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import math
+import pathlib
+import random
+import time
+
+import pygame
+
+from GameFiles import Camera, ParticleHandler
+
+POTION_COUNTS = (50, 200, 1000)
+"""How many potions are in flight at once, each trailing flight particles every frame."""
+
+DEATHS_PER_FRAME = 2
+"""How many stalkers die on screen each frame, their bursts should survive the budget."""
+
+FRAMES = 120
+
+WINDOW_SIZE = 1280, 720
+
+
+def run_fight(particle_handler: ParticleHandler, camera: Camera, potion_count: int) -> tuple[float, float]:
+    """
+    Runs a fight with potions flying around the camera and beyond it,
+    returning the average frame time in milliseconds and the average share of stalker death particles kept.
+    """
+
+    particle_handler.clear_particles()
+    particle_handler.reset_counters()
+
+    potions = [[random.uniform(-WINDOW_SIZE[0], WINDOW_SIZE[0] * 2), random.uniform(-WINDOW_SIZE[1], WINDOW_SIZE[1] * 2),
+                random.uniform(0, 2 * math.pi)] for _ in range(potion_count)]
+
+    death_kept = 0
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        for potion in potions:
+            potion[0] += math.cos(potion[2]) * 12
+            potion[1] += math.sin(potion[2]) * 12
+            particle_handler.emit("unexploded flight", potion[0], potion[1])
+
+        for _ in range(DEATHS_PER_FRAME):
+            live_count = particle_handler.count
+            particle_handler.emit("stalker death", random.uniform(0, WINDOW_SIZE[0]), random.uniform(0, WINDOW_SIZE[1]))
+            death_kept += particle_handler.count - live_count
+
+        particle_handler.update_and_draw_particles(camera)
+    frame_time = (time.perf_counter() - start) / FRAMES * 1000
+
+    death_count = FRAMES * DEATHS_PER_FRAME * particle_handler.PARTICLE_DATA["stalker death"]["EMITTER"].count
+
+    return frame_time, death_kept / death_count
+
+
+def main():
+    particle_handler = ParticleHandler()
+    particle_handler.add_particle_directory(pathlib.Path("GameFiles/Particles"))
+
+    camera = Camera(pygame.Surface(WINDOW_SIZE))
+
+    for potion_count in POTION_COUNTS:
+        # Unlimited keeps every particle, on screen or not, like before the budget
+        for budget_name, budget, offscreen_margin, offscreen_aging in (
+                ("unlimited", 10 ** 9, 10 ** 6, 1),
+                ("budgeted", ParticleHandler.PARTICLE_BUDGET, ParticleHandler.OFFSCREEN_MARGIN,
+                 ParticleHandler.OFFSCREEN_AGING)
+        ):
+            random.seed(0)
+            particle_handler.budget = budget
+            particle_handler.OFFSCREEN_MARGIN = offscreen_margin
+            particle_handler.OFFSCREEN_AGING = offscreen_aging
+
+            frame_time, death_share = run_fight(particle_handler, camera, potion_count)
+
+            print(f"{potion_count:>5} potions, {budget_name:<9} - {frame_time:7.3f} ms per frame, "
+                  f"{particle_handler.count:>6} live at the end, spawned {particle_handler.spawned_count:>7}, "
+                  f"decimated {particle_handler.decimated_count:>7}, culled {particle_handler.culled_count:>6}, "
+                  f"{death_share:6.1%} of stalker death particles kept")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import math
+import pathlib
+import random
+import time
+
+from GameFiles import ParticleHandler
+
+BURSTS = 1000
+"""How many stalker death bursts are spawned in each way."""
+
+
+def time_loop(particle_handler: ParticleHandler) -> float:
+    """
+    Spawns the bursts a particle at a time, like the burst sites did before emitters.
+    """
+
+    particle_handler.clear_particles()
+
+    start = time.perf_counter()
+    for _ in range(BURSTS):
+        for _ in range(30):
+            velocity = random.randint(1, 5)
+            angle = random.uniform(0, 2 * math.pi)
+
+            vx = math.cos(angle) * velocity
+            vy = math.sin(angle) * velocity
+
+            particle_handler.create_particle("stalker death", 100, 100, vx, vy, random.randint(5, 30))
+    particle_handler.update_particles()
+
+    return (time.perf_counter() - start) / BURSTS * 1000
+
+
+def time_emit(particle_handler: ParticleHandler) -> float:
+    particle_handler.clear_particles()
+
+    start = time.perf_counter()
+    for _ in range(BURSTS):
+        particle_handler.emit("stalker death", 100, 100)
+    particle_handler.update_particles()
+
+    return (time.perf_counter() - start) / BURSTS * 1000
+
+
+def main():
+    particle_handler = ParticleHandler()
+    particle_handler.add_particle_directory(pathlib.Path("GameFiles/Particles"))
+
+    random.seed(0)
+    loop_time = time_loop(particle_handler)
+    emit_time = time_emit(particle_handler)
+
+    print(f"30 particle burst - loop {loop_time:6.4f} ms, emit {emit_time:6.4f} ms per burst")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import pathlib
+import random
+import time
+
+import pygame
+
+from GameFiles import Camera, ParticleHandler, SpriteBatch
+
+PARTICLE_COUNTS = (1000, 5000, 20000)
+
+FRAMES = 60
+
+REPEATS = 5
+"""How many times the array paths are timed, alternating, keeping the fastest so neither gains from going second."""
+
+WINDOW_SIZE = 1280, 720
+
+SPREAD = 2
+"""Particles are spread over this many windows in each direction, so some are culled."""
+
+
+class ObjectParticle:
+    """
+    A particle as its own object, updated and drawn on its own, like before the particle arrays.
+    """
+
+    def __init__(self, x: float, y: float, vx: float, vy: float, lifespan: int, sprite: pygame.Surface):
+        self.x = x
+        self.y = y
+        self.vx = vx
+        self.vy = vy
+        self.lifespan = lifespan
+        self.sprite = sprite
+        self.sprite_rect = sprite.get_rect()
+
+    def update(self) -> None:
+        self.x += self.vx
+        self.y += self.vy
+        self.lifespan -= 1
+
+    def draw(self, camera: Camera) -> None:
+        self.sprite_rect.center = self.x, self.y
+
+        if not camera.can_see(self.sprite_rect):
+            return
+
+        camera.convert_rect_to_camera_coordinates(self.sprite_rect)
+        camera.window.blit(self.sprite, self.sprite_rect)
+
+
+def random_particles(count: int) -> list[tuple[str, float, float, float, float, int]]:
+    keys = sorted(ParticleHandler.PARTICLE_DATA)
+
+    return [(random.choice(keys),
+             random.uniform(-WINDOW_SIZE[0], WINDOW_SIZE[0] * SPREAD),
+             random.uniform(-WINDOW_SIZE[1], WINDOW_SIZE[1] * SPREAD),
+             random.uniform(-3, 3), random.uniform(-3, 3), random.randint(FRAMES // 2, FRAMES * 2))
+            for _ in range(count)]
+
+
+def time_objects(particles: list[tuple[str, float, float, float, float, int]], camera: Camera) -> float:
+    objects = [ObjectParticle(x, y, vx, vy, lifespan, ParticleHandler.PARTICLE_DATA[key]["SPRITE"])
+               for key, x, y, vx, vy, lifespan in particles]
+
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        for particle_index in range(len(objects) - 1, -1, -1):
+            particle = objects[particle_index]
+            if particle.lifespan <= 0:
+                del objects[particle_index]
+                continue
+
+            particle.update()
+            particle.draw(camera)
+
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+
+def time_handler(particles: list[tuple[str, float, float, float, float, int]], camera: Camera,
+                 particle_handler: ParticleHandler, batched: bool) -> float:
+    """
+    Times the particle arrays, drawn from the shared atlas with fblits when batched,
+    otherwise from sprites of their own with blits, like before the sprite batch.
+    """
+
+    particle_handler.clear_particles()
+    for particle in particles:
+        particle_handler.create_particle(*particle)
+
+    atlas_sprites = particle_handler._sprites  # NOQA: swapping the sprites is what is being compared
+    if not batched:
+        particle_handler._sprites = [sprite.copy() for sprite in atlas_sprites]
+    particle_handler.sprite_batch.USE_FBLITS = batched and SpriteBatch.USE_FBLITS
+
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        particle_handler.update_and_draw_particles(camera)
+    handler_time = (time.perf_counter() - start) / FRAMES * 1000
+
+    particle_handler._sprites = atlas_sprites
+
+    return handler_time
+
+
+def main():
+    particle_handler = ParticleHandler()
+    particle_handler.add_particle_directory(pathlib.Path("GameFiles/Particles"))
+
+    # Compare the same work, every particle kept and aged the same on and off-screen
+    particle_handler.budget = max(PARTICLE_COUNTS)
+    particle_handler.OFFSCREEN_AGING = 1
+
+    camera = Camera(pygame.Surface(WINDOW_SIZE))
+
+    random.seed(0)
+    for particle_count in PARTICLE_COUNTS:
+        particles = random_particles(particle_count)
+
+        object_time = time_objects(particles, camera)
+        handler_time = batched_time = float("inf")
+        for repeat in range(REPEATS):
+            for batched in (repeat % 2 == 0, repeat % 2 == 1):
+                time_taken = time_handler(particles, camera, particle_handler, batched)
+                if batched:
+                    batched_time = min(batched_time, time_taken)
+                else:
+                    handler_time = min(handler_time, time_taken)
+
+        print(f"{particle_count:>6} particles - objects {object_time:7.3f} ms, arrays {handler_time:7.3f} ms, "
+              f"arrays from the atlas in one batch {batched_time:7.3f} ms per frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import pathlib
+import random
+import time
+
+from GameFiles import Map, MapData
+
+QUERIES = 100_000
+
+REPEATS = 5
+"""The queries are timed this many times and the fastest is kept, to reduce noise."""
+
+
+def main():
+    map_ = Map(MapData.from_file(pathlib.Path("GameFiles/Maps/demo.mapdata")))
+
+    random.seed(0)
+    queries = [((random.randrange(map_.width), random.randrange(map_.height)), random.randrange(len(map_.rooms)))
+               for _ in range(QUERIES)]
+
+    for tile_key, room_id in queries:
+        assert map_.tile_in_room(tile_key, room_id) == (tile_key in map_.rooms[room_id]), f"{tile_key} in {room_id}"
+        assert map_.room_ids_at(tile_key) == [other_room_id for other_room_id, room in enumerate(map_.rooms)
+                                              if tile_key in room], f"rooms at {tile_key}"
+    print(f"The room index matches the room tile lists, {len(map_.rooms)} rooms")
+
+    for name, in_room in (("room tile list", lambda tile_key, room_id: tile_key in map_.rooms[room_id]),
+                          ("tile_in_room", map_.tile_in_room)):
+        time_elapsed = float("inf")
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            for tile_key, room_id in queries:
+                in_room(tile_key, room_id)
+            time_elapsed = min(time_elapsed, time.perf_counter() - start)
+
+        print(f"{name:<16} {time_elapsed / QUERIES * 1_000_000:6.3f} us per call")
+
+
+if __name__ == "__main__":
+    main()
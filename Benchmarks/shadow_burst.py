@@ -0,0 +1,90 @@
+import pathlib
+import random
+import time
+from typing import Callable
+
+from GameFiles import Map, MapData, PotionExploded, Shadows, ShrinkingLightSource
+
+DOUBLE_EXPLOSIONS = 100
+"""How many potions double explode on the same frame."""
+
+LIFESPAN = 30
+"""The lifespan of the shrinking light source of a double explosion."""
+
+FRAME_BUDGET = 16
+"""The time a frame may take, in milliseconds."""
+
+BURSTS = 5
+"""How many times the burst is timed, a single run is easily thrown by one slow frame."""
+
+
+def update_one_at_a_time(shadows: Shadows) -> None:
+    """
+    Applies the change of each updating light source on its own, like Shadows.update used to.
+    Light sources added since the last update are stamped on their own first, like they were when added.
+    """
+
+    for light_source in list(shadows.updating_light_sources):
+        if light_source not in shadows._light_stamps:  # NOQA: comparing against the unbatched update
+            shadows._stamp_light_source(light_source)  # NOQA
+
+        if light_source.to_remove:
+            shadows.remove_updating_light_source(light_source)
+            continue
+
+        light_source.update()
+        shadows._move_stamp(light_source)  # NOQA: comparing against the unbatched update
+
+
+def time_burst(map_: Map, update: Callable[[Shadows], None]) -> list[float]:
+    """
+    Double explodes the potions in the middle of the map and updates the shadows until their light sources are gone.
+    Returns the time of each frame in milliseconds, the first frame includes adding the light sources.
+    """
+
+    shadows = Shadows()
+    shadows.setup_for_map(map_)
+
+    random.seed(0)
+    positions = [
+        (random.uniform(map_.x_max * 0.4, map_.x_max * 0.6), random.uniform(map_.y_max * 0.4, map_.y_max * 0.6))
+        for _ in range(DOUBLE_EXPLOSIONS)
+    ]
+
+    frame_times = []
+
+    start = time.perf_counter()
+    for x, y in positions:
+        shadows.add_updating_light_source(
+            ShrinkingLightSource(x, y, PotionExploded.BRIGHTNESS, PotionExploded.LIGHT_RADIUS, LIFESPAN)
+        )
+    update(shadows)
+    frame_times.append((time.perf_counter() - start) * 1000)
+
+    while shadows.updating_light_sources:
+        start = time.perf_counter()
+        update(shadows)
+        frame_times.append((time.perf_counter() - start) * 1000)
+
+    return frame_times
+
+
+def main():
+    map_ = Map(MapData.from_file(pathlib.Path("GameFiles/Maps/demo.mapdata")))
+
+    for name, update in (("one at a time", update_one_at_a_time), ("batched", Shadows.update)):
+        bursts = [time_burst(map_, update) for _ in range(BURSTS)]
+        slowest_frame_times = sorted(max(frame_times) for frame_times in bursts)
+        median_slowest_frame_time = slowest_frame_times[len(slowest_frame_times) // 2]
+        first_frame_time = sorted(frame_times[0] for frame_times in bursts)[len(bursts) // 2]
+        all_frame_times = [frame_time for frame_times in bursts for frame_time in frame_times]
+        average_frame_time = sum(all_frame_times) / len(all_frame_times)
+
+        print(f"{name:<14} slowest frame {median_slowest_frame_time:7.3f} ms (median of {BURSTS} bursts, "
+              f"worst {slowest_frame_times[-1]:7.3f} ms), first frame {first_frame_time:7.3f} ms, "
+              f"average {average_frame_time:7.3f} ms, "
+              f"{'within' if median_slowest_frame_time <= FRAME_BUDGET else 'over'} the {FRAME_BUDGET} ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import pathlib
+import random
+import time
+
+import pygame
+
+from GameFiles import Camera, LazyShadows, LightSource, Map, MapData, Shadows, ShrinkingLightSource
+
+FRAMES = 200
+
+PERSISTENT_LIGHT_COUNTS = (0, 100, 500, 2000)
+"""How many persistent light sources, like exploded potions, are spread over the map."""
+
+EXPLOSION_INTERVAL = 10
+"""Every this many frames, a shrinking light source is added somewhere on the map."""
+
+
+def time_frames(shadows: Shadows, map_: Map, persistent_light_count: int) -> float:
+    """
+    Moves a player light source and the camera along the corridor in row 7, updating and rendering the shadows.
+    Returns the average frame time in milliseconds.
+    """
+
+    window = pygame.Surface((1280, 720))
+    camera = Camera(window)
+    camera.set_min_max_position(*map_.min_max_positions())
+
+    shadows.setup_for_map(map_)
+
+    random.seed(0)
+    for _ in range(persistent_light_count):
+        shadows.add_light_source(LightSource(random.uniform(0, map_.x_max), random.uniform(0, map_.y_max), 300, 80))
+
+    player_light_source = LightSource(0, 0, 255, 64)
+    y = 7 * map_.TILE_SIZE + map_.TILE_SIZE_2
+
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        x = map_.TILE_SIZE_2 + frame * 3
+
+        if frame % EXPLOSION_INTERVAL == 0:
+            shadows.add_updating_light_source(
+                ShrinkingLightSource(random.uniform(0, map_.x_max), random.uniform(0, map_.y_max), 300, 128, 30)
+            )
+
+        shadows.move_light_source(player_light_source, x, y)
+        shadows.update()
+
+        camera.center_on(pygame.Rect(x, y, 1, 1))
+        shadows.render(camera)
+    time_elapsed = time.perf_counter() - start
+
+    return time_elapsed / FRAMES * 1000
+
+
+def main():
+    map_ = Map(MapData.from_file(pathlib.Path("GameFiles/Maps/demo.mapdata")))
+
+    for persistent_light_count in PERSISTENT_LIGHT_COUNTS:
+        shadows_time = time_frames(Shadows(), map_, persistent_light_count)
+        lazy_shadows_time = time_frames(LazyShadows(), map_, persistent_light_count)
+
+        print(f"{persistent_light_count:>5} persistent lights - "
+              f"Shadows {shadows_time:7.3f} ms, LazyShadows {lazy_shadows_time:7.3f} ms per frame")
+
+
+if __name__ == "__main__":
+    main()
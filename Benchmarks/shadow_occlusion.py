@@ -0,0 +1,58 @@
+import pathlib
+import time
+
+from GameFiles import LightSource, Map, MapData, Shadows
+
+WALK_PASSES = 3
+"""The walk is repeated, the first pass fills the caches and later passes reuse them."""
+
+
+def walk_path(map_: Map) -> list[tuple[int, int]]:
+    """
+    A path along the corridor in row 7 of the demo map, moving 3 pixels a frame like the player.
+    """
+
+    y = 7 * map_.TILE_SIZE + map_.TILE_SIZE_2
+
+    return [(x, y) for x in range(map_.TILE_SIZE_2, map_.x_max - map_.TILE_SIZE_2, 3)]
+
+
+def time_walk(map_: Map, occlusion: bool) -> list[float]:
+    """
+    Moves a light source along the path.
+    Returns the average time per move in microseconds, for each pass.
+    """
+
+    shadows = Shadows(occlusion=occlusion)
+    shadows.setup_for_map(map_)
+
+    light_source = LightSource(0, 0, 255, 64)
+    path = walk_path(map_)
+
+    pass_times = []
+    for _ in range(WALK_PASSES):
+        start = time.perf_counter()
+        for x, y in path:
+            shadows.move_light_source(light_source, x, y)
+        time_elapsed = time.perf_counter() - start
+
+        pass_times.append(time_elapsed / len(path) * 1_000_000)
+
+    if occlusion:
+        print(f"Visibility cache: {shadows.visibility_cache.hits} hits, {shadows.visibility_cache.misses} misses")
+
+    return pass_times
+
+
+def main():
+    map_ = Map(MapData.from_file(pathlib.Path("GameFiles/Maps/demo.mapdata")))
+
+    for occlusion in (False, True):
+        pass_times = time_walk(map_, occlusion)
+
+        print(f"Occlusion {'on ' if occlusion else 'off'} - " +
+              ", ".join(f"pass {i + 1} {pass_time:7.2f} us" for i, pass_time in enumerate(pass_times)))
+
+
+if __name__ == "__main__":
+    main()
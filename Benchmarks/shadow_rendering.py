@@ -0,0 +1,49 @@
+import pathlib
+import random
+import time
+
+import pygame
+
+from GameFiles import Camera, LightSource, Map, MapData, Shadows
+
+FRAMES = 200
+
+
+def time_render_mode(render_mode: str, shadows: Shadows, camera: Camera) -> float:
+    """
+    Renders the shadows repeatedly with the given render mode.
+    Returns the average frame time in milliseconds.
+    """
+
+    shadows.set_render_mode(render_mode)  # NOQA: render mode is a str, not a literal
+
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        shadows.render(camera)
+    time_elapsed = time.perf_counter() - start
+
+    return time_elapsed / FRAMES * 1000
+
+
+def main():
+    window = pygame.Surface((1280, 720))
+    camera = Camera(window)
+    camera.rect.height -= 100
+
+    map_ = Map(MapData.from_file(pathlib.Path("GameFiles/Maps/demo.mapdata")))
+    camera.set_min_max_position(*map_.min_max_positions())
+    camera.center_on(pygame.Rect(1000, 900, 1, 1))
+
+    shadows = Shadows()
+    shadows.setup_for_map(map_)
+
+    random.seed(0)
+    for _ in range(30):
+        shadows.add_light_source(LightSource(random.uniform(0, 2500), random.uniform(0, 1900), 300, 80))
+
+    for render_mode in ("tiles", "texture", "smooth texture"):
+        print(f"{render_mode:<16} {time_render_mode(render_mode, shadows, camera):.3f} ms per frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import pathlib
+import time
+
+from GameFiles import LightSource, Map, MapData, Shadows
+
+OVERLAPPING_LIGHTS = (1, 10, 50)
+REPEATS = 2000
+
+
+def time_shadows(overlapping_lights: int, brightness: int, map_: Map) -> float:
+    """
+    Times stamping and removing a light source where other light sources already overlap.
+    The other light sources have brightness between 200 and 150.
+    Returns the average time in microseconds.
+    """
+
+    shadows = Shadows()
+    shadows.setup_for_map(map_)
+
+    for i in range(overlapping_lights - 1):
+        shadows.add_light_source(LightSource(1000 + i, 1000, 200 - i, 80))
+
+    light_source = LightSource(1000, 1000, brightness, 80)
+
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        shadows.add_light_source(light_source)
+        shadows.remove_light_source(light_source)
+    time_elapsed = time.perf_counter() - start
+
+    return time_elapsed / REPEATS * 1_000_000
+
+
+def main():
+    map_ = Map(MapData.from_file(pathlib.Path("GameFiles/Maps/demo.mapdata")))
+
+    for name, brightness in (("strongest", 300), ("weakest", 100)):
+        print(f"Adding and removing the {name} light source")
+
+        for overlapping_lights in OVERLAPPING_LIGHTS:
+            print(f"{overlapping_lights:>3} lights - {time_shadows(overlapping_lights, brightness, map_):8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
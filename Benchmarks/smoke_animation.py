@@ -0,0 +1,121 @@
+import random
+import time
+
+import pygame
+
+from GameFiles import Camera, EnemyStalker, SmokeAnimation
+
+ENEMY_COUNTS = (10, 50, 200)
+"""How many stalkers are on screen at once."""
+
+FRAMES = 60
+
+WINDOW_SIZE = 1280, 720
+
+
+class SimulatedSmoke:
+    """
+    The smoke of a stalker simulated and rendered every frame, like before the smoke animation.
+    """
+
+    def __init__(self, size: int, circle_radius: int, spawn_interval: int):
+        self.circle_radius = circle_radius
+        self.radius_decay = circle_radius / SmokeAnimation.CIRCLE_LIFESPAN
+        self.spawn_interval = spawn_interval
+        self.spawn_timer = spawn_interval - 1
+
+        self.circles: list[list[float]] = []
+        """Each circle as [x, y, vx, vy, radius]."""
+
+        self.sprite = pygame.Surface((size, size))
+        self.sub_sprite = pygame.Surface((circle_radius * 2, circle_radius * 2))
+        self.sub_sprite_rect = self.sub_sprite.get_rect()
+
+    def update(self) -> None:
+        for circle_index in range(len(self.circles) - 1, -1, -1):
+            circle = self.circles[circle_index]
+            if circle[4] <= 0:
+                del self.circles[circle_index]
+                continue
+
+            circle[0] += circle[2]
+            circle[1] += circle[3]
+            circle[4] -= self.radius_decay
+
+        if self.spawn_timer > 0:
+            self.spawn_timer -= 1
+            return
+
+        self.spawn_timer = self.spawn_interval - 1
+        self.circles.append([self.sprite.get_width() // 2, self.sprite.get_height() // 2,
+                             random.uniform(-0.5, 0.5), random.uniform(-0.5, 0.5), self.circle_radius])
+
+    def render(self) -> pygame.Surface:
+        self.sprite.fill((0, 0, 0))
+
+        for x, y, _, _, radius in self.circles:
+            self.sub_sprite.fill((0, 0, 0))
+            pygame.draw.circle(self.sub_sprite, SmokeAnimation.CIRCLE_COLOUR,
+                               (self.sub_sprite.get_width() // 2, self.sub_sprite.get_height() // 2), radius)
+
+            self.sub_sprite_rect.center = x, y
+            self.sprite.blit(self.sub_sprite, self.sub_sprite_rect, special_flags=pygame.BLEND_RGB_ADD)
+
+        return self.sprite
+
+
+def average_darkness(sprite: pygame.Surface) -> float:
+    return float(pygame.surfarray.array_red(sprite).mean())
+
+
+def main():
+    camera = Camera(pygame.Surface(WINDOW_SIZE))
+
+    start = time.perf_counter()
+    stalker = EnemyStalker(0, 0)
+    animation = stalker.smoke_animation
+    render_time = (time.perf_counter() - start) * 1000
+    frame_bytes = sum(frame.get_bytesize() * frame.get_width() * frame.get_height() for frame in animation.frames)
+    print(f"Rendered {SmokeAnimation.FRAME_COUNT} frames of {animation.size}x{animation.size} in {render_time:.1f} ms, "
+          f"taking {frame_bytes / 1000000:.1f} MB")
+
+    random.seed(0)
+    for enemy_count in ENEMY_COUNTS:
+        positions = [(random.randrange(WINDOW_SIZE[0]), random.randrange(WINDOW_SIZE[1])) for _ in range(enemy_count)]
+
+        smokes = [SimulatedSmoke(animation.size, animation.circle_radius, animation.spawn_interval)
+                  for _ in range(enemy_count)]
+        # Let the smoke fill in, as it would have by the time the player finds them
+        for smoke in smokes:
+            for _ in range(SmokeAnimation.CIRCLE_LIFESPAN):
+                smoke.update()
+
+        start = time.perf_counter()
+        for _ in range(FRAMES):
+            for smoke, position in zip(smokes, positions):
+                smoke.update()
+                camera.window.blit(smoke.render(), position, special_flags=pygame.BLEND_RGB_SUB)
+        simulated_time = (time.perf_counter() - start) / FRAMES * 1000
+
+        stalkers = []
+        for position in positions:
+            stalker = EnemyStalker(*position)
+            stalkers.append(stalker)
+
+        start = time.perf_counter()
+        for _ in range(FRAMES):
+            for stalker in stalkers:
+                stalker.draw(camera)
+        animated_time = (time.perf_counter() - start) / FRAMES * 1000
+
+        print(f"{enemy_count:>4} stalkers - simulated {simulated_time:7.3f} ms, "
+              f"animated {animated_time:7.3f} ms per frame")
+
+    # The animation should look as dense as the smoke it replaces
+    simulated_darkness = sum(average_darkness(smoke.render()) for smoke in smokes) / len(smokes)
+    animated_darkness = sum(average_darkness(frame) for frame in animation.frames) / SmokeAnimation.FRAME_COUNT
+    print(f"Average darkness - simulated {simulated_darkness:.2f}, animated {animated_darkness:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -58,7 +58,11 @@ class Game:
 
         self.camera.set_min_max_position(*self.map.min_max_positions())
 
-        self.shadows.setup_for_map(self.map)
+        lightmap_path = None
+        if self.map_data.path is not None:
+            lightmap_path = self.map_data.path.with_suffix(".lightmap")
+
+        self.shadows.setup_for_map(self.map, lightmap_path)
 
         self.potion_handler.clear_potions()
         GameFiles.PotionExploded.reset_upgrades()
@@ -94,7 +98,7 @@ class Game:
         keys = pygame.key.get_pressed()
         mouse_state = GameFiles.Helpers.get_mouse_state()
 
-        self.potion_handler.update(self.map, self.enemy_handler.enemies, self.shadows, self.particle_handler)
+        self.potion_handler.update(self.map, self.enemy_handler.enemy_index, self.shadows, self.particle_handler)
 
         self.player.move(keys, self.map)
         self.player.update(keys, mouse_state, self.particle_handler, self.potion_handler, self.shadows)
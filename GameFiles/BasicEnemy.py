@@ -1,5 +1,4 @@
 import random
-from dataclasses import dataclass
 
 import pygame
 
@@ -8,31 +7,16 @@ from .Enemy import Enemy
 from .Helpers.CommonTypes import Coordinates
 from .Map import Map
 from .Player import Player
+from .SmokeAnimation import SmokeAnimation
 
 CIRCLE_SPAWN_DELAY = 3
 CIRCLE_RADIUS = 30
-CIRCLE_RADIUS_10 = CIRCLE_RADIUS / 100.0
 
 TARGET_RADIUS = 16
 TARGET_RADIUS_SQUARED = TARGET_RADIUS * TARGET_RADIUS
 TARGET_DELAY = 60
 
 
-@dataclass
-class Circle:
-    x: int | float
-    y: int | float
-    vx: int | float
-    vy: int | float
-    radius: int | float
-
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-
-        self.radius -= CIRCLE_RADIUS_10
-
-
 class BasicEnemy(Enemy):
     def __init__(self, x: int, y: int):
         super().__init__(x, y, 50, 50, 100)
@@ -42,14 +26,12 @@ class BasicEnemy(Enemy):
         self.target_timer = TARGET_DELAY
         """The amount of frames to wait before changing the target."""
 
-        self.circles: list[Circle] = []
-        self.circle_timer = CIRCLE_SPAWN_DELAY
+        # A circle of smoke is spawned once the delay has passed, one frame after it reaches zero
+        self.smoke_animation = SmokeAnimation.shared(self.rect.w + CIRCLE_RADIUS * 4, CIRCLE_RADIUS,
+                                                     CIRCLE_SPAWN_DELAY + 1)
+        self.smoke_frame = random.randrange(SmokeAnimation.FRAME_COUNT)
 
-        self.sprite = pygame.surface.Surface((self.rect.w + CIRCLE_RADIUS * 4, self.rect.h + CIRCLE_RADIUS * 4))
-        self.sprite_rect = self.sprite.get_rect()
-
-        self.sub_sprite = pygame.surface.Surface((CIRCLE_RADIUS * 2 + 1, CIRCLE_RADIUS * 2 + 1))
-        self.sub_sprite_rect = self.sub_sprite.get_rect()
+        self.sprite_rect = pygame.Rect(0, 0, self.smoke_animation.size, self.smoke_animation.size)
 
     def set_room_id(self, room_id: int, map_: Map) -> None:
         pass
@@ -78,33 +60,9 @@ class BasicEnemy(Enemy):
         else:
             self.target = self.rect.x + random.randint(-128, 128), self.rect.y + random.randint(-128, 128)
 
-    def _update_sprite(self):
-        # Update the circles
-        circles_len = len(self.circles)
-        for i, circle in enumerate(self.circles[::-1]):
-            i = circles_len - i - 1
-
-            if circle.radius <= 0:
-                del self.circles[i]
-
-            circle.update()
-
-        # Add a circle if necessary
-        if self.circle_timer > 0:
-            self.circle_timer -= 1
-            return
-
-        self.circle_timer = CIRCLE_SPAWN_DELAY
-
-        self.circles.append(
-            Circle(self.sprite.get_width() / 2, self.sprite.get_height() / 2,
-                   random.random() - 0.5, random.random() - 0.5,
-                   CIRCLE_RADIUS)
-        )
-
     def update(self, player: Player, *_):
         self._update_target(player)
-        self._update_sprite()
+        self.smoke_frame += 1
 
     def move(self, map_: Map):
         x_diff = self.target[0] - self.rect.centerx
@@ -142,25 +100,13 @@ class BasicEnemy(Enemy):
         self.move_x(map_, x_move)
         self.move_y(map_, y_move)
 
-    def _render_sprite(self):
-        self.sprite.fill((0, 0, 0))  # NOQA: Duplicate code
-
-        for circle in self.circles:
-            self.sub_sprite.fill((0, 0, 0))
-            pygame.draw.circle(self.sub_sprite, (10, 10, 10),
-                               (self.sub_sprite.get_width() // 2, self.sub_sprite.get_height() // 2),
-                               circle.radius)
-
-            self.sub_sprite_rect.center = circle.x, circle.y
-            self.sprite.blit(self.sub_sprite, self.sub_sprite_rect, special_flags=pygame.BLEND_RGB_ADD)
-
     def draw(self, camera: Camera):
         self.sprite_rect.center = self.rect.center
 
         if not camera.can_see(self.sprite_rect):
             return
 
-        self._render_sprite()
         camera.convert_rect_to_camera_coordinates(self.sprite_rect)
 
-        camera.window.blit(self.sprite, self.sprite_rect.topleft, special_flags=pygame.BLEND_RGB_SUB)
+        camera.window.blit(self.smoke_animation.frame(self.smoke_frame), self.sprite_rect.topleft,
+                           special_flags=pygame.BLEND_RGB_SUB)
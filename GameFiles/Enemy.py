@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Callable
 
 from .Camera import Camera
 from .Entity import Entity
@@ -10,6 +11,35 @@ from .PotionHandler import PotionHandler
 
 
 class Enemy(Entity, ABC):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.on_damaged: Callable[[Enemy], None] | None = None
+        """Called with the enemy whenever it is dealt damage, used to wake dormant enemies."""
+
+    def deal_damage(self, damage: int) -> bool:
+        is_dead = super().deal_damage(damage)
+
+        if self.on_damaged is not None:
+            self.on_damaged(self)
+
+        return is_dead
+
+    def is_dormant(self) -> bool:
+        """
+        Dormant enemies wait for the player to enter their room, or to be dealt damage, before doing anything.
+        They are only drawn until then.
+        """
+
+        return False
+
+    def wake(self) -> None:
+        """
+        Stops the enemy being dormant.
+        """
+
+        pass
+
     @abstractmethod
     def update(self, player: Player, map_: Map, particle_handler: ParticleHandler,
                potion_handler: PotionHandler) -> None:
@@ -11,6 +11,7 @@ from .MapData import MapData
 from .ParticleHandler import ParticleHandler
 from .Player import Player
 from .PotionHandler import PotionHandler
+from .SpatialHash import SpatialHash
 
 _ENEMY_KEYS = Literal["stalker", "consumer", "darkling"]
 
@@ -22,9 +23,39 @@ _ENEMY_KEY_TO_CLASS: dict[_ENEMY_KEYS, type(Enemy)] = {
 
 
 class EnemyHandler:
+    DORMANT_DRAW_MARGIN: int = 64
+    """How far the sprites of dormant enemies reach past their rectangles, so ones just out of view are drawn."""
+
     def __init__(self):
         self.enemies: list[Enemy] = []
 
+        self._enemy_indices: dict[Enemy, int] = {}
+        """The index of each enemy in the enemies list, so a dead one is swapped with the last and popped."""
+
+        self.awake_enemies: list[Enemy] = []
+        """The enemies that are updated and moved every frame."""
+
+        self.dormant_enemies: dict[int, list[Enemy]] = {}
+        """
+        The dormant enemies grouped by the room they wake up in, room -1 for those only woken by damage.
+        Dormant enemies do not move, so they are only drawn.
+        """
+
+        self._dormant_enemy_rooms: dict[Enemy, int] = {}
+        """The room each dormant enemy is grouped under."""
+
+        self.dormant_index: SpatialHash = SpatialHash(Map.TILE_SIZE)
+        """The dormant enemies indexed by the map tiles they touch, to find the ones the camera can see."""
+
+        self._player_room_mask: int = 0
+        """The rooms the player was in last frame, as a bitmask like the map room masks."""
+
+        self.enemy_index: SpatialHash = SpatialHash(Map.TILE_SIZE)
+        """The enemies indexed by the map tiles they touch, kept up to date as they move."""
+
+        self.pair_checks: int = 0
+        """The amount of enemies returned by queries of the enemy index during the last frame."""
+
     def setup_enemies_from(self, map_data: MapData, map_: Map) -> None:
         """
         Clears the current enemies list and creates new enemies from the map data.
@@ -32,6 +63,13 @@ class EnemyHandler:
         """
 
         self.enemies = []
+        self._enemy_indices = {}
+        self.awake_enemies = []
+        self.dormant_enemies = {}
+        self._dormant_enemy_rooms = {}
+        self.enemy_index.clear()
+        self.dormant_index.clear()
+        self._player_room_mask = 0
 
         for enemy_key, spawn_tile_key, room_id in map_data.enemies:
             if enemy_key not in _ENEMY_KEY_TO_CLASS:
@@ -44,7 +82,65 @@ class EnemyHandler:
                                   map_.TILE_SIZE * spawn_tile_key[1] + map_.TILE_SIZE_2))
             new_enemy.set_room_id(room_id if room_id is not None else -1, map_)
 
+            new_enemy.on_damaged = self._wake_enemy
+
+            self._enemy_indices[new_enemy] = len(self.enemies)
             self.enemies.append(new_enemy)
+            self.enemy_index.insert_rect(new_enemy, new_enemy.rect)
+
+            if new_enemy.is_dormant():
+                dormant_room_id = room_id if room_id is not None else -1
+                self.dormant_enemies.setdefault(dormant_room_id, []).append(new_enemy)
+                self._dormant_enemy_rooms[new_enemy] = dormant_room_id
+                self.dormant_index.insert_rect(new_enemy, new_enemy.rect)
+            else:
+                self.awake_enemies.append(new_enemy)
+
+    def _remove_enemy(self, enemy: Enemy) -> None:
+        """
+        Removes the enemy from the enemies list by moving the last enemy into its place.
+        """
+
+        index = self._enemy_indices.pop(enemy)
+        last_enemy = self.enemies.pop()
+
+        if last_enemy is not enemy:
+            self.enemies[index] = last_enemy
+            self._enemy_indices[last_enemy] = index
+
+    def _wake_enemy(self, enemy: Enemy) -> None:
+        """
+        Wakes the enemy if it is dormant, it is updated from the next frame on.
+        """
+
+        room_id = self._dormant_enemy_rooms.pop(enemy, None)
+        if room_id is None:
+            return
+
+        self.dormant_enemies[room_id].remove(enemy)
+        self.dormant_index.remove(enemy)
+
+        enemy.wake()
+        self.awake_enemies.append(enemy)
+
+    def _wake_enemies_in_rooms_entered(self, player: Player, map_: Map) -> None:
+        """
+        Wakes the dormant enemies of every room the player has entered since last frame.
+        """
+
+        player_tile_x, player_tile_y = map_.tile_key_for_position(player.rect.center)
+
+        player_room_mask = 0
+        if 0 <= player_tile_x < map_.width and 0 <= player_tile_y < map_.height:
+            player_room_mask = map_.room_masks[player_tile_y * map_.width + player_tile_x]
+
+        rooms_entered = player_room_mask & ~self._player_room_mask
+        self._player_room_mask = player_room_mask
+
+        for room_id in range(rooms_entered.bit_length()):
+            if rooms_entered >> room_id & 1:
+                for enemy in list(self.dormant_enemies.get(room_id, ())):
+                    self._wake_enemy(enemy)
 
     def update_move_and_draw_enemies(self,
                                      player: Player,
@@ -52,11 +148,34 @@ class EnemyHandler:
                                      particle_handler: ParticleHandler,
                                      potion_handler: PotionHandler,
                                      camera: Camera) -> None:
+        # Everything that queries the enemy index this frame has done so
+        self.pair_checks = self.enemy_index.candidates
+        self.enemy_index.reset_counters()
+
+        # The way to the player is found once for every enemy, over several frames on large maps
+        map_.flow_field.set_target(*map_.tile_key_for_position(player.rect.center))
+        map_.flow_field.update()
+
+        self._wake_enemies_in_rooms_entered(player, map_)
+
         enemy: Enemy
-        for enemy_index, enemy in iter_list_reverse(self.enemies):
-            if enemy.health <= 0:
-                del self.enemies[enemy_index]
+        for enemy_index, enemy in iter_list_reverse(self.awake_enemies):
+            is_dead = enemy.health <= 0
+            if is_dead:
+                del self.awake_enemies[enemy_index]
+                self._remove_enemy(enemy)
 
             enemy.update(player, map_, particle_handler, potion_handler)
             enemy.move(map_)
             enemy.draw(camera)
+
+            if is_dead:
+                self.enemy_index.remove(enemy)
+            else:
+                self.enemy_index.insert_rect(enemy, enemy.rect)
+
+        # Dormant enemies are only drawn, and only the ones the camera could see,
+        # the index returns them in the order they were spawned so overlapping smoke is drawn the same every frame
+        for enemy in self.dormant_index.query_rect(camera.rect.inflate(self.DORMANT_DRAW_MARGIN * 2,
+                                                                       self.DORMANT_DRAW_MARGIN * 2)):
+            enemy.draw(camera)
@@ -1,4 +1,3 @@
-import math
 import random
 from typing import Callable
 
@@ -12,32 +11,7 @@ from .Map import Map
 from .ParticleHandler import ParticleHandler
 from .Player import Player
 from .PotionHandler import PotionHandler
-
-
-class _Circle:
-    INITIAL_RADIUS = 30
-    RADIUS_DECAY = INITIAL_RADIUS / 100
-
-    def __init__(self, x: Number, y: Number, vx: Number, vy: Number):
-        self.x: Number = x
-        self.y: Number = y
-
-        self.vx: Number = vx
-        self.vy: Number = vy
-
-        self.radius: Number = self.INITIAL_RADIUS
-
-    def update(self) -> None:
-        self.x += self.vx
-        self.y += self.vy
-
-        self.radius -= self.RADIUS_DECAY
-
-    def __str__(self) -> str:
-        return f"Circle({round(self.x, 3)}, {round(self.y, 3)}, {round(self.radius, 3)})"
-
-    def __repr__(self) -> str:
-        return self.__str__()
+from .SmokeAnimation import SmokeAnimation
 
 
 class EnemyStalker(Enemy):
@@ -53,10 +27,9 @@ class EnemyStalker(Enemy):
     DAMAGE_TIME: int = 2
     DAMAGE: int = 1
 
+    CIRCLE_RADIUS: int = 30
     CIRCLE_TIMER: int = 3
 
-    NUM_DEATH_PARTICLES: int = 30
-
     def __init__(self, x: Number, y: Number, update_offset: int = 0):
         super().__init__(x, y, 32, 32, self.HEALTH)
 
@@ -65,19 +38,18 @@ class EnemyStalker(Enemy):
 
         self.damage_timer: int = self.DAMAGE_TIME
 
-        self.room_tile_keys: list[IntCoordinates] | None = None
+        self.room_id: int = -1
+        """The room we are constrained to, -1 if not constrained to a room."""
         self._choose_new_tile_as_target: Callable[[Map], None] = self._choose_new_tile_as_target_no_room
         self._target_player: Callable[[Player, Map], bool] = self._target_player_no_room
 
-        self.circles: list[_Circle] = []
-        self.circle_timer: int = self.CIRCLE_TIMER
+        # A circle of smoke is spawned each time the timer runs out, one frame after it reaches zero
+        self.smoke_animation: SmokeAnimation = SmokeAnimation.shared(self.rect.w + self.CIRCLE_RADIUS * 4,
+                                                                     self.CIRCLE_RADIUS, self.CIRCLE_TIMER + 1)
+        self.smoke_frame: int = random.randrange(SmokeAnimation.FRAME_COUNT)
+        """The frame of the smoke animation, starting at random so enemies are not in step."""
 
-        self.sprite: pygame.Surface = pygame.Surface((self.rect.w + _Circle.INITIAL_RADIUS * 4,
-                                                      self.rect.h + _Circle.INITIAL_RADIUS * 4))
-        self.sprite_rect = self.sprite.get_rect()
-
-        self.sub_sprite: pygame.Surface = pygame.Surface((_Circle.INITIAL_RADIUS * 2, _Circle.INITIAL_RADIUS * 2))
-        self.sub_sprite_rect = self.sub_sprite.get_rect()
+        self.sprite_rect = pygame.Rect(0, 0, self.smoke_animation.size, self.smoke_animation.size)
 
         self.updating: bool = False
 
@@ -138,7 +110,7 @@ class EnemyStalker(Enemy):
         # Remove any keys that are not in the room we are a part of
         room_tile_key: IntCoordinates
         for room_tile_key_index, room_tile_key in iter_list_reverse(surrounding_empty_tile_keys):
-            if room_tile_key not in self.room_tile_keys:
+            if not map_.tile_in_room(room_tile_key, self.room_id):
                 del surrounding_empty_tile_keys[room_tile_key_index]
 
         # Get a random choice from those keys
@@ -153,6 +125,27 @@ class EnemyStalker(Enemy):
         self.target = (target_tile_key[0] * map_.TILE_SIZE + map_.TILE_SIZE_2,
                        target_tile_key[1] * map_.TILE_SIZE + map_.TILE_SIZE_2)
 
+    def _chase_player(self, player: Player, map_: Map) -> None:
+        """
+        Targets the center of the next tile on the way to the player, following the flow field of the map.
+        Targets the player directly when in the tile next to theirs, or when the flow field has no way.
+        """
+
+        my_tile_key = map_.tile_key_for_position(self.rect.center)
+        player_tile_key = map_.tile_key_for_position(player.rect.center)
+
+        if abs(my_tile_key[0] - player_tile_key[0]) <= 1 and abs(my_tile_key[1] - player_tile_key[1]) <= 1:
+            self.target = player.rect.center
+            return
+
+        next_tile_key = map_.flow_field.next_tile(*my_tile_key)
+        if next_tile_key is None:
+            self.target = player.rect.center
+            return
+
+        self.target = (next_tile_key[0] * map_.TILE_SIZE + map_.TILE_SIZE_2,
+                       next_tile_key[1] * map_.TILE_SIZE + map_.TILE_SIZE_2)
+
     def _target_player_no_room(self, player: Player, map_: Map) -> bool:
         """
         Targets the player if they can be seen.
@@ -162,7 +155,7 @@ class EnemyStalker(Enemy):
         distance_to_player_squared, *_ = self._distance_to_position_squared(player.rect.center)
 
         if distance_to_player_squared < self.TARGET_DISTANCE_PLAYER_SQUARED:
-            self.target = player.rect.center
+            self._chase_player(player, map_)
             return True
         return False
 
@@ -174,13 +167,13 @@ class EnemyStalker(Enemy):
 
         player_tile_key = map_.tile_key_for_position(player.rect.center)
 
-        if player_tile_key in self.room_tile_keys:
-            self.target = player.rect.center
+        if map_.tile_in_room(player_tile_key, self.room_id):
+            self._chase_player(player, map_)
             return True
 
         distance_to_player_squared, *_ = self._distance_to_position_squared(player.rect.center)
         if distance_to_player_squared < self.TARGET_DISTANCE_PLAYER_SQUARED:
-            self.target = player.rect.center
+            self._chase_player(player, map_)
             return True
 
         return False
@@ -211,7 +204,7 @@ class EnemyStalker(Enemy):
             self._damage_player(player)
         else:
             player_tile_key = map_.tile_key_for_position(player.rect.center)
-            if player_tile_key in self.room_tile_keys:
+            if self.room_id != -1 and map_.tile_in_room(player_tile_key, self.room_id):
                 self.updating = True
                 return
             # Prevent the player from damaging the enemy from afar
@@ -220,19 +213,13 @@ class EnemyStalker(Enemy):
             return
 
         if self.health <= 0:
-            for _ in range(self.NUM_DEATH_PARTICLES):
-                velocity = random.randint(1, 5)
-                angle = random.uniform(0, 2 * math.pi)
+            particle_handler.emit("stalker death", self.rect.centerx, self.rect.centery)
 
-                vx = math.cos(angle) * velocity
-                vy = math.sin(angle) * velocity
+    def is_dormant(self) -> bool:
+        return not self.updating
 
-                particle_handler.create_particle(
-                    "stalker death",
-                    self.rect.centerx, self.rect.centery,
-                    vx, vy,
-                    random.randint(5, 30)
-                )
+    def wake(self) -> None:
+        self.updating = True
 
     def move(self, map_: Map) -> None:
         x_diff = self.target[0] - self.rect.centerx
@@ -257,52 +244,16 @@ class EnemyStalker(Enemy):
             y_move = -1 if y_diff < 0 else 1
         self.move_y(map_, y_move)
 
-    def _update_circles_for_sprite(self) -> None:
-        # Update the circles
-        circle: _Circle
-        for circle_index, circle in iter_list_reverse(self.circles):
-            if circle.radius <= 0:
-                del self.circles[circle_index]
-                continue
-
-            circle.update()
-
-        # Add new circles
-        if self.circle_timer > 0:
-            self.circle_timer -= 1
-            return
-
-        self.circle_timer = self.CIRCLE_TIMER
-
-        self.circles.append(
-            _Circle(
-                self.sprite.get_width() // 2, self.sprite.get_height() // 2,
-                random.uniform(-0.5, 0.5), random.uniform(-0.5, 0.5)
-            )
-        )
-
-    def _render_sprite(self) -> None:
-        self.sprite.fill((0, 0, 0))  # NOQA: Duplicate code from basic enemy
-
-        for circle in self.circles:
-            self.sub_sprite.fill((0, 0, 0))
-            pygame.draw.circle(self.sub_sprite, (10, 10, 10),
-                               (self.sub_sprite.get_width() // 2, self.sub_sprite.get_height() // 2),
-                               circle.radius)
-
-            self.sub_sprite_rect.center = circle.x, circle.y
-            self.sprite.blit(self.sub_sprite, self.sub_sprite_rect, special_flags=pygame.BLEND_RGB_ADD)
-
     def draw(self, camera: Camera) -> None:
         self.sprite_rect.center = self.rect.center
 
         if not camera.can_see(self.sprite_rect):
             return
 
-        self._update_circles_for_sprite()
-        self._render_sprite()
+        self.smoke_frame += 1
         camera.convert_rect_to_camera_coordinates(self.sprite_rect)
-        camera.window.blit(self.sprite, self.sprite_rect, special_flags=pygame.BLEND_RGB_SUB)
+        camera.window.blit(self.smoke_animation.frame(self.smoke_frame), self.sprite_rect,
+                           special_flags=pygame.BLEND_RGB_SUB)
 
     def set_room_id(self, room_id: int, map_: Map) -> None:
         """
@@ -310,12 +261,15 @@ class EnemyStalker(Enemy):
         If the given room id is -1, then clears the set room if it exists.
         """
 
+        if room_id >= len(map_.rooms):
+            raise ValueError(f"Room id {room_id} does not exist, the map has {len(map_.rooms)} rooms")
+
+        self.room_id = room_id
+
         if room_id == -1:
-            self.room_tile_keys = None
             self._choose_new_tile_as_target = self._choose_new_tile_as_target_no_room
             self._target_player = self._target_player_no_room
         else:
-            self.room_tile_keys = map_.rooms[room_id]
             self._choose_new_tile_as_target = self._choose_new_tile_as_target_with_room
             self._target_player = self._target_player_with_room
 
@@ -0,0 +1,180 @@
+from collections import deque
+
+from .Helpers.CommonTypes import IntCoordinates
+
+_DIRECTIONS: tuple[IntCoordinates, ...] = (
+    (0, 0),
+    (1, 0), (1, 1), (0, 1), (-1, 1),
+    (-1, 0), (-1, -1), (0, -1), (1, -1)
+)
+"""The step for each direction code, code 0 is no step."""
+
+_OPPOSITE_DIRECTIONS: tuple[int, ...] = (0, 5, 6, 7, 8, 1, 2, 3, 4)
+"""The code of the opposite direction for each direction code."""
+
+_STEPS: tuple[tuple[int, int, int], ...] = tuple(
+    (x_step, y_step, _OPPOSITE_DIRECTIONS[direction]) for direction, (x_step, y_step) in enumerate(_DIRECTIONS)
+    if direction != 0
+)
+"""Each step to a neighbouring tile, with the code of the direction from that tile back."""
+
+
+class FlowField:
+    TILES_PER_UPDATE: int = 256
+    """
+    The most tiles a single update visits, larger maps take several updates to build a field.
+    Kept small so an update costs well under a millisecond, a 256 by 256 map takes a few seconds to build.
+    """
+
+    def __init__(self, occupancy: bytearray, width: int, height: int):
+        """
+        A breadth first search outwards from a target tile over the empty tiles of a map.
+        Every reached tile stores the direction of its next step towards the target.
+        Diagonal steps are only taken when both tiles beside the diagonal are empty, so corners are not cut.
+
+        A new field is built over several updates while the last complete field keeps being used.
+        A build is never restarted, a target set while building waits until the build is complete,
+        so a target that keeps moving still gets complete fields.
+
+        :param occupancy: One byte per tile, row by row, non-zero if the tile is a wall.
+        :param width: The width of the map in tiles.
+        :param height: The height of the map in tiles.
+        """
+
+        self.occupancy: bytearray = occupancy
+        self.width: int = width
+        self.height: int = height
+
+        self.directions: bytearray = bytearray(width * height)
+        """
+        The direction code of the next step towards the target for each tile, indexed as y * width + x.
+        0 for the target itself and for tiles that cannot reach it.
+        """
+
+        self.target: IntCoordinates | None = None
+        """The target tile of the complete field, None if no field has been completed."""
+
+        self._building_directions: bytearray = bytearray(width * height)
+        """The directions of the field being built, swapped with the complete directions once it is done."""
+
+        self._building_distances: list[int] = []
+        """The amount of steps from each tile to the target of the field being built, -1 if not reached yet."""
+
+        self._building_target: IntCoordinates | None = None
+        """The target tile of the field being built, None if no field is being built."""
+
+        self._frontier: deque[int] = deque()
+        """The indices of the reached tiles whose neighbours have not been visited yet."""
+
+        self._pending_target: IntCoordinates | None = None
+        """The newest target set while building, built next. None if there is none."""
+
+    def is_building(self) -> bool:
+        return self._building_target is not None
+
+    def set_target(self, tile_x: int, tile_y: int) -> None:
+        """
+        Starts building a field towards the tile, unless the field is already for that tile.
+        While a field is being built the tile is kept as the next target instead, replacing any earlier one.
+        Walls and tiles outside the map are ignored.
+        """
+
+        target = tile_x, tile_y
+
+        if tile_x < 0 or tile_y < 0 or tile_x >= self.width or tile_y >= self.height:
+            return
+
+        if self.occupancy[tile_y * self.width + tile_x]:
+            return
+
+        if self._building_target is not None:
+            self._pending_target = None if target == self._building_target else target
+            return
+
+        if target != self.target:
+            self._start_building(target)
+
+    def _start_building(self, target: IntCoordinates) -> None:
+        index = target[1] * self.width + target[0]
+
+        self._building_target = target
+        self._building_directions = bytearray(self.width * self.height)
+        self._building_distances = [-1] * (self.width * self.height)
+        self._building_distances[index] = 0
+        self._frontier = deque((index,))
+
+    def update(self) -> None:
+        """
+        Continues building the field, swapping it in once it is complete.
+        The next target, if one was set while building, is started on straight away.
+        """
+
+        if self._building_target is None:
+            return
+
+        width = self.width
+        height = self.height
+        occupancy = self.occupancy
+        directions = self._building_directions
+        distances = self._building_distances
+        frontier = self._frontier
+
+        for _ in range(self.TILES_PER_UPDATE):
+            if not frontier:
+                break
+
+            index = frontier.popleft()
+            tile_x = index % width
+            tile_y = index // width
+            next_distance = distances[index] + 1
+
+            for x_step, y_step, direction_back in _STEPS:
+                neighbour_x = tile_x + x_step
+                neighbour_y = tile_y + y_step
+                if neighbour_x < 0 or neighbour_y < 0 or neighbour_x >= width or neighbour_y >= height:
+                    continue
+
+                neighbour_index = neighbour_y * width + neighbour_x
+                if occupancy[neighbour_index] or distances[neighbour_index] != -1:
+                    continue
+
+                # Do not cut corners
+                if x_step and y_step and (occupancy[tile_y * width + neighbour_x]
+                                          or occupancy[neighbour_y * width + tile_x]):
+                    continue
+
+                distances[neighbour_index] = next_distance
+                directions[neighbour_index] = direction_back
+                frontier.append(neighbour_index)
+
+        if frontier:
+            return
+
+        # Done, the complete field is swapped in
+        self.directions, self._building_directions = self._building_directions, self.directions
+        self.target = self._building_target
+
+        self._building_target = None
+        self._building_distances = []
+
+        pending_target = self._pending_target
+        self._pending_target = None
+        if pending_target is not None and pending_target != self.target:
+            self._start_building(pending_target)
+
+    def next_tile(self, tile_x: int, tile_y: int) -> IntCoordinates | None:
+        """
+        Returns the next tile on the way to the target of the complete field.
+        Returns None if the tile is the target, cannot reach the target, is outside the map, or there is no field.
+        """
+
+        if tile_x < 0 or tile_y < 0 or tile_x >= self.width or tile_y >= self.height:
+            return None
+
+        direction = self.directions[tile_y * self.width + tile_x]
+        if direction == 0:
+            return None
+
+        x_step, y_step = _DIRECTIONS[direction]
+
+        return tile_x + x_step, tile_y + y_step
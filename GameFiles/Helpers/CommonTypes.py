@@ -2,3 +2,4 @@ Number = int | float
 Coordinates = tuple[Number, Number]
 IntCoordinates = tuple[int, int]
 SimpleRectangle = tuple[Number, Number, Number, Number]
+TileRegion = tuple[int, int, int, int]
@@ -0,0 +1,155 @@
+import pathlib
+
+from .Helpers.CommonTypes import TileRegion
+from .LightSource import LightSource
+from .LightStamp import LightStamp
+from .Map import Map
+from .Shadows import Shadows
+
+
+class LazyShadows(Shadows):
+    def __init__(self, *args, **kwargs):
+        """
+        Shadows that are only calculated for the tiles the camera can see, when they are rendered.
+        Adding, removing and moving light sources only updates the spatial index of stamps,
+        so light sources far away from the camera, such as exploded potions in other rooms, cost nothing per frame.
+
+        The brightness and darkness of tiles outside the last rendered region are not kept up to date.
+
+        This only pays off when most light sources are off-screen. On the demo map in Benchmarks/shadow_lazy.py,
+        runs with up to 500 persistent light sources go anywhere from 35% faster to 5% slower than Shadows,
+        so there is no reliable win below about 2000, where it is 10 to 25% faster.
+        The game uses Shadows, which also keeps every tile up to date.
+        """
+
+        super().__init__(*args, **kwargs)
+
+        self._evaluated_region: TileRegion | None = None
+        """
+        The region of tiles whose darkness was last calculated, as (x, y, x_end, y_end).
+        None if nothing has been calculated yet.
+        """
+
+        self._stale_regions: list[TileRegion] = []
+        """Parts of the evaluated region covered by stamps that changed since it was calculated."""
+
+    def setup_for_map(self, map_: Map, lightmap_path: pathlib.Path | None = None) -> None:
+        super().setup_for_map(map_, lightmap_path)
+
+        self._evaluated_region = None
+        self._stale_regions = []
+
+    def _invalidate(self, stamp: LightStamp | None) -> None:
+        """
+        Marks the part of the evaluated region covered by the stamp as stale.
+        """
+
+        if stamp is None or self._evaluated_region is None:
+            return
+
+        x, y, x_end, y_end = self._evaluated_region
+        if not stamp.overlaps(x, y, x_end, y_end):
+            return
+
+        self._stale_regions.append((max(x, stamp.x), max(y, stamp.y), min(x_end, stamp.x_end), min(y_end, stamp.y_end)))
+
+        # Lots of small regions are cheaper to recalculate as the one region covering them all
+        if len(self._stale_regions) > self.MAX_DIRTY_REGIONS:
+            self._stale_regions = [(
+                min(region[0] for region in self._stale_regions),
+                min(region[1] for region in self._stale_regions),
+                max(region[2] for region in self._stale_regions),
+                max(region[3] for region in self._stale_regions)
+            )]
+
+    def _set_stamp(self, light_source: LightSource, stamp: LightStamp | None) -> None:
+        self._invalidate(self._light_stamps.get(light_source))
+        self._invalidate(stamp)
+
+        super()._set_stamp(light_source, stamp)
+
+    def _pop_stamp(self, light_source: LightSource) -> LightStamp | None:
+        stamp = super()._pop_stamp(light_source)
+        self._invalidate(stamp)
+
+        return stamp
+
+    def _stamp_light_source(self, light_source: LightSource) -> None:
+        self._set_stamp(light_source, self._stamp_for(light_source))
+
+    def _unstamp_light_source(self, light_source: LightSource) -> None:
+        self._pop_stamp(light_source)
+
+    def _swap_stamps(self, old_stamp: LightStamp | None, new_stamp: LightStamp | None) -> TileRegion | None:
+        """
+        Stamps are only applied to the tiles when rendering, so there is nothing to lift or recalculate.
+        """
+
+        return None
+
+    def set_occlusion(self, occlusion: bool) -> None:
+        self.occlusion = occlusion
+
+        self._bake_static_light_sources()
+
+        for light_source in list(self._light_stamps):
+            self._set_stamp(light_source, self._stamp_for(light_source))
+
+        # The base brightness changed everywhere
+        self._evaluated_region = None
+
+    @staticmethod
+    def _subtract_region(region: TileRegion, other: TileRegion) -> list[TileRegion]:
+        """
+        Returns the parts of the region not covered by the other region, as up to four regions.
+        """
+
+        x, y, x_end, y_end = region
+        other_x, other_y, other_x_end, other_y_end = other
+
+        if other_x >= x_end or x >= other_x_end or other_y >= y_end or y >= other_y_end:
+            return [region]
+
+        parts = []
+
+        # The rows above and below the other region
+        if y < other_y:
+            parts.append((x, y, x_end, other_y))
+        if other_y_end < y_end:
+            parts.append((x, other_y_end, x_end, y_end))
+
+        # The columns left and right of the other region, within its rows
+        middle_y = max(y, other_y)
+        middle_y_end = min(y_end, other_y_end)
+        if x < other_x:
+            parts.append((x, middle_y, other_x, middle_y_end))
+        if other_x_end < x_end:
+            parts.append((other_x_end, middle_y, x_end, middle_y_end))
+
+        return parts
+
+    def _prepare_visible_tiles(self, tile_x_min: int, tile_x_max: int, tile_y_min: int, tile_y_max: int) -> None:
+        """
+        Calculates the darkness of the visible tiles from the stamps that overlap them.
+        Only tiles that just came into view, or that are covered by a stamp that changed, are recalculated.
+        """
+
+        region = tile_x_min, tile_y_min, tile_x_max, tile_y_max
+
+        if self._evaluated_region is None:
+            regions_to_calculate = [region]
+        else:
+            regions_to_calculate = self._subtract_region(region, self._evaluated_region)
+
+            for stale_x, stale_y, stale_x_end, stale_y_end in self._stale_regions:
+                stale_region = (max(stale_x, tile_x_min), max(stale_y, tile_y_min),
+                                min(stale_x_end, tile_x_max), min(stale_y_end, tile_y_max))
+
+                if stale_region[0] < stale_region[2] and stale_region[1] < stale_region[3]:
+                    regions_to_calculate.append(stale_region)
+
+        for x, y, x_end, y_end in regions_to_calculate:
+            self._recalculate_region(x, y, x_end, y_end)
+
+        self._evaluated_region = region
+        self._stale_regions = []
@@ -0,0 +1,30 @@
+import numpy
+
+StampKey = tuple[int, int, int, int]
+
+
+class LightStamp:
+    def __init__(self, x: int, y: int, values: numpy.ndarray, key: StampKey):
+        """
+        :param x: The x coordinate of the top left tile of the stamp.
+        :param y: The y coordinate of the top left tile of the stamp.
+        :param values: The reduction in darkness for each tile covered by the stamp, indexed as [y, x].
+        :param key: The tile, radius and brightness of the light source as (tile_x, tile_y, radius, brightness).
+        """
+
+        self.key = key
+
+        self.x = x
+        self.y = y
+
+        self.values = values
+
+        self.x_end = x + values.shape[1]
+        self.y_end = y + values.shape[0]
+
+    def overlaps(self, x: int, y: int, x_end: int, y_end: int) -> bool:
+        """
+        Returns true if the stamp overlaps the region of tiles, the end coordinates are exclusive.
+        """
+
+        return self.x < x_end and x < self.x_end and self.y < y_end and y < self.y_end
@@ -0,0 +1,94 @@
+from collections import OrderedDict
+
+import numpy
+
+_StencilKey = tuple[int, int, int, int]
+
+
+class LightStencilCache:
+    def __init__(self, tile_size: int, max_size: int = 1024):
+        """
+        A least recently used cache of light stencils.
+        A stencil is the reduction in darkness a light source applies to the tiles around it.
+        It only depends on the radius and brightness of the light source and where in its tile the light source is.
+
+        :param tile_size: The size of the tiles the stencils are for.
+        :param max_size: The maximum amount of stencils to keep.
+        """
+
+        self.tile_size: int = tile_size
+        self.max_size: int = max_size
+
+        self.hits: int = 0
+        """The amount of stencils that were found in the cache."""
+        self.misses: int = 0
+        """The amount of stencils that had to be calculated."""
+
+        self._stencils: OrderedDict[_StencilKey, numpy.ndarray] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._stencils)
+
+    def clear(self) -> None:
+        self._stencils.clear()
+
+    def reset_counters(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def radius_in_tiles(self, radius: int) -> int:
+        """
+        The amount of tiles the stencil extends past the tile of the light source.
+        """
+
+        return int(radius // self.tile_size) + 1
+
+    def _calculate_stencil(self, radius: int, brightness: int, offset_x: int, offset_y: int) -> numpy.ndarray:
+        radius_tiles = self.radius_in_tiles(radius)
+
+        # The distance from the light source to the center of each tile, as a row and a column
+        tile_offsets = numpy.arange(-radius_tiles, radius_tiles + 1) * self.tile_size + self.tile_size / 2
+        x_distances = tile_offsets - offset_x
+        y_distances = tile_offsets - offset_y
+
+        distances_squared = x_distances[numpy.newaxis, :] ** 2 + y_distances[:, numpy.newaxis] ** 2
+
+        multipliers = 1 - numpy.sqrt(distances_squared) / radius * 0.5
+        stencil = (brightness * multipliers).astype(numpy.int16)
+
+        # Only the disk of the light source is lit
+        stencil[distances_squared > radius * radius] = 0
+
+        # Stencils are shared, so make sure nobody changes them
+        stencil.flags.writeable = False
+
+        return stencil
+
+    def stencil_for(self, radius: int, brightness: int, offset_x: int, offset_y: int) -> numpy.ndarray:
+        """
+        Returns the stencil for a light source, calculating it if it is not cached.
+        The stencil is indexed as [y, x] with the tile of the light source at the center.
+
+        :param radius: The radius of the light source, must be above zero.
+        :param brightness: The brightness of the light source.
+        :param offset_x: The x position of the light source inside its tile, in whole pixels.
+        :param offset_y: The y position of the light source inside its tile, in whole pixels.
+        """
+
+        key = radius, brightness, offset_x, offset_y
+
+        stencil = self._stencils.get(key)
+        if stencil is not None:
+            self.hits += 1
+            self._stencils.move_to_end(key)
+            return stencil
+
+        self.misses += 1
+
+        stencil = self._calculate_stencil(radius, brightness, offset_x, offset_y)
+        self._stencils[key] = stencil
+
+        if len(self._stencils) > self.max_size:
+            self._stencils.popitem(last=False)
+
+        return stencil
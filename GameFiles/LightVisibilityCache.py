@@ -0,0 +1,189 @@
+from collections import OrderedDict
+
+import numpy
+
+_VisibilityKey = tuple[int, int, int]
+
+_OCTANTS: tuple[tuple[int, int, int, int], ...] = (
+    (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+    (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1)
+)
+"""The transforms (xx, xy, yx, yy) that map the first octant onto each of the eight octants."""
+
+
+class LightVisibilityCache:
+    ORIGIN_SEARCH_RADIUS: int = 2
+    """How far to look for an open tile to cast from when a light source is inside a wall."""
+
+    def __init__(self, walls: numpy.ndarray, max_size: int = 2048):
+        """
+        A least recently used cache of which tiles can be seen from a tile, found using recursive shadowcasting.
+
+        :param walls: A 2D array of the tiles that block light, indexed as [y, x].
+        :param max_size: The maximum amount of visibility masks to keep.
+        """
+
+        self.walls: numpy.ndarray = walls
+        self.max_size: int = max_size
+
+        self.hits: int = 0
+        """The amount of visibility masks that were found in the cache."""
+        self.misses: int = 0
+        """The amount of visibility masks that had to be calculated."""
+
+        self._visibilities: OrderedDict[_VisibilityKey, numpy.ndarray] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._visibilities)
+
+    def clear(self) -> None:
+        self._visibilities.clear()
+
+    def reset_counters(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def _is_wall(self, tile_x: int, tile_y: int) -> bool:
+        """
+        Tiles outside the map are considered walls.
+        """
+
+        if tile_x < 0 or tile_y < 0 or tile_y >= self.walls.shape[0] or tile_x >= self.walls.shape[1]:
+            return True
+        return bool(self.walls[tile_y, tile_x])
+
+    def _find_origin(self, tile_x: int, tile_y: int) -> tuple[int, int]:
+        """
+        Finds the tile to cast from.
+        This is the given tile unless it is a wall, in which case it is the closest open tile nearby.
+        Light sources such as exploded potions sit just inside the wall they hit.
+        """
+
+        if not self._is_wall(tile_x, tile_y):
+            return tile_x, tile_y
+
+        closest_tile = tile_x, tile_y
+        closest_distance_squared = None
+
+        for y_diff in range(-self.ORIGIN_SEARCH_RADIUS, self.ORIGIN_SEARCH_RADIUS + 1):
+            for x_diff in range(-self.ORIGIN_SEARCH_RADIUS, self.ORIGIN_SEARCH_RADIUS + 1):
+                if self._is_wall(tile_x + x_diff, tile_y + y_diff):
+                    continue
+
+                distance_squared = x_diff * x_diff + y_diff * y_diff
+                if closest_distance_squared is None or distance_squared < closest_distance_squared:
+                    closest_tile = tile_x + x_diff, tile_y + y_diff
+                    closest_distance_squared = distance_squared
+
+        return closest_tile
+
+    def _cast_light(self, visible: numpy.ndarray, center_x: int, center_y: int,
+                    origin_x: int, origin_y: int, radius: int,
+                    row: int, start_slope: float, end_slope: float,
+                    xx: int, xy: int, yx: int, yy: int) -> None:
+        """
+        Marks the visible tiles of one octant, recursing whenever a wall splits the octant.
+
+        :param visible: The mask being filled in, centered on (center_x, center_y) in tile coordinates.
+        :param origin_x: The x coordinate of the tile being cast from.
+        :param origin_y: The y coordinate of the tile being cast from.
+        """
+
+        if start_slope < end_slope:
+            return
+
+        mask_radius = visible.shape[0] // 2
+        radius_squared = radius * radius
+        new_start_slope = start_slope
+
+        for distance in range(row, radius + 1):
+            blocked = False
+
+            for x_diff in range(-distance, 1):
+                y_diff = -distance
+
+                left_slope = (x_diff - 0.5) / (y_diff + 0.5)
+                right_slope = (x_diff + 0.5) / (y_diff - 0.5)
+
+                if start_slope < right_slope:
+                    continue
+                if end_slope > left_slope:
+                    break
+
+                tile_x = origin_x + x_diff * xx + y_diff * xy
+                tile_y = origin_y + x_diff * yx + y_diff * yy
+
+                if x_diff * x_diff + y_diff * y_diff <= radius_squared:
+                    mask_x = tile_x - center_x + mask_radius
+                    mask_y = tile_y - center_y + mask_radius
+
+                    if 0 <= mask_x < visible.shape[1] and 0 <= mask_y < visible.shape[0]:
+                        visible[mask_y, mask_x] = True
+
+                is_wall = self._is_wall(tile_x, tile_y)
+
+                if blocked:
+                    if is_wall:
+                        new_start_slope = right_slope
+                        continue
+
+                    blocked = False
+                    start_slope = new_start_slope
+                elif is_wall and distance < radius:
+                    blocked = True
+                    self._cast_light(visible, center_x, center_y, origin_x, origin_y, radius,
+                                     distance + 1, start_slope, left_slope, xx, xy, yx, yy)
+                    new_start_slope = right_slope
+
+            if blocked:
+                break
+
+    def _calculate_visibility(self, tile_x: int, tile_y: int, radius_tiles: int) -> numpy.ndarray:
+        visible = numpy.zeros((radius_tiles * 2 + 1, radius_tiles * 2 + 1), dtype=bool)
+
+        origin_x, origin_y = self._find_origin(tile_x, tile_y)
+
+        # Cast far enough to cover the whole mask from the origin
+        radius = radius_tiles + abs(origin_x - tile_x) + abs(origin_y - tile_y)
+
+        origin_mask_x = origin_x - tile_x + radius_tiles
+        origin_mask_y = origin_y - tile_y + radius_tiles
+        visible[origin_mask_y, origin_mask_x] = True
+
+        for xx, xy, yx, yy in _OCTANTS:
+            self._cast_light(visible, tile_x, tile_y, origin_x, origin_y, radius,
+                             1, 1.0, 0.0, xx, xy, yx, yy)
+
+        # Masks are shared, so make sure nobody changes them
+        visible.flags.writeable = False
+
+        return visible
+
+    def visibility_for(self, tile_x: int, tile_y: int, radius_tiles: int) -> numpy.ndarray:
+        """
+        Returns which tiles around a tile can be seen from it, calculating it if it is not cached.
+        The mask is indexed as [y, x] with the given tile at the center.
+        Walls that can be seen are visible, tiles behind them are not.
+
+        :param tile_x: The x coordinate of the tile.
+        :param tile_y: The y coordinate of the tile.
+        :param radius_tiles: How many tiles the mask extends past the given tile.
+        """
+
+        key = tile_x, tile_y, radius_tiles
+
+        visibility = self._visibilities.get(key)
+        if visibility is not None:
+            self.hits += 1
+            self._visibilities.move_to_end(key)
+            return visibility
+
+        self.misses += 1
+
+        visibility = self._calculate_visibility(tile_x, tile_y, radius_tiles)
+        self._visibilities[key] = visibility
+
+        if len(self._visibilities) > self.max_size:
+            self._visibilities.popitem(last=False)
+
+        return visibility
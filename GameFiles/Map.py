@@ -1,30 +1,78 @@
+from collections import OrderedDict
 from typing import Generator
 
 import pygame
 
 from .Camera import Camera
+from .FlowField import FlowField
 from .Helpers.CommonTypes import Coordinates, Number, IntCoordinates
+from .LightSource import LightSource
 from .MapData import MapData
 
 _TileKey = IntCoordinates
+_ChunkKey = IntCoordinates
 
 
 class Map:
     TILE_SIZE = 128
     TILE_SIZE_2 = int(TILE_SIZE // 2)
 
+    WALL_COLOUR = (64, 64, 96)  # Used to be coloured (255, 127, 127)
+    CHUNK_COLOURKEY = (0, 0, 0)
+    """The colour of the empty parts of a chunk, it must not be the wall colour."""
+
+    CHUNK_SIZE = 8
+    """The width and height of a chunk of the pre-rendered walls, in map tiles."""
+
+    CHUNK_CACHE_BUDGET = 64 * 1024 * 1024
+    """The maximum amount of bytes the pre-rendered chunks can take, the least recently drawn ones are dropped first."""
+
     def __init__(self, map_data: MapData | None = None):
         self.tiles: dict[_TileKey, pygame.Rect] = {}
         """
         A string of tile coords as a tuple (x, y) to collision rectangle.
         """
 
+        self.occupancy: bytearray = bytearray()
+        """
+        One byte per tile, row by row, 1 if the tile exists and 0 if not.
+        The tile (x, y) is at index y * width + x.
+        Lookups avoid building and hashing tuples, which the collision queries do a lot.
+        """
+
+        self._tile_rects: list[pygame.Rect | None] = []
+        """The collision rectangle of each tile, indexed the same as the occupancy, None if the tile does not exist."""
+
+        self.merged_tiles: list[pygame.Rect] = []
+        """
+        The tiles merged into rectangles, so a run of wall is one rectangle instead of many.
+        Every tile is in exactly one merged rectangle.
+        """
+
+        self._merged_tile_ids: list[int] = []
+        """
+        The index into the merged tiles of each tile, indexed the same as the occupancy.
+        -1 if the tile does not exist.
+        """
+
         self.rooms: list[list[_TileKey]] = []
         """
         A list of all rooms this map has.
         Rooms here are a list of all the empty tiles for the room.
         """
 
+        self.room_masks: list[int] = []
+        """
+        The rooms each tile is in as a bitmask, bit n set if the tile is in room n, indexed the same as the occupancy.
+        Rooms can overlap, so a tile can be in several.
+        """
+
+        self.static_light_sources: list[LightSource] = []
+        """Light sources that never move or change, their light is baked by the shadows."""
+
+        self.flow_field: FlowField = FlowField(self.occupancy, 0, 0)
+        """The way to the player from every empty tile, shared by every enemy chasing the player."""
+
         self.width: int = 0
         """The width in map tiles."""
         self.height: int = 0
@@ -39,6 +87,15 @@ class Map:
         self.y_max: int = 0
         """The maximum y coordinate that exists within the map tiles."""
 
+        self._chunks: OrderedDict[_ChunkKey, pygame.Surface | None] = OrderedDict()
+        """
+        The pre-rendered walls of each chunk, ordered from least to most recently drawn.
+        Chunks are rendered the first time they are seen, None if the chunk has no walls.
+        """
+
+        self._chunks_size: int = 0
+        """The amount of bytes the pre-rendered chunks take."""
+
         if map_data is not None:
             self.generate_from(map_data)
 
@@ -53,6 +110,8 @@ class Map:
 
     def _generate_tiles(self, map_data: MapData) -> None:
         self.tiles = {}
+        self.occupancy = bytearray(map_data.width * map_data.height)
+        self._tile_rects = [None] * (map_data.width * map_data.height)
 
         for y, row in enumerate(map_data.rows()):
             for x, tile in enumerate(row):
@@ -62,6 +121,51 @@ class Map:
                 self.tiles[(x, y)] = pygame.Rect(x * self.TILE_SIZE, y * self.TILE_SIZE,
                                                  self.TILE_SIZE, self.TILE_SIZE)
 
+                self.occupancy[y * map_data.width + x] = 1
+                self._tile_rects[y * map_data.width + x] = self.tiles[(x, y)]
+
+    def _merge_tiles(self) -> None:
+        """
+        Greedily merges the tiles into rectangles.
+        Going row by row, each tile not yet merged starts a rectangle.
+        It is widened as far as the run of tiles goes, then lengthened down for as long as the rows below are as wide.
+        Expects the tiles to be already generated.
+        """
+
+        self.merged_tiles = []
+        self._merged_tile_ids = [-1] * (self.width * self.height)
+
+        occupancy = self.occupancy
+        merged_tile_ids = self._merged_tile_ids
+
+        for tile_y in range(self.height):
+            for tile_x in range(self.width):
+                index = tile_y * self.width + tile_x
+                if not occupancy[index] or merged_tile_ids[index] != -1:
+                    continue
+
+                merged_width = 1
+                while (tile_x + merged_width < self.width and occupancy[index + merged_width]
+                       and merged_tile_ids[index + merged_width] == -1):
+                    merged_width += 1
+
+                merged_height = 1
+                while tile_y + merged_height < self.height:
+                    row_index = index + merged_height * self.width
+
+                    if not all(occupancy[row_index + i] and merged_tile_ids[row_index + i] == -1
+                               for i in range(merged_width)):
+                        break
+
+                    merged_height += 1
+
+                merged_tile_id = len(self.merged_tiles)
+                self.merged_tiles.append(pygame.Rect(tile_x * self.TILE_SIZE, tile_y * self.TILE_SIZE,
+                                                     merged_width * self.TILE_SIZE, merged_height * self.TILE_SIZE))
+
+                for row_index in range(index, index + merged_height * self.width, self.width):
+                    merged_tile_ids[row_index:row_index + merged_width] = [merged_tile_id] * merged_width
+
     def _generate_rooms(self, map_data: MapData) -> None:
         """
         Expects the tiles to be already generated.
@@ -96,6 +200,25 @@ class Map:
 
             self.rooms.append(room_tile_keys)
 
+        self.room_masks = [0] * (self.width * self.height)
+
+        for room_id, room_tile_keys in enumerate(self.rooms):
+            room_bit = 1 << room_id
+
+            for tile_x, tile_y in room_tile_keys:
+                if tile_x < self.width and tile_y < self.height:
+                    self.room_masks[tile_y * self.width + tile_x] |= room_bit
+
+    def _generate_static_light_sources(self, map_data: MapData) -> None:
+        self.static_light_sources = []
+
+        for tile_key, tile_offset, brightness, radius in map_data.lights:
+            self.static_light_sources.append(LightSource(
+                tile_key[0] * self.TILE_SIZE + self.TILE_SIZE_2 + tile_offset[0],
+                tile_key[1] * self.TILE_SIZE + self.TILE_SIZE_2 + tile_offset[1],
+                brightness, radius
+            ))
+
     def generate_from(self, map_data: MapData) -> None:
         self.width = map_data.width
         self.height = map_data.height
@@ -106,7 +229,14 @@ class Map:
         self.y_max = self.TILE_SIZE * self.height
 
         self._generate_tiles(map_data)
+        self._merge_tiles()
         self._generate_rooms(map_data)
+        self._generate_static_light_sources(map_data)
+
+        self.flow_field = FlowField(self.occupancy, self.width, self.height)
+
+        self._chunks = OrderedDict()
+        self._chunks_size = 0
 
     def iter_surrounding_tile_keys(self, x: Number, y: Number) -> Generator[_TileKey, None, None]:
         """
@@ -176,7 +306,7 @@ class Map:
 
         tile_keys = []
         for tile_key in self.iter_surrounding_tile_keys(x, y):
-            if tile_key in self.tiles:
+            if self.occupancy[tile_key[1] * self.width + tile_key[0]]:
                 tile_keys.append(tile_key)
 
         return tile_keys
@@ -188,7 +318,7 @@ class Map:
 
         tile_keys = []
         for tile_key in self.iter_surrounding_tile_keys(x, y):
-            if tile_key not in self.tiles:
+            if not self.occupancy[tile_key[1] * self.width + tile_key[0]]:
                 tile_keys.append(tile_key)
         return tile_keys
 
@@ -197,45 +327,81 @@ class Map:
         Given a position, return all tiles that exist surrounding it.
         """
 
-        tile_rectangles = []
-        for tile_key in self.iter_surrounding_tile_keys(x, y):
-            if tile_key in self.tiles:
-                tile_rectangles.append(self.tiles[tile_key])
+        tile_x_base = int(x // self.TILE_SIZE)
+        tile_y_base = int(y // self.TILE_SIZE)
 
-        return tile_rectangles
+        return self._tiles_in_range(tile_x_base - 1, tile_x_base + 2, tile_y_base - 1, tile_y_base + 2)
 
-    def tiles_touching(self, rect: pygame.Rect) -> list[pygame.Rect]:
+    def _tiles_in_range(self, tile_x_min: int, tile_x_max: int, tile_y_min: int, tile_y_max: int) -> list[pygame.Rect]:
         """
-        Given a rectangle, return all tiles that exist touching it.
-
-        Might not work properly if the right or bottom is a negative number.
+        Return all tiles that exist in the range, the max values are exclusive.
+        The range is clipped to the map.
         """
 
-        tile_x_min = int(rect.left // self.TILE_SIZE)
-        tile_x_max = int(rect.right // self.TILE_SIZE) + 1
-
         if tile_x_min < 0:
             tile_x_min = 0
         if tile_x_max >= self.width:
             tile_x_max = self.width
 
-        tile_y_min = int(rect.top // self.TILE_SIZE)
-        tile_y_max = int(rect.bottom // self.TILE_SIZE) + 1
-
+        if tile_y_min < 0:
+            tile_y_min = 0
         if tile_y_max >= self.height:
             tile_y_max = self.height
+
+        occupancy = self.occupancy
+        width = self.width
+
+        rectangles = []
+        for tile_x in range(tile_x_min, tile_x_max):
+            # Step down the column of tiles
+            for index in range(tile_y_min * width + tile_x, tile_y_max * width + tile_x, width):
+                if occupancy[index]:
+                    rectangles.append(self._tile_rects[index])
+
+        return rectangles
+
+    def _merged_tiles_in_range(self, tile_x_min: int, tile_x_max: int,
+                               tile_y_min: int, tile_y_max: int) -> list[pygame.Rect]:
+        """
+        Return the merged tiles covering the tiles that exist in the range, each only once.
+        The max values are exclusive, the range is clipped to the map.
+        """
+
+        if tile_x_min < 0:
+            tile_x_min = 0
+        if tile_x_max >= self.width:
+            tile_x_max = self.width
+
         if tile_y_min < 0:
             tile_y_min = 0
+        if tile_y_max >= self.height:
+            tile_y_max = self.height
 
-        rectangles = []
+        merged_tile_ids = self._merged_tile_ids
+        width = self.width
+
+        found_merged_tile_ids = []
         for tile_x in range(tile_x_min, tile_x_max):
-            for tile_y in range(tile_y_min, tile_y_max):
-                tile_key = (tile_x, tile_y)
+            # Step down the column of tiles
+            for index in range(tile_y_min * width + tile_x, tile_y_max * width + tile_x, width):
+                merged_tile_id = merged_tile_ids[index]
 
-                if tile_key in self.tiles:
-                    rectangles.append(self.tiles[tile_key])
+                if merged_tile_id != -1 and merged_tile_id not in found_merged_tile_ids:
+                    found_merged_tile_ids.append(merged_tile_id)
 
-        return rectangles
+        return [self.merged_tiles[merged_tile_id] for merged_tile_id in found_merged_tile_ids]
+
+    def tiles_touching(self, rect: pygame.Rect) -> list[pygame.Rect]:
+        """
+        Given a rectangle, return the merged tiles covering all tiles that exist touching it.
+        Resolving collisions against the merged tiles gives the same result as against every tile.
+
+        Might not work properly if the right or bottom is a negative number.
+        """
+
+        # Rectangles always have integer coordinates
+        return self._merged_tiles_in_range(rect.left // self.TILE_SIZE, rect.right // self.TILE_SIZE + 1,
+                                           rect.top // self.TILE_SIZE, rect.bottom // self.TILE_SIZE + 1)
 
     def tile_key_for_position(self, position: Coordinates) -> _TileKey:
         """
@@ -245,35 +411,141 @@ class Map:
 
         return int(position[0] // self.TILE_SIZE), int(position[1] // self.TILE_SIZE)
 
+    def room_ids_at(self, tile_key: _TileKey) -> list[int]:
+        """
+        Returns the ids of the rooms the tile is in, empty if none or if the tile is outside the map.
+        """
+
+        tile_x, tile_y = tile_key
+        if tile_x < 0 or tile_y < 0 or tile_x >= self.width or tile_y >= self.height:
+            return []
+
+        room_mask = self.room_masks[tile_y * self.width + tile_x]
+
+        return [room_id for room_id in range(room_mask.bit_length()) if room_mask >> room_id & 1]
+
+    def tile_in_room(self, tile_key: _TileKey, room_id: int) -> bool:
+        """
+        Returns true if the tile is in the room, false if not or if the tile is outside the map.
+        """
+
+        tile_x, tile_y = tile_key
+        if tile_x < 0 or tile_y < 0 or tile_x >= self.width or tile_y >= self.height:
+            return False
+
+        return self.room_masks[tile_y * self.width + tile_x] >> room_id & 1 == 1
+
     def position_in_tile(self, position: Coordinates) -> bool:
         """
         Return true if the given position is inside a tile.
         """
 
-        tile_key = self.tile_key_for_position(position)
+        tile_x = int(position[0] // self.TILE_SIZE)
+        tile_y = int(position[1] // self.TILE_SIZE)
 
-        return tile_key in self.tiles
+        if tile_x < 0 or tile_y < 0 or tile_x >= self.width or tile_y >= self.height:
+            return False
+        return self.occupancy[tile_y * self.width + tile_x] == 1
 
     def tile_for_position(self, position: Coordinates) -> pygame.Rect | None:
         """
         If the position is inside a tile, return the tile, else return None.
         """
 
-        tile_key = self.tile_key_for_position(position)
+        tile_x = int(position[0] // self.TILE_SIZE)
+        tile_y = int(position[1] // self.TILE_SIZE)
+
+        if tile_x < 0 or tile_y < 0 or tile_x >= self.width or tile_y >= self.height:
+            return None
+        return self._tile_rects[tile_y * self.width + tile_x]
+
+    def _chunk_rect(self, chunk_x: int, chunk_y: int) -> pygame.Rect:
+        """
+        The area of the chunk in the world, chunks at the edges are clipped to the map.
+        """
+
+        chunk_size = self.CHUNK_SIZE * self.TILE_SIZE
+
+        return pygame.Rect(chunk_x * chunk_size, chunk_y * chunk_size, chunk_size, chunk_size).clip(
+            pygame.Rect(self.x_min, self.y_min, self.x_max - self.x_min, self.y_max - self.y_min)
+        )
+
+    def _render_chunk(self, chunk_x: int, chunk_y: int, window: pygame.Surface) -> pygame.Surface | None:
+        """
+        Draws the walls of the chunk onto a surface of the same format as the window.
+        Returns None if the chunk has no walls.
+        """
+
+        chunk_rect = self._chunk_rect(chunk_x, chunk_y)
+
+        tile_rects = self._merged_tiles_in_range(chunk_x * self.CHUNK_SIZE, (chunk_x + 1) * self.CHUNK_SIZE,
+                                                 chunk_y * self.CHUNK_SIZE, (chunk_y + 1) * self.CHUNK_SIZE)
+        if not tile_rects:
+            return None
+
+        chunk = pygame.Surface(chunk_rect.size, 0, window)
+        chunk.fill(self.CHUNK_COLOURKEY)
+        chunk.set_colorkey(self.CHUNK_COLOURKEY, pygame.RLEACCEL)
+
+        for tile_rect in tile_rects:
+            pygame.draw.rect(chunk, self.WALL_COLOUR, tile_rect.move(-chunk_rect.x, -chunk_rect.y))
+
+        return chunk
+
+    @staticmethod
+    def _chunk_bytes(chunk: pygame.Surface | None) -> int:
+        if chunk is None:
+            return 0
+
+        return chunk.get_width() * chunk.get_height() * chunk.get_bytesize()
+
+    def _chunk(self, chunk_x: int, chunk_y: int, window: pygame.Surface) -> pygame.Surface | None:
+        """
+        Returns the pre-rendered walls of the chunk, rendering them if they are not cached.
+        The least recently drawn chunks are dropped while the chunks are over the budget.
+        """
+
+        chunk_key = chunk_x, chunk_y
+
+        if chunk_key in self._chunks:
+            self._chunks.move_to_end(chunk_key)
+            return self._chunks[chunk_key]
+
+        chunk = self._render_chunk(chunk_x, chunk_y, window)
 
-        if tile_key in self.tiles:
-            return self.tiles[tile_key]
-        return None
+        self._chunks[chunk_key] = chunk
+        self._chunks_size += self._chunk_bytes(chunk)
+
+        # Never drop the chunk that was just rendered, even if it alone is over the budget
+        while self._chunks_size > self.CHUNK_CACHE_BUDGET and len(self._chunks) > 1:
+            _, dropped_chunk = self._chunks.popitem(last=False)
+            self._chunks_size -= self._chunk_bytes(dropped_chunk)
+
+        return chunk
 
     def draw(self, camera: Camera):
-        display_rect = pygame.Rect(0, 0, self.TILE_SIZE, self.TILE_SIZE)
+        """
+        Blits the visible part of each chunk of pre-rendered walls the camera can see.
+        """
 
-        for tile_rect in self.tiles.values():
-            if not camera.can_see(tile_rect):
-                continue
+        chunk_size = self.CHUNK_SIZE * self.TILE_SIZE
+
+        chunk_x_min = max(camera.rect.left // chunk_size, 0)
+        chunk_x_max = min((camera.rect.right - 1) // chunk_size, (self.width - 1) // self.CHUNK_SIZE)
+        chunk_y_min = max(camera.rect.top // chunk_size, 0)
+        chunk_y_max = min((camera.rect.bottom - 1) // chunk_size, (self.height - 1) // self.CHUNK_SIZE)
+
+        for chunk_x in range(chunk_x_min, chunk_x_max + 1):
+            for chunk_y in range(chunk_y_min, chunk_y_max + 1):
+                chunk = self._chunk(chunk_x, chunk_y, camera.window)
+                if chunk is None:
+                    continue
 
-            display_rect.topleft = tile_rect.topleft
-            camera.convert_rect_to_camera_coordinates(display_rect)
+                chunk_rect = self._chunk_rect(chunk_x, chunk_y)
+                visible_rect = chunk_rect.clip(camera.rect)
 
-            # Used to be coloured (255, 127, 127)
-            pygame.draw.rect(camera.window, (64, 64, 96), display_rect)
+                camera.window.blit(
+                    chunk,
+                    camera.coordinates_to_display_coordinates(visible_rect.topleft),
+                    visible_rect.move(-chunk_rect.x, -chunk_rect.y)
+                )
@@ -1,5 +1,9 @@
+import hashlib
+import mmap
+import os
 import pathlib
-from typing import Generator
+import struct
+from typing import Generator, Iterator
 
 from .Helpers.CommonTypes import IntCoordinates
 from .Helpers.FileReading import read_keys_and_values_from
@@ -8,9 +12,36 @@ _GeneralMapData = dict[str, list[str]]
 _RoomData = tuple[IntCoordinates, IntCoordinates]
 _EnemyData = tuple[str, IntCoordinates, int | None]
 _UpgradeData = tuple[str, IntCoordinates, IntCoordinates]
+_LightData = tuple[IntCoordinates, IntCoordinates, int, int]
+
+_DIGITS = b"0123456789"
+
+_TEXT_TO_TILES = bytes.maketrans(_DIGITS, bytes(range(len(_DIGITS))))
+"""Converts the digits of tile data text to the tile values."""
+_TILES_TO_TEXT = bytes.maketrans(bytes(range(len(_DIGITS))), _DIGITS)
+"""Converts tile values back to the digits of tile data text."""
+_TILES_TO_WALLS = bytes.maketrans(bytes(range(256)), b"0" + b"1" * 255)
+"""Converts tile values to 1 for a wall and 0 for air."""
+
+_BINARY_HEADER = struct.Struct("<6sH32sIIBiiIIIII")
+"""
+Magic, version, source hash, width, height, if there is a player spawn, player spawn tile x and y,
+then the amount of strings, rooms, enemies, upgrades and lights.
+"""
+_BINARY_STRING_LENGTH = struct.Struct("<H")
+_BINARY_ROOM = struct.Struct("<iiii")
+_BINARY_ENEMY = struct.Struct("<Hiii")
+"""Index of the enemy key in the strings, tile x and y, room id or -1 for no room."""
+_BINARY_UPGRADE = struct.Struct("<Hiiii")
+"""Index of the upgrade key in the strings, tile x and y, tile offset x and y."""
+_BINARY_LIGHT = struct.Struct("<iiiiii")
 
 
 class MapData:
+    BINARY_MAGIC: bytes = b"MAPBIN"
+    BINARY_VERSION: int = 1
+    """Changing the binary layout must bump this, so old .mapbin files are compiled again."""
+
     def __init__(self, width: int, height: int):
         """
         Create an empty map data object.
@@ -22,8 +53,14 @@ class MapData:
         self.width: int = width
         self.height: int = height
 
-        self.tiles: list[list[int]] = [[0 for _ in range(self.width)] for _ in range(self.height)]
-        """A 2D array representing walls in the map."""
+        self.path: pathlib.Path | None = None
+        """The file the map data was read from, None if it was not read from a file."""
+
+        self.tiles: bytearray = bytearray(self.width * self.height)
+        """
+        One byte per tile representing walls in the map, row by row.
+        The tile (x, y) is at index y * width + x.
+        """
 
         self.rooms: list[_RoomData] = []
         """
@@ -45,6 +82,12 @@ class MapData:
         Upgrades are represented as their key, the tile they are to spawn in, and additional pixel movements.
         """
 
+        self.lights: list[_LightData] = []
+        """
+        Static lights that never move or change.
+        Lights are represented as the tile they are in, additional pixel movements, their brightness and their radius.
+        """
+
     def __str__(self, pretty: bool = False) -> str:
         tile_wall = "1"
         tile_air = "0"
@@ -53,20 +96,25 @@ class MapData:
             tile_wall = "▉"
             tile_air = " "
 
-        string = f"MapData({self.width}, {self.height})\n"
+        walls_to_text = str.maketrans("10", tile_wall + tile_air)
+
+        lines = [f"MapData({self.width}, {self.height})"]
+        lines += [row.tobytes().translate(_TILES_TO_WALLS).decode().translate(walls_to_text) for row in self.rows()]
+
+        return "\n".join(lines)
 
-        for i in range(self.height):
-            string += "".join([tile_wall if tile else tile_air for tile in self.tiles[i]])
-            string += "\n"
+    def row(self, y: int) -> memoryview:
+        """A view of the tiles of a row, changing it changes the map data."""
 
-        # Remove the unneeded trailing newline
-        return string[:-1]
+        return memoryview(self.tiles)[y * self.width:(y + 1) * self.width]
 
-    def rows(self) -> Generator[list[int], None, None]:
-        """Iterate over the rows of the map data."""
+    def rows(self) -> Generator[memoryview, None, None]:
+        """Iterate over views of the rows of the map data."""
+
+        tiles = memoryview(self.tiles)
 
         for y in range(self.height):
-            yield self.tiles[y]
+            yield tiles[y * self.width:(y + 1) * self.width]
 
     @staticmethod
     def _process_width_and_height(map_data_keys_and_values: _GeneralMapData) -> tuple[int, int]:
@@ -103,12 +151,19 @@ class MapData:
         if len(data) != empty_map_data.height:
             raise ValueError(f"Tile Data height {len(data)} does not match expected height {empty_map_data.height}.")
 
-        for row_index, row in enumerate(data):
+        for row in data:
             if len(row) != empty_map_data.width:
                 raise ValueError(f"Tile Data width {len(row)} does not match expected width {empty_map_data.width}.")
 
-            for column_index in range(empty_map_data.width):
-                empty_map_data.tiles[row_index][column_index] = int(row[column_index])
+        try:
+            tile_text = "".join(data).encode("ascii")
+        except UnicodeEncodeError:
+            raise ValueError("Tile Data must only contain the digits 0 to 9")
+
+        if tile_text.translate(None, _DIGITS):
+            raise ValueError("Tile Data must only contain the digits 0 to 9")
+
+        empty_map_data.tiles[:] = tile_text.translate(_TEXT_TO_TILES)
 
     @staticmethod
     def _process_player_spawn_into(map_data_keys_and_values: _GeneralMapData, empty_map_data: "MapData") -> None:
@@ -239,19 +294,33 @@ class MapData:
             empty_map_data.upgrades.append(MapData._process_upgrade(upgrade_str))
 
     @staticmethod
-    def from_file(path: pathlib.Path) -> "MapData":
-        """
-        Creates a MapData object from a .mapdata file.
+    def _process_light(light_str: str) -> _LightData:
+        try:
+            tile_x, tile_y, tile_offset_x, tile_offset_y, brightness, radius = map(int, light_str.split(","))
+        except ValueError:
+            raise ValueError(f"Could not parse light string '{light_str}', "
+                             f"expected as 'TILE_X,TILE_Y,TILE_OFFSET_X,TILE_OFFSET_Y,BRIGHTNESS,RADIUS'")
 
-        :param path: The path to the map data file.
-        """
+        return (tile_x, tile_y), (tile_offset_x, tile_offset_y), brightness, radius
 
-        if not path.is_file():
-            raise FileNotFoundError(f"File {path} does not exist.")
+    @staticmethod
+    def _process_lights_into(map_data_keys_and_values: _GeneralMapData, empty_map_data: "MapData") -> None:
+        if empty_map_data.lights:
+            raise ValueError(f"When asked to process lights, given map data object already contains lights")
 
-        if not path.suffix == ".mapdata":
-            raise ValueError("File must be an .mapdata file.")
+        # Lights are completely optional
+        if "LIGHTS" not in map_data_keys_and_values:
+            return
+
+        data = map_data_keys_and_values["LIGHTS"]
+        if not data:
+            raise ValueError("Found no data for key 'LIGHTS'")
+
+        for light_str in data:
+            empty_map_data.lights.append(MapData._process_light(light_str))
 
+    @staticmethod
+    def _from_text_file(path: pathlib.Path) -> "MapData":
         map_data_keys_and_values = read_keys_and_values_from(path)
 
         map_data = MapData(*MapData._process_width_and_height(map_data_keys_and_values))
@@ -260,6 +329,217 @@ class MapData:
         MapData._process_rooms_into(map_data_keys_and_values, map_data)
         MapData._process_enemies_into(map_data_keys_and_values, map_data)
         MapData._process_upgrades_into(map_data_keys_and_values, map_data)
+        MapData._process_lights_into(map_data_keys_and_values, map_data)
+
+        return map_data
+
+    def to_file(self, path: pathlib.Path) -> None:
+        """
+        Writes the map data to a .mapdata file that from_file reads back the same.
+        Optional sections are left out when empty.
+
+        :param path: The path to write to.
+        """
+
+        with path.open("w", newline="\n") as f:
+            f.write(f":DIMENSIONS\n{self.width},{self.height}\n")
+
+            f.write(":TILE_DATA\n")
+            for row in self.rows():
+                f.write(row.tobytes().translate(_TILES_TO_TEXT).decode("ascii"))
+                f.write("\n")
+
+            if self.player_spawn is not None:
+                f.write(f":PLAYER_SPAWN\n{self.player_spawn[0]},{self.player_spawn[1]}\n")
+
+            if self.rooms:
+                f.write(":ROOMS\n")
+                f.writelines(f"{x1},{y1},{x2},{y2}\n" for (x1, y1), (x2, y2) in self.rooms)
+
+            if self.enemies:
+                f.write(":ENEMIES\n")
+                f.writelines(f"{enemy_key},{tile_x},{tile_y},{room_id if room_id is not None else ''}\n"
+                             for enemy_key, (tile_x, tile_y), room_id in self.enemies)
+
+            if self.upgrades:
+                f.write(":UPGRADES\n")
+                f.writelines(f"{upgrade_key},{tile_x},{tile_y},{tile_offset_x},{tile_offset_y}\n"
+                             for upgrade_key, (tile_x, tile_y), (tile_offset_x, tile_offset_y) in self.upgrades)
+
+            if self.lights:
+                f.write(":LIGHTS\n")
+                f.writelines(f"{tile_x},{tile_y},{tile_offset_x},{tile_offset_y},{brightness},{radius}\n"
+                             for (tile_x, tile_y), (tile_offset_x, tile_offset_y), brightness, radius in self.lights)
+
+    def to_binary_file(self, path: pathlib.Path, source_hash: bytes = bytes(32)) -> None:
+        """
+        Writes the map data to a .mapbin file.
+        The header is followed by one byte per tile row by row, then the strings, rooms, enemies, upgrades and lights.
+        The file is written next to the path first and then moved into place, so it is never left half written.
+
+        :param path: The path to write to.
+        :param source_hash: The sha256 of the .mapdata file it was compiled from, zeros if none.
+        """
+
+        strings = sorted({enemy_key for enemy_key, *_ in self.enemies}
+                         | {upgrade_key for upgrade_key, *_ in self.upgrades})
+        string_indices = {string: index for index, string in enumerate(strings)}
+
+        has_player_spawn = self.player_spawn is not None
+        player_spawn = self.player_spawn if has_player_spawn else (0, 0)
+
+        parts = [
+            _BINARY_HEADER.pack(self.BINARY_MAGIC, self.BINARY_VERSION, source_hash, self.width, self.height,
+                                has_player_spawn, *player_spawn,
+                                len(strings), len(self.rooms), len(self.enemies), len(self.upgrades), len(self.lights))
+        ]
+        parts.append(bytes(self.tiles))
+
+        for string in strings:
+            encoded_string = string.encode()
+            parts.append(_BINARY_STRING_LENGTH.pack(len(encoded_string)))
+            parts.append(encoded_string)
+
+        parts += [_BINARY_ROOM.pack(*corner_1, *corner_2) for corner_1, corner_2 in self.rooms]
+        parts += [_BINARY_ENEMY.pack(string_indices[enemy_key], *tile, room_id if room_id is not None else -1)
+                  for enemy_key, tile, room_id in self.enemies]
+        parts += [_BINARY_UPGRADE.pack(string_indices[upgrade_key], *tile, *tile_offset)
+                  for upgrade_key, tile, tile_offset in self.upgrades]
+        parts += [_BINARY_LIGHT.pack(*tile, *tile_offset, brightness, radius)
+                  for tile, tile_offset, brightness, radius in self.lights]
+
+        temporary_path = path.with_name(path.name + ".tmp")
+        try:
+            temporary_path.write_bytes(b"".join(parts))
+            os.replace(temporary_path, path)
+        except OSError:
+            temporary_path.unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def _binary_source_hash(path: pathlib.Path) -> bytes | None:
+        """
+        Returns the source hash of a .mapbin file, None if it is missing or not of the current version.
+        """
+
+        try:
+            with path.open("rb") as f:
+                header = f.read(_BINARY_HEADER.size)
+        except OSError:
+            return None
+
+        if len(header) != _BINARY_HEADER.size:
+            return None
+
+        magic, version, source_hash, *_ = _BINARY_HEADER.unpack(header)
+        if magic != MapData.BINARY_MAGIC or version != MapData.BINARY_VERSION:
+            return None
+
+        return source_hash
+
+    @staticmethod
+    def from_binary_file(path: pathlib.Path) -> "MapData":
+        """
+        Creates a MapData object from a .mapbin file.
+        The file is memory mapped and the tile grid is copied in one go, with no work per tile.
+
+        :param path: The path to the binary map data file.
+        """
+
+        with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if len(data) < _BINARY_HEADER.size:
+                raise ValueError(f"File {path} is too short to be a .mapbin file")
+
+            (magic, version, _, width, height, has_player_spawn, player_spawn_x, player_spawn_y,
+             string_count, room_count, enemy_count, upgrade_count, light_count) = _BINARY_HEADER.unpack_from(data)
+
+            if magic != MapData.BINARY_MAGIC:
+                raise ValueError(f"File {path} is not a .mapbin file")
+            if version != MapData.BINARY_VERSION:
+                raise ValueError(f"File {path} is version {version}, expected version {MapData.BINARY_VERSION}")
+
+            map_data = MapData(0, 0)
+            map_data.width = width
+            map_data.height = height
+
+            offset = _BINARY_HEADER.size
+            map_data.tiles = bytearray(data[offset:offset + width * height])
+            offset += width * height
+
+            if has_player_spawn:
+                map_data.player_spawn = player_spawn_x, player_spawn_y
+
+            strings = []
+            for _ in range(string_count):
+                string_length, = _BINARY_STRING_LENGTH.unpack_from(data, offset)
+                offset += _BINARY_STRING_LENGTH.size
+                strings.append(data[offset:offset + string_length].decode())
+                offset += string_length
+
+            def records(record_struct: struct.Struct, count: int) -> Iterator[tuple]:
+                nonlocal offset
+                start = offset
+                offset += record_struct.size * count
+                return record_struct.iter_unpack(data[start:offset])
+
+            map_data.rooms = [((x1, y1), (x2, y2)) for x1, y1, x2, y2 in records(_BINARY_ROOM, room_count)]
+            map_data.enemies = [(strings[string_index], (tile_x, tile_y), room_id if room_id != -1 else None)
+                                for string_index, tile_x, tile_y, room_id in records(_BINARY_ENEMY, enemy_count)]
+            map_data.upgrades = [(strings[string_index], (tile_x, tile_y), (tile_offset_x, tile_offset_y))
+                                 for string_index, tile_x, tile_y, tile_offset_x, tile_offset_y
+                                 in records(_BINARY_UPGRADE, upgrade_count)]
+            map_data.lights = [((tile_x, tile_y), (tile_offset_x, tile_offset_y), brightness, radius)
+                               for tile_x, tile_y, tile_offset_x, tile_offset_y, brightness, radius
+                               in records(_BINARY_LIGHT, light_count)]
+
+            if offset != len(data):
+                raise ValueError(f"File {path} is {len(data)} bytes, expected {offset}")
+
+        map_data.path = path
+
+        return map_data
+
+    @staticmethod
+    def from_file(path: pathlib.Path) -> "MapData":
+        """
+        Creates a MapData object from a .mapdata or .mapbin file.
+
+        A .mapdata file is compiled to a .mapbin file next to it the first time it is read.
+        Later reads load the .mapbin file instead, for as long as the .mapdata file is unchanged.
+
+        :param path: The path to the map data file.
+        """
+
+        if not path.is_file():
+            raise FileNotFoundError(f"File {path} does not exist.")
+
+        if path.suffix == ".mapbin":
+            return MapData.from_binary_file(path)
+
+        if not path.suffix == ".mapdata":
+            raise ValueError("File must be an .mapdata or .mapbin file.")
+
+        source_hash = hashlib.sha256(path.read_bytes()).digest()
+        binary_path = path.with_suffix(".mapbin")
+
+        map_data = None
+        if MapData._binary_source_hash(binary_path) == source_hash:
+            try:
+                map_data = MapData.from_binary_file(binary_path)
+            except (OSError, ValueError, struct.error):
+                # A truncated or unreadable cache is compiled again
+                pass
+
+        if map_data is None:
+            map_data = MapData._from_text_file(path)
+
+            try:
+                map_data.to_binary_file(binary_path, source_hash)
+            except OSError:
+                # The cache is only an optimisation, some platforms (like the browser) cannot write it
+                pass
+
+        map_data.path = path
 
         return map_data
 
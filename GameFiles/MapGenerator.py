@@ -0,0 +1,141 @@
+import random
+
+from .Helpers.CommonTypes import IntCoordinates
+from .MapData import MapData
+
+_Room = tuple[int, int, int, int]
+
+
+class MapGenerator:
+    ROOM_SIZE_MIN: int = 3
+    """The smallest width and height of a room, in tiles."""
+    ROOM_SIZE_MAX: int = 10
+    """The largest width and height of a room, in tiles."""
+
+    ROOM_PLACEMENT_ATTEMPTS: int = 100
+    """How many random places are tried for each room before giving up on it."""
+
+    ENEMY_KEYS: tuple[str, ...] = ("stalker",)
+    """The enemies that are placed, chosen from at random."""
+
+    UPGRADE_KEYS: tuple[str, ...] = (
+        "u_direct_damage", "u_exploded_potion_lifespan", "u_light_radius", "u_throw_velocity"
+    )
+    """The upgrades that are placed, chosen from at random."""
+
+    def __init__(self, seed: int | None = None):
+        """
+        Generates random maps of rectangular rooms joined by corridors.
+        The same seed always generates the same maps, in the same order.
+
+        :param seed: The seed of the random number generator, None for a random seed.
+        """
+
+        self.random: random.Random = random.Random(seed)
+
+    def _place_rooms(self, width: int, height: int, room_count: int) -> list[_Room]:
+        """
+        Places up to the given amount of rooms at random as (x, y, x_end, y_end), with walls between each of them.
+        Fewer rooms are placed when there is no space left for them.
+        """
+
+        rooms: list[_Room] = []
+
+        for _ in range(room_count):
+            for _ in range(self.ROOM_PLACEMENT_ATTEMPTS):
+                room_width = self.random.randint(self.ROOM_SIZE_MIN, min(self.ROOM_SIZE_MAX, width - 2))
+                room_height = self.random.randint(self.ROOM_SIZE_MIN, min(self.ROOM_SIZE_MAX, height - 2))
+
+                x = self.random.randint(1, width - 1 - room_width)
+                y = self.random.randint(1, height - 1 - room_height)
+                room = x, y, x + room_width, y + room_height
+
+                # Keep a wall between rooms
+                if all(room[0] > other[2] or other[0] > room[2] or room[1] > other[3] or other[1] > room[3]
+                       for other in rooms):
+                    rooms.append(room)
+                    break
+
+        return rooms
+
+    @staticmethod
+    def _carve(map_data: MapData, x: int, y: int, x_end: int, y_end: int) -> None:
+        """
+        Empties the tiles from (x, y) up to but not including (x_end, y_end).
+        """
+
+        for tile_y in range(y, y_end):
+            map_data.tiles[tile_y * map_data.width + x:tile_y * map_data.width + x_end] = bytes(x_end - x)
+
+    def _carve_corridor(self, map_data: MapData, start: IntCoordinates, end: IntCoordinates) -> None:
+        """
+        Empties an L shaped corridor one tile wide between the tiles, going horizontally or vertically first at random.
+        """
+
+        (start_x, start_y), (end_x, end_y) = start, end
+
+        corner = (end_x, start_y) if self.random.random() < 0.5 else (start_x, end_y)
+
+        for (x, y), (other_x, other_y) in ((start, corner), (corner, end)):
+            self._carve(map_data, min(x, other_x), min(y, other_y), max(x, other_x) + 1, max(y, other_y) + 1)
+
+    def _random_empty_tile(self, map_data: MapData, room: _Room) -> IntCoordinates:
+        x, y, x_end, y_end = room
+
+        while True:
+            tile = self.random.randrange(x, x_end), self.random.randrange(y, y_end)
+
+            if not map_data.tiles[tile[1] * map_data.width + tile[0]]:
+                return tile
+
+    def generate(self, width: int, height: int, room_count: int,
+                 enemy_density: float = 0.05, upgrade_count: int = 4) -> MapData:
+        """
+        Generates a map surrounded by walls, with rooms joined to the one before them by corridors.
+        The player spawns in the middle of the first room, and enemies are constrained to the other rooms.
+        Write it to a .mapdata file with MapData.to_file.
+
+        :param width: The width of the map in tiles.
+        :param height: The height of the map in tiles.
+        :param room_count: The amount of rooms to place, fewer are placed if they do not fit.
+        :param enemy_density: The average amount of enemies per empty tile of each room, other than the first.
+        :param upgrade_count: The amount of upgrades to place in random rooms.
+        """
+
+        if width < self.ROOM_SIZE_MIN + 2 or height < self.ROOM_SIZE_MIN + 2:
+            raise ValueError(f"A map of {width}x{height} tiles is too small to fit a room and its walls")
+        if room_count < 1:
+            raise ValueError(f"A map needs at least one room, got {room_count}")
+        if enemy_density < 0:
+            raise ValueError(f"Enemy density can not be negative, got {enemy_density}")
+
+        map_data = MapData(width, height)
+        map_data.tiles[:] = b"\x01" * (width * height)
+
+        rooms = self._place_rooms(width, height, room_count)
+
+        for room in rooms:
+            self._carve(map_data, *room)
+
+        room_centers = [((x + x_end) // 2, (y + y_end) // 2) for x, y, x_end, y_end in rooms]
+        for room_center, previous_room_center in zip(room_centers[1:], room_centers):
+            self._carve_corridor(map_data, previous_room_center, room_center)
+
+        map_data.rooms = [((x, y), (x_end - 1, y_end - 1)) for x, y, x_end, y_end in rooms]
+        map_data.player_spawn = room_centers[0]
+
+        for room_id, room in enumerate(rooms[1:], start=1):
+            x, y, x_end, y_end = room
+            enemy_count = int(enemy_density * (x_end - x) * (y_end - y) + self.random.random())
+
+            for _ in range(enemy_count):
+                map_data.enemies.append(
+                    (self.random.choice(self.ENEMY_KEYS), self._random_empty_tile(map_data, room), room_id)
+                )
+
+        for _ in range(upgrade_count):
+            room = self.random.choice(rooms)
+            map_data.upgrades.append((self.random.choice(self.UPGRADE_KEYS), self._random_empty_tile(map_data, room),
+                                      (0, 0)))
+
+        return map_data
@@ -1,15 +1,42 @@
+import math
 import pathlib
+from dataclasses import dataclass
 from typing import Any, Literal
 
+import numpy
 import pygame
 
 from .Camera import Camera
-from .Helpers import iter_list_reverse
-from .Helpers.FileReading import next_line_with_data
-from .Particle import Particle
+from .Helpers.FileReading import lines_with_data, next_line_with_data
+from .SpriteAtlas import SpriteAtlas
+from .SpriteBatch import SpriteBatch
 
-_ParticleDataKeys = Literal["KEY", "SIZE", "IS_SQUARE", "COLOUR"]
-_ParticleEntryKeys = Literal["SPRITE"]
+_ParticleDataKeys = Literal["KEY", "SIZE", "IS_SQUARE", "COLOUR", "PRIORITY",
+                            "EMIT_COUNT", "EMIT_SPEED", "EMIT_SPREAD", "EMIT_LIFESPAN", "EMIT_JITTER"]
+_ParticleEntryKeys = Literal["SPRITE", "EMITTER", "PRIORITY"]
+
+_EMITTER_KEYS = ("EMIT_COUNT", "EMIT_SPEED", "EMIT_SPREAD", "EMIT_LIFESPAN", "EMIT_JITTER")
+_OPTIONAL_KEYS = ("PRIORITY",) + _EMITTER_KEYS
+
+
+@dataclass(frozen=True)
+class _Emitter:
+    count: int
+    """The amount of particles in a burst."""
+
+    speed_min: int | float
+    speed_max: int | float
+    speed_is_integer: bool
+    """If the speeds are whole numbers from the min to the max inclusive, rather than any number in between."""
+
+    spread: float
+    """The angle the burst is spread over, in radians, centered on the angle it is emitted at."""
+
+    lifespan_min: int
+    lifespan_max: int
+
+    jitter: float
+    """The most that is added to or taken from each of the x and y velocities at random."""
 
 
 class ParticleHandler:
@@ -18,11 +45,98 @@ class ParticleHandler:
     A dictionary of particle key to data for that key. 
     """
 
+    SPRITE_ATLAS: SpriteAtlas = SpriteAtlas()
+    """The atlas the particle sprites are packed into, its pages have per-pixel alpha like the particle sprites."""
+
+    INITIAL_CAPACITY: int = 1024
+    """How many particles the arrays hold before they have to grow, they double in size each time."""
+
+    PARTICLE_BUDGET: int = 5000
+    """The most particles that can be alive at once, new particles past it are dropped."""
+
+    DEFAULT_PRIORITY: int = 1
+    """The priority of particles whose file has no PRIORITY entry."""
+
+    PRIORITY_DECIMATION_START: tuple[float, ...] = (0.25, 0.5, 0.75)
+    """
+    The fraction of the budget at which spawns of each priority, starting from 0, begin to be decimated.
+    Past it, the share of their particles that are kept falls linearly to none at the full budget.
+    Priorities past the end of this are never decimated, only dropped when the budget is full.
+    """
+
+    MIN_LIFESPAN_SCALE: float = 0.25
+    """The lifespans of decimated spawns are shortened along with their count, down to this fraction."""
+
+    OFFSCREEN_MARGIN: int = 128
+    """How far outside the camera particles are still treated as on screen, in pixels."""
+
+    OFFSCREEN_AGING: int = 3
+    """How many frames of lifespan particles outside the camera lose each frame."""
+
     def __init__(self):
-        self.particles: list[Particle] = []
+        """
+        Particles are kept as a structure of arrays, one NumPy array per property, indexed by particle.
+        Moving, removing and culling them is done for every particle at once, and they are drawn with one sprite batch.
+        """
+
+        self.count: int = 0
+        """The amount of live particles, the first count entries of each array."""
+
+        self._x: numpy.ndarray = numpy.zeros(self.INITIAL_CAPACITY, dtype=numpy.float64)
+        self._y: numpy.ndarray = numpy.zeros(self.INITIAL_CAPACITY, dtype=numpy.float64)
+        self._vx: numpy.ndarray = numpy.zeros(self.INITIAL_CAPACITY, dtype=numpy.float64)
+        self._vy: numpy.ndarray = numpy.zeros(self.INITIAL_CAPACITY, dtype=numpy.float64)
+        self._lifespans: numpy.ndarray = numpy.zeros(self.INITIAL_CAPACITY, dtype=numpy.int32)
+        self._sprite_ids: numpy.ndarray = numpy.zeros(self.INITIAL_CAPACITY, dtype=numpy.int32)
+
+        self._pending: list[tuple[float, float, float, float, int, int]] = []
+        """Particles created since the last update, as (x, y, vx, vy, lifespan, sprite id)."""
+
+        self._sprites: list[pygame.Surface] = []
+        """The sprite of each sprite id."""
+        self._sprite_widths: numpy.ndarray = numpy.zeros(0, dtype=numpy.int64)
+        self._sprite_heights: numpy.ndarray = numpy.zeros(0, dtype=numpy.int64)
+        self._sprite_ids_by_key: dict[str, int] = {}
+
+        self.sprite_batch: SpriteBatch = SpriteBatch()
+
+        self._random: numpy.random.Generator = numpy.random.default_rng()
+        """Generates the bursts of emitters."""
+
+        self.budget: int = self.PARTICLE_BUDGET
+        """The most particles that can be alive at once, see PARTICLE_BUDGET."""
+
+        self._view_rect: pygame.Rect | None = None
+        """The area of the world last drawn, grown by the off-screen margin, None before the first draw."""
+
+        self.spawned_count: int = 0
+        """The amount of particles created since the counters were last reset."""
+        self.decimated_count: int = 0
+        """The amount of particles dropped to stay under the budget since the counters were last reset."""
+        self.culled_count: int = 0
+        """The amount of particles of bursts too far off-screen to be seen since the counters were last reset."""
 
     def clear_particles(self) -> None:
-        self.particles = []
+        self.count = 0
+        self._pending = []
+        self._view_rect = None
+
+    def reset_counters(self) -> None:
+        self.spawned_count = 0
+        self.decimated_count = 0
+        self.culled_count = 0
+
+    def live_counts(self) -> dict[str, int]:
+        """
+        Returns the amount of live particles of each particle key that has any, including those created this frame.
+        """
+
+        counts = numpy.bincount(self._sprite_ids[:self.count], minlength=len(self._sprites)).tolist()
+        for particle in self._pending:
+            counts[particle[5]] += 1
+
+        return {particle_key: counts[sprite_id] for particle_key, sprite_id in self._sprite_ids_by_key.items()
+                if counts[sprite_id]}
 
     @staticmethod
     def _read_particle_data(particle_file_path: pathlib.Path) -> dict[_ParticleDataKeys, ...]:
@@ -66,10 +180,80 @@ class ParticleHandler:
             except ValueError:
                 raise ValueError(f"Expected line in the format 'r,g,b,a', got '{line}'")
 
+            # Read the optional priority and emitter entries, in any order
+            for line in lines_with_data(particle_file):
+                if line not in _OPTIONAL_KEYS:
+                    raise ValueError(f"Expected one of {', '.join(_OPTIONAL_KEYS)}, got '{line}'")
+                if line in particle_data:
+                    raise ValueError(f"Found '{line}' more than once")
+
+                value = next_line_with_data(particle_file)
+                if value is None:
+                    raise ValueError(f"Found no data for '{line}'")
+
+                particle_data[line] = value
+
         # Expected type 'dict[Literal["KEY", "SIZE", "IS_SQUARE", "COLOUR"], Any]',
         #  got 'dict[str, str | int | tuple[int, int, int]]' instead
         return particle_data  # NOQA: see above comment
 
+    @staticmethod
+    def _process_emitter(particle_data: dict[_ParticleDataKeys, Any]) -> _Emitter | None:
+        """
+        Returns the emitter described by the particle data, None if it has no emitter entries.
+        EMIT_COUNT, EMIT_SPEED and EMIT_LIFESPAN are required, EMIT_SPREAD defaults to 360 and EMIT_JITTER to 0.
+        """
+
+        if not any(key in particle_data for key in _EMITTER_KEYS):
+            return None
+
+        for key in ("EMIT_COUNT", "EMIT_SPEED", "EMIT_LIFESPAN"):
+            if key not in particle_data:
+                raise ValueError(f"Particle '{particle_data['KEY']}' has emitter entries but no '{key}'")
+
+        try:
+            count = int(particle_data["EMIT_COUNT"])
+        except ValueError:
+            raise ValueError(f"Expected some integer for 'EMIT_COUNT', got '{particle_data['EMIT_COUNT']}'")
+
+        speed = particle_data["EMIT_SPEED"]
+        speed_is_integer = "." not in speed
+        try:
+            speed_min, speed_max = map(int if speed_is_integer else float, speed.split(","))
+        except ValueError:
+            raise ValueError(f"Expected 'EMIT_SPEED' in the format 'min,max', got '{speed}'")
+
+        lifespan = particle_data["EMIT_LIFESPAN"]
+        try:
+            lifespan_min, lifespan_max = map(int, lifespan.split(","))
+        except ValueError:
+            raise ValueError(f"Expected 'EMIT_LIFESPAN' in the format 'min,max' as integers, got '{lifespan}'")
+
+        try:
+            spread = math.radians(float(particle_data.get("EMIT_SPREAD", 360)))
+            jitter = float(particle_data.get("EMIT_JITTER", 0))
+        except ValueError:
+            raise ValueError(f"Expected a number for 'EMIT_SPREAD' and 'EMIT_JITTER' of '{particle_data['KEY']}'")
+
+        if count < 0 or speed_min > speed_max or lifespan_min > lifespan_max:
+            raise ValueError(f"Emitter of '{particle_data['KEY']}' has a negative count or a range with min above max")
+
+        return _Emitter(count, speed_min, speed_max, speed_is_integer, spread, lifespan_min, lifespan_max, jitter)
+
+    def _process_priority(self, particle_data: dict[_ParticleDataKeys, Any]) -> int:
+        if "PRIORITY" not in particle_data:
+            return self.DEFAULT_PRIORITY
+
+        try:
+            priority = int(particle_data["PRIORITY"])
+        except ValueError:
+            raise ValueError(f"Expected some integer for 'PRIORITY', got '{particle_data['PRIORITY']}'")
+
+        if priority < 0:
+            raise ValueError(f"Priority of '{particle_data['KEY']}' can not be negative, got {priority}")
+
+        return priority
+
     def _construct_particle_entry_from_data(self, particle_data: dict[_ParticleDataKeys, Any]) -> None:
         sprite_size: int
         if particle_data["IS_SQUARE"]:
@@ -90,7 +274,9 @@ class ParticleHandler:
         key = particle_data["KEY"]
 
         particle_entry: dict[_ParticleEntryKeys, Any] = {
-            "SPRITE": sprite
+            "SPRITE": self.SPRITE_ATLAS.add(key, sprite),
+            "EMITTER": self._process_emitter(particle_data),
+            "PRIORITY": self._process_priority(particle_data)
         }
 
         self.PARTICLE_DATA[key] = particle_entry
@@ -104,38 +290,250 @@ class ParticleHandler:
 
             self._construct_particle_entry_from_data(particle_data)
 
+    def _sprite_id(self, particle_key: str) -> int:
+        """
+        Returns the sprite id of the particle key, giving it one the first time it is used.
+        """
+
+        sprite_id = self._sprite_ids_by_key.get(particle_key)
+        if sprite_id is not None:
+            return sprite_id
+
+        if particle_key not in self.PARTICLE_DATA:
+            raise ValueError(f"Particle key {particle_key} cannot be found in loaded particle data")
+
+        sprite = self.PARTICLE_DATA[particle_key]["SPRITE"]
+
+        sprite_id = len(self._sprites)
+        self._sprites.append(sprite)
+        self._sprite_widths = numpy.append(self._sprite_widths, sprite.get_width())
+        self._sprite_heights = numpy.append(self._sprite_heights, sprite.get_height())
+        self._sprite_ids_by_key[particle_key] = sprite_id
+
+        return sprite_id
+
+    def _keep_fraction(self, particle_key: str, live_count: int) -> float:
+        """
+        Returns the share of new particles of the key that are kept, from the live particles and its priority.
+        """
+
+        if live_count >= self.budget:
+            return 0
+
+        priority = self.PARTICLE_DATA[particle_key]["PRIORITY"]
+        if priority >= len(self.PRIORITY_DECIMATION_START):
+            return 1
+
+        decimation_start = self.budget * self.PRIORITY_DECIMATION_START[priority]
+        if live_count <= decimation_start:
+            return 1
+
+        return max(0.0, (self.budget - live_count) / (self.budget - decimation_start))
+
+    def _lifespan_scale(self, keep_fraction: float) -> float:
+        return self.MIN_LIFESPAN_SCALE + (1 - self.MIN_LIFESPAN_SCALE) * keep_fraction
+
     def create_particle(self, particle_key: str,
                         x: int | float, y: int | float,
                         vx: int | float, vy: int | float,
                         lifespan: int) -> None:
         """
         Create a particle of type `particle_key` at the given coordinates with the given velocity.
+        It may be dropped, or live for less time, when there are too many particles, see PARTICLE_BUDGET.
         """
 
-        if particle_key not in self.PARTICLE_DATA:
-            raise ValueError(f"Particle key {particle_key} cannot be found in loaded particle data")
+        sprite_id = self._sprite_id(particle_key)
+        self.spawned_count += 1
+
+        keep_fraction = self._keep_fraction(particle_key, self.count + len(self._pending))
+        if keep_fraction < 1:
+            if self._random.random() >= keep_fraction:
+                self.decimated_count += 1
+                return
+
+            lifespan = max(1, int(lifespan * self._lifespan_scale(keep_fraction)))
+
+        self._pending.append((x, y, vx, vy, lifespan, sprite_id))
+
+    def _reserve(self, count: int) -> None:
+        """
+        Grows the arrays so they can hold the given amount of particles.
+        """
+
+        capacity = len(self._x)
+        if count <= capacity:
+            return
+
+        while capacity < count:
+            capacity *= 2
+
+        for name in ("_x", "_y", "_vx", "_vy", "_lifespans", "_sprite_ids"):
+            array = getattr(self, name)
+            grown_array = numpy.zeros(capacity, dtype=array.dtype)
+            grown_array[:self.count] = array[:self.count]
+            setattr(self, name, grown_array)
+
+    def _add_particles(self, x: numpy.ndarray | float, y: numpy.ndarray | float,
+                       vx: numpy.ndarray, vy: numpy.ndarray, lifespans: numpy.ndarray,
+                       sprite_ids: numpy.ndarray | int) -> None:
+        """
+        Adds particles to the end of the arrays, one per velocity.
+        """
+
+        start = self.count
+        end = start + len(vx)
+        self._reserve(end)
+
+        self._x[start:end] = x
+        self._y[start:end] = y
+        self._vx[start:end] = vx
+        self._vy[start:end] = vy
+        self._lifespans[start:end] = lifespans
+        self._sprite_ids[start:end] = sprite_ids
+
+        self.count = end
+
+    def _add_pending_particles(self) -> None:
+        if not self._pending:
+            return
+
+        pending = numpy.array(self._pending, dtype=numpy.float64)
+        self._pending = []
+
+        self._add_particles(pending[:, 0], pending[:, 1], pending[:, 2], pending[:, 3], pending[:, 4], pending[:, 5])
+
+    def emit(self, particle_key: str, x: int | float, y: int | float,
+             angle: float = 0, speed_scale: float = 1, count: int | None = None) -> None:
+        """
+        Creates a burst of particles of type `particle_key` at the given coordinates, as described by its emitter.
+        Every particle of the burst is generated at once.
+        Bursts too far off-screen to be seen are skipped, and when there are too many particles
+        the burst has fewer particles that live for less time, see PARTICLE_BUDGET.
 
-        self.particles.append(Particle(x, y, vx, vy, lifespan, self.PARTICLE_DATA[particle_key]["SPRITE"]))
+        :param angle: The direction the burst is centered on, in radians.
+        :param speed_scale: Multiplies the speed of every particle.
+        :param count: The amount of particles, None for the count of the emitter.
+        """
+
+        sprite_id = self._sprite_id(particle_key)
+
+        emitter: _Emitter | None = self.PARTICLE_DATA[particle_key]["EMITTER"]
+        if emitter is None:
+            raise ValueError(f"Particle key {particle_key} has no emitter")
+
+        if count is None:
+            count = emitter.count
+
+        random = self._random
+        self.spawned_count += count
+
+        # Skip bursts that can not reach the area that was last drawn
+        if self._view_rect is not None:
+            reach = int((emitter.speed_max * speed_scale + emitter.jitter * 2) * emitter.lifespan_max)
+            if not self._view_rect.inflate(reach * 2, reach * 2).collidepoint(x, y):
+                self.culled_count += count
+                return
+
+        live_count = self.count + len(self._pending)
+        lifespan_scale = 1
+        keep_fraction = self._keep_fraction(particle_key, live_count)
+        if keep_fraction < 1 or live_count + count > self.budget:
+            # Round at random, so small bursts emitted every frame still keep their share on average
+            kept_count = int(count * keep_fraction + random.random())
+            kept_count = max(0, min(kept_count, self.budget - live_count))
+
+            self.decimated_count += count - kept_count
+            count = kept_count
+            lifespan_scale = self._lifespan_scale(keep_fraction)
+
+        if count == 0:
+            return
+
+        angles = angle + random.uniform(-emitter.spread / 2, emitter.spread / 2, count)
+
+        if emitter.speed_is_integer:
+            speeds = random.integers(emitter.speed_min, emitter.speed_max, size=count, endpoint=True) * speed_scale
+        else:
+            speeds = random.uniform(emitter.speed_min, emitter.speed_max, count) * speed_scale
+
+        vx = numpy.cos(angles) * speeds
+        vy = numpy.sin(angles) * speeds
+
+        if emitter.jitter:
+            vx += random.uniform(-emitter.jitter, emitter.jitter, count)
+            vy += random.uniform(-emitter.jitter, emitter.jitter, count)
+
+        lifespans = random.integers(emitter.lifespan_min, emitter.lifespan_max, size=count, endpoint=True)
+        if lifespan_scale < 1:
+            lifespans = numpy.maximum(1, (lifespans * lifespan_scale).astype(numpy.int32))
+
+        # Keep particles in the order they were created
+        self._add_pending_particles()
+        self._add_particles(x, y, vx, vy, lifespans, sprite_id)
 
     def update_particles(self) -> None:
-        particle: Particle
-        for particle_index, particle in iter_list_reverse(self.particles):
-            if particle.lifespan <= 0:
-                del self.particles[particle_index]
-                continue
+        """
+        Removes the particles that have run out of lifespan, then moves the rest.
+        Particles outside the area that was last drawn age faster, see OFFSCREEN_AGING.
+        """
+
+        self._add_pending_particles()
+
+        count = self.count
+        alive = self._lifespans[:count] > 0
 
-            particle.update()
+        alive_count = int(numpy.count_nonzero(alive))
+        if alive_count != count:
+            # Compact the live particles to the front, keeping their order
+            for array in (self._x, self._y, self._vx, self._vy, self._lifespans, self._sprite_ids):
+                array[:alive_count] = array[:count][alive]
+
+            self.count = count = alive_count
+
+        self._x[:count] += self._vx[:count]
+        self._y[:count] += self._vy[:count]
+        self._lifespans[:count] -= 1
+
+        view_rect = self._view_rect
+        if view_rect is not None and self.OFFSCREEN_AGING > 1:
+            x = self._x[:count]
+            y = self._y[:count]
+            offscreen = (x < view_rect.left) | (x >= view_rect.right) | (y < view_rect.top) | (y >= view_rect.bottom)
+            self._lifespans[:count][offscreen] -= self.OFFSCREEN_AGING - 1
 
     def draw_particles(self, camera: Camera) -> None:
-        for particle in self.particles:
-            particle.draw(camera)
+        """
+        Draws the particles the camera can see, centered on their position, newest first.
+        """
+
+        camera_rect = camera.rect
+        self._view_rect = camera_rect.inflate(self.OFFSCREEN_MARGIN * 2, self.OFFSCREEN_MARGIN * 2)
+
+        count = self.count
+        if count == 0:
+            return
+
+        sprite_ids = self._sprite_ids[:count]
+        widths = self._sprite_widths[sprite_ids]
+        heights = self._sprite_heights[sprite_ids]
+
+        # The same as setting the center of a rect, which truncates
+        lefts = self._x[:count].astype(numpy.int64) - widths // 2
+        tops = self._y[:count].astype(numpy.int64) - heights // 2
+
+        visible = numpy.flatnonzero((lefts < camera_rect.right) & (lefts + widths > camera_rect.left)
+                                    & (tops < camera_rect.bottom) & (tops + heights > camera_rect.top))[::-1]
+
+        sprites = self._sprites
+        self.sprite_batch.extend(
+            (sprites[sprite_id], (left, top)) for sprite_id, left, top in zip(
+                sprite_ids[visible].tolist(),
+                (lefts[visible] - camera_rect.x).tolist(),
+                (tops[visible] - camera_rect.y).tolist()
+            )
+        )
+        self.sprite_batch.submit(camera.window)
 
     def update_and_draw_particles(self, camera: Camera) -> None:
-        particle: Particle
-        for particle_index, particle in iter_list_reverse(self.particles):
-            if particle.lifespan <= 0:
-                del self.particles[particle_index]
-                continue
-
-            particle.update()
-            particle.draw(camera)
+        self.update_particles()
+        self.draw_particles(camera)
@@ -1,5 +1,4 @@
 import math
-import random
 
 import pygame
 
@@ -34,8 +33,6 @@ class Player(Entity):
     DEATH_TIMER: int = 90
     """How long the death animation lasts in frames."""
 
-    INITIAL_DEATH_NUM_PARTICLES: int = 30
-
     @classmethod
     def reset_upgrades(cls) -> None:
         cls.THROW_VELOCITY = cls.START_THROW_VELOCITY
@@ -95,12 +92,7 @@ class Player(Entity):
         self.attack_delay = self.ATTACK_DELAY
 
     def _update_light_source(self, shadows: Shadows) -> None:
-        shadows.remove_light_source(self.light_source)
-
-        self.light_source.x = self.rect.centerx
-        self.light_source.y = self.rect.centery
-
-        shadows.add_light_source(self.light_source)
+        shadows.move_light_source(self.light_source, self.rect.centerx, self.rect.centery)
 
     def _begin_death(self, particle_handler: ParticleHandler, shadows: Shadows) -> None:
         if self.i_am_dead:
@@ -115,19 +107,7 @@ class Player(Entity):
                                  self.DEATH_TIMER)
         )
 
-        for _ in range(self.INITIAL_DEATH_NUM_PARTICLES):
-            velocity = random.randint(1, 5)
-            angle = random.uniform(0, 2 * math.pi)
-
-            vx = math.cos(angle) * velocity
-            vy = math.sin(angle) * velocity
-
-            particle_handler.create_particle(
-                "player death",
-                self.rect.centerx, self.rect.centery,
-                vx, vy,
-                random.randint(5, 30)
-            )
+        particle_handler.emit("player death", self.rect.centerx, self.rect.centery)
 
     def _update_death(self, particle_handler: ParticleHandler, shadows: Shadows) -> None:
         if self.death_animation_finished:
@@ -1,5 +1,4 @@
 import math
-import random
 
 import pygame
 
@@ -9,6 +8,7 @@ from .LightSource import LightSource
 from .ParticleHandler import ParticleHandler
 from .Shadows import Shadows
 from .ShrinkingLightSource import ShrinkingLightSource
+from .SpatialHash import SpatialHash
 
 
 class PotionExploded:
@@ -21,7 +21,6 @@ class PotionExploded:
 
     PARTICLE_SPAWN_TIME: int = 5
     """The delay in frames between spawning particles."""
-    PARTICLE_LIFESPAN: int = 20
 
     START_HEALTH: int = 100
     HEALTH: int = 100  # 100 as base and 200 as max
@@ -40,8 +39,6 @@ class PotionExploded:
 
     WEAR_OUT_FRAME: int = 18  # Lasts 30 seconds if nothing happens and 60 at max health
 
-    NUM_DOUBLE_EXPLODE_PARTICLES = 10
-
     # Note the max damage delt via exposure is HEALTH * DAMAGE
 
     @classmethod
@@ -111,18 +108,9 @@ class PotionExploded:
 
         self.particle_spawn_timer = self.PARTICLE_SPAWN_TIME
 
-        angle = random.uniform(0, 2 * math.pi)
-        vx = math.cos(angle) / 10
-        vy = math.sin(angle) / 10
-
-        particle_handler.create_particle(
-            "exploded potion",
-            self.x, self.y,
-            vx, vy,
-            self.PARTICLE_LIFESPAN
-        )
+        particle_handler.emit("exploded potion", self.x, self.y)
 
-    def _damage_enemies(self, enemies: list[Entity]) -> bool:
+    def _damage_enemies(self, enemy_index: SpatialHash) -> bool:
         """
         Returns true of the potion has double exploded.
         """
@@ -133,7 +121,8 @@ class PotionExploded:
 
         self.damage_timer = self.DAMAGE_FRAME
 
-        for enemy in enemies:
+        enemy: Entity
+        for enemy in enemy_index.query_rect(self.rect):
             if self.rect.colliderect(enemy.rect):
                 enemy.deal_damage(self.damage)
                 self.health -= 2
@@ -150,19 +139,7 @@ class PotionExploded:
             ShrinkingLightSource(self.x, self.y, self.BRIGHTNESS, self.LIGHT_RADIUS, 30),
         )
 
-        for _ in range(self.NUM_DOUBLE_EXPLODE_PARTICLES):
-            velocity = random.randint(1, 3)
-            angle = random.uniform(0, 2 * math.pi)
-
-            vx = math.cos(angle) * velocity
-            vy = math.sin(angle) * velocity
-
-            particle_handler.create_particle(
-                "double exploded potion",
-                self.x, self.y,
-                vx, vy,
-                random.randint(10, 20)
-            )
+        particle_handler.emit("double exploded potion", self.x, self.y)
 
     def _wear_out(self) -> bool:
         """
@@ -182,12 +159,12 @@ class PotionExploded:
             return True
         return False
 
-    def update(self, shadows: Shadows, particle_handler: ParticleHandler, enemies: list[Entity]) -> None:
+    def update(self, shadows: Shadows, particle_handler: ParticleHandler, enemy_index: SpatialHash) -> None:
         # Should not occur, do thing if to be deleted
         if self.double_exploded:
             return
 
-        if self._damage_enemies(enemies):
+        if self._damage_enemies(enemy_index):
             self._double_explode(shadows, particle_handler)
             return
 
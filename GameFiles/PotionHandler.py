@@ -1,12 +1,12 @@
 from typing import Generator
 
 from .Camera import Camera
-from .Entity import Entity
 from .Map import Map
 from .ParticleHandler import ParticleHandler
 from .PotionExploded import PotionExploded
 from .PotionUnexploded import PotionUnexploded
 from .Shadows import Shadows
+from .SpatialHash import SpatialHash
 
 
 class PotionHandler:
@@ -24,7 +24,11 @@ class PotionHandler:
         for i in range(len(potion_list) - 1, -1, -1):
             yield i, potion_list[i]
 
-    def update(self, map_: Map, enemies: list[Entity], shadows: Shadows, particle_handler: ParticleHandler) -> None:
+    def update(self, map_: Map, enemy_index: SpatialHash, shadows: Shadows, particle_handler: ParticleHandler) -> None:
+        """
+        :param enemy_index: The enemies indexed by the map tiles they touch, see `EnemyHandler.enemy_index`.
+        """
+
         potion_unexploded: PotionUnexploded
         for i, potion_unexploded in self.iter_potions_reverse(self.unexploded_potions):
             if potion_unexploded.exploded:
@@ -33,7 +37,7 @@ class PotionHandler:
                 del self.unexploded_potions[i]
                 continue
 
-            potion_unexploded.update(map_, enemies, shadows, particle_handler)
+            potion_unexploded.update(map_, enemy_index, shadows, particle_handler)
 
         potion_exploded: PotionExploded
         for i, potion_exploded in self.iter_potions_reverse(self.exploded_potions):
@@ -43,7 +47,7 @@ class PotionHandler:
                 del self.exploded_potions[i]
                 continue
 
-            potion_exploded.update(shadows, particle_handler, enemies)
+            potion_exploded.update(shadows, particle_handler, enemy_index)
 
     def draw(self, camera: Camera) -> None:
         for potion in self.unexploded_potions:
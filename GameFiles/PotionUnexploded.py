@@ -1,5 +1,4 @@
 import math
-import random
 
 import pygame
 
@@ -9,6 +8,7 @@ from .LightSource import LightSource
 from .Map import Map
 from .ParticleHandler import ParticleHandler
 from .Shadows import Shadows
+from .SpatialHash import SpatialHash
 
 
 class PotionUnexploded:
@@ -20,8 +20,6 @@ class PotionUnexploded:
     """The damage done upon direct contact with an enemy."""
     MAX_DAMAGE: int = 50
 
-    NUM_EXPLODE_PARTICLES: int = 10
-
     @classmethod
     def reset_upgrades(cls) -> None:
         cls.DAMAGE = cls.START_DAMAGE
@@ -73,34 +71,10 @@ class PotionUnexploded:
         self.damage: int = self.DAMAGE
 
     def _explode_particles_hit_enemy(self, particle_handler: ParticleHandler) -> None:
-        for _ in range(self.NUM_EXPLODE_PARTICLES):
-            velocity = random.randint(2, 4)
-            angle = self.angle + random.uniform(-math.pi / 8, math.pi / 8)  # -45/2 to 45/2 degrees
-
-            vx = math.cos(angle) * velocity
-            vy = math.sin(angle) * velocity
-
-            particle_handler.create_particle(
-                "hit enemy",
-                self.x, self.y,
-                vx, vy,
-                random.randint(10, 20)
-            )
+        particle_handler.emit("hit enemy", self.x, self.y, angle=self.angle)
 
     def _explode_particles_wear_out(self, particle_handler: ParticleHandler) -> None:
-        for _ in range(self.NUM_EXPLODE_PARTICLES):
-            velocity = random.randint(1, 2)
-            angle = self.angle + random.uniform(-math.pi / 8, math.pi / 8)  # -45/2 to 45/2 degrees
-
-            vx = math.cos(angle) * velocity
-            vy = math.sin(angle) * velocity
-
-            particle_handler.create_particle(
-                "hit enemy",
-                self.x, self.y,
-                vx, vy,
-                random.randint(5, 15)
-            )
+        particle_handler.emit("potion wear out", self.x, self.y, angle=self.angle)
 
     def explode(self, particle_handler: ParticleHandler, shadows: Shadows) -> None:
         self.exploded = True
@@ -117,29 +91,13 @@ class PotionUnexploded:
         self.velocity -= 1
 
         # Update the light source position
-        shadows.remove_light_source(self.light_source)
-        self.light_source.x = self.x
-        self.light_source.y = self.y
-        shadows.add_light_source(self.light_source)
+        shadows.move_light_source(self.light_source, self.x, self.y)
 
     def _spawn_flight_particles(self, particle_handler: ParticleHandler) -> None:
-        multiplier = self.velocity / self.max_velocity
-
-        for _ in range(5):
-            velocity = random.uniform(0, 1) * multiplier
-            angle = random.uniform(0, math.pi * 2)
-
-            vx = math.cos(angle) * velocity
-            vy = math.sin(angle) * velocity
-
-            particle_handler.create_particle(
-                "unexploded flight",
-                self.x, self.y,
-                vx + random.uniform(-1, 1), vy + random.uniform(-1, 1),
-                random.randint(5, 15)
-            )
+        particle_handler.emit("unexploded flight", self.x, self.y, speed_scale=self.velocity / self.max_velocity)
 
-    def update(self, map_: Map, enemies: list[Entity], shadows: Shadows, particle_handler: ParticleHandler) -> None:
+    def update(self, map_: Map, enemy_index: SpatialHash, shadows: Shadows,
+               particle_handler: ParticleHandler) -> None:
         # Should not occur, but if the potion has collided with something, then do not update
         if self.exploded:
             return
@@ -156,7 +114,8 @@ class PotionUnexploded:
         self.rect.center = self.x, self.y
 
         # Check for collision with enemies
-        for enemy in enemies:
+        enemy: Entity
+        for enemy in enemy_index.query_rect(self.rect):
             if self.rect.colliderect(enemy.rect):
                 enemy.deal_damage(self.damage)
                 self.collided_with_enemy = True
@@ -1,16 +1,24 @@
-import math
-from typing import Generator
+import hashlib
+import pathlib
+from typing import Callable, Literal
 
+import numpy
 import pygame
 
 from .Camera import Camera
-from .Helpers import iter_list_reverse
+from .Helpers.CommonTypes import TileRegion
 from .LightSource import LightSource
+from .LightStamp import LightStamp, StampKey
+from .LightStencilCache import LightStencilCache
+from .LightVisibilityCache import LightVisibilityCache
 from .Map import Map
-from .ShadowTile import ShadowTile
+from .SpatialHash import SpatialHash
 from .UpdatingLightSource import UpdatingLightSource
 
 
+_RenderMode = Literal["tiles", "texture", "smooth texture"]
+
+
 class Shadows:
     TILE_SIZE = 16
     """The size of the tiles for the simulated shadows."""
@@ -18,76 +26,485 @@ class Shadows:
     TILE_SIZE_2 = TILE_SIZE / 2
     """Half the tile size."""
 
-    def __init__(self):
+    STENCIL_CACHE_SIZE = 1024
+    """The maximum amount of light stencils to keep cached."""
+
+    VISIBILITY_CACHE_SIZE = 2048
+    """The maximum amount of light visibility masks to keep cached, used when occlusion is on."""
+
+    MAX_DIRTY_REGIONS = 64
+    """Above this many dirty regions, they are merged into the one region covering them all."""
+
+    STAMP_INDEX_CELL_SIZE = 16
+    """The size in tiles of the cells of the spatial index of stamps."""
+
+    LIGHTMAP_VERSION = 1
+    """Part of the hash of a baked lightmap, to be increased whenever the way light is calculated changes."""
+
+    def __init__(self, render_mode: _RenderMode = "texture", occlusion: bool = False):
+        """
+        :param render_mode: How the shadows are rendered, see `set_render_mode`.
+        :param occlusion: If true, light sources do not light tiles hidden behind the walls of the map.
+        """
+
         self.width: int = 0
         self.height: int = 0
 
-        self.tiles: list[list[ShadowTile]] = []
+        self.brightness: numpy.ndarray = numpy.zeros((0, 0), dtype=numpy.int16)
+        """
+        The strongest reduction in darkness applied to each tile by the light sources, indexed as [y, x].
+        """
+
+        self._brightness_count: numpy.ndarray = numpy.zeros((0, 0), dtype=numpy.uint16)
+        """
+        The amount of stamps that give each tile its brightness, indexed as [y, x].
+        Keeping count means removing a stamp only needs a recalculation where it was the only brightest one.
+        """
+
+        self.darkness: numpy.ndarray = numpy.full((0, 0), 255, dtype=numpy.uint8)
+        """
+        The darkness of each tile, indexed as [y, x].
+        255 = full darkness
+        """
+
+        self.static_light_sources: list[LightSource] = []
+        """The light sources of the map that never move or change, baked into the base brightness."""
+
+        self._base_brightness: numpy.ndarray = numpy.zeros((0, 0), dtype=numpy.int16)
+        """
+        The brightness baked from the static light sources, indexed as [y, x].
+        The stamps of the other light sources are combined on top of it.
+        """
+
+        self.lightmap_path: pathlib.Path | None = None
+        """The file the base brightness is cached in, None to always bake it."""
+
+        self.light_sources: set[LightSource] = set()
+        self.updating_light_sources: set[UpdatingLightSource] = set()
+
+        self._light_stamps: dict[LightSource, LightStamp | None] = {}
+        """The stamp each light source has applied to the tiles, None if the light source touches no tiles."""
+
+        self._stamp_index: SpatialHash = SpatialHash(self.STAMP_INDEX_CELL_SIZE)
+        """The light sources with a stamp, indexed by the tiles their stamp covers."""
+
+        self.stencil_cache: LightStencilCache = LightStencilCache(self.TILE_SIZE, self.STENCIL_CACHE_SIZE)
+
+        self.occlusion: bool = occlusion
+        """If true, light sources do not light tiles hidden behind walls."""
+
+        self.walls: numpy.ndarray = numpy.zeros((0, 0), dtype=bool)
+        """The tiles covered by the walls of the map, indexed as [y, x]."""
+
+        self.visibility_cache: LightVisibilityCache = LightVisibilityCache(self.walls, self.VISIBILITY_CACHE_SIZE)
 
-        self.light_sources: list[LightSource] = []
-        self.updating_light_sources: list[UpdatingLightSource] = []
+        self.render_mode: _RenderMode = render_mode
+        self.render: Callable[[Camera], None] = self._render_texture
+        self.set_render_mode(render_mode)
+
+        self.dirty_regions: list[TileRegion] = []
+        """
+        Regions of tiles whose darkness has changed since the darkness texture was last updated.
+        Stored as (x, y, x_end, y_end), the end coordinates are exclusive.
+        """
+
+        self._darkness_texture: pygame.Surface = pygame.Surface((0, 0), 0, 32)
+        """A texture of the darkness of the whole map with one pixel per tile, kept up to date with the dirty regions."""
+
+        self._scaled_texture: pygame.Surface | None = None
+        """The surface the darkness texture is scaled into, reused between frames when the size matches."""
+
+    def setup_for_map(self, map_: Map, lightmap_path: pathlib.Path | None = None) -> None:
+        """
+        :param map_: The map to set up the shadows for.
+        :param lightmap_path: The file to cache the baked light of the static light sources of the map in.
+        """
 
-    def setup_for_map(self, map_: Map) -> None:
         self.width = int(map_.width * map_.TILE_SIZE // self.TILE_SIZE)
         self.height = int(map_.height * map_.TILE_SIZE // self.TILE_SIZE)
 
-        self.tiles = [
-            [
-                ShadowTile() for _ in range(self.width)
-            ] for _ in range(self.height)
-        ]
+        self.brightness = numpy.zeros((self.height, self.width), dtype=numpy.int16)
+        self._brightness_count = numpy.zeros((self.height, self.width), dtype=numpy.uint16)
+        self.darkness = numpy.full((self.height, self.width), 255, dtype=numpy.uint8)
+
+        self._darkness_texture = pygame.Surface((self.width, self.height), 0, 32)
+        self.dirty_regions = [(0, 0, self.width, self.height)]
+
+        # Each map tile covers a square of shadow tiles
+        map_tile_to_tiles = int(map_.TILE_SIZE // self.TILE_SIZE)
+        map_walls = numpy.zeros((map_.height, map_.width), dtype=bool)
+        for tile_x, tile_y in map_.tiles:
+            map_walls[tile_y, tile_x] = True
+        self.walls = map_walls.repeat(map_tile_to_tiles, axis=0).repeat(map_tile_to_tiles, axis=1)
+
+        self.visibility_cache = LightVisibilityCache(self.walls, self.VISIBILITY_CACHE_SIZE)
+
+        self.static_light_sources = list(map_.static_light_sources)
+        self.lightmap_path = lightmap_path
+        self._bake_static_light_sources()
+
+        self.brightness[:] = self._base_brightness
+        self._brightness_count[:] = self._base_brightness > 0
+        self._update_darkness(0, 0, self.width, self.height)
+
+        self.light_sources = set()
+        self.updating_light_sources = set()
+
+        self._light_stamps = {}
+        self._stamp_index.clear()
+
+    def _lightmap_hash(self) -> bytes:
+        """
+        A hash of everything the base brightness depends on.
+        """
+
+        hasher = hashlib.sha256()
+        hasher.update(repr((
+            self.LIGHTMAP_VERSION, self.TILE_SIZE, self.width, self.height, self.occlusion,
+            [(light_source.x, light_source.y, light_source.brightness, light_source.radius)
+             for light_source in self.static_light_sources]
+        )).encode())
+
+        if self.occlusion:
+            hasher.update(numpy.packbits(self.walls).tobytes())
+
+        return hasher.digest()
+
+    def _load_lightmap(self, lightmap_hash: bytes) -> numpy.ndarray | None:
+        """
+        Returns the base brightness cached in the lightmap file,
+        None if it is missing, cannot be read or was baked from something else.
+        """
+
+        if self.lightmap_path is None or not self.lightmap_path.is_file():
+            return None
+
+        try:
+            data = self.lightmap_path.read_bytes()
+        except OSError:
+            # The cache is only an optimisation, an unreadable one is baked again
+            return None
+
+        if len(data) != len(lightmap_hash) + self.width * self.height * 2 or not data.startswith(lightmap_hash):
+            return None
+
+        return numpy.frombuffer(data, dtype="<i2", offset=len(lightmap_hash)).reshape((self.height, self.width))
+
+    def _save_lightmap(self, lightmap_hash: bytes) -> None:
+        """
+        Caches the base brightness in the lightmap file, as the hash followed by the brightness of each tile.
+        """
+
+        if self.lightmap_path is None:
+            return
+
+        try:
+            self.lightmap_path.write_bytes(lightmap_hash + self._base_brightness.astype("<i2").tobytes())
+        except OSError:
+            # The cache is only an optimisation, some platforms (like the browser) cannot write it
+            pass
+
+    def _bake_static_light_sources(self) -> None:
+        """
+        Sets the base brightness from the static light sources, using the lightmap file when it is up to date.
+        """
+
+        self._base_brightness = numpy.zeros((self.height, self.width), dtype=numpy.int16)
+
+        if not self.static_light_sources:
+            return
+
+        lightmap_hash = self._lightmap_hash()
+
+        base_brightness = self._load_lightmap(lightmap_hash)
+        if base_brightness is not None:
+            self._base_brightness[:] = base_brightness
+            return
+
+        for light_source in self.static_light_sources:
+            stamp = self._stamp_for(light_source)
+            if stamp is None:
+                continue
+
+            base_brightness = self._base_brightness[stamp.y:stamp.y_end, stamp.x:stamp.x_end]
+            numpy.maximum(base_brightness, stamp.values, out=base_brightness)
+
+        self._save_lightmap(lightmap_hash)
+
+    def _set_stamp(self, light_source: LightSource, stamp: LightStamp | None) -> None:
+        """
+        Stores the stamp of a light source and keeps the spatial index of stamps up to date.
+        """
 
-        self.light_sources = []
+        self._light_stamps[light_source] = stamp
 
-    def _tiles_affected_by(self, light_source: LightSource) -> Generator[tuple[ShadowTile, float], None, None]:
+        if stamp is None:
+            self._stamp_index.remove(light_source)
+        else:
+            self._stamp_index.insert(light_source, stamp.x, stamp.y, stamp.x_end, stamp.y_end)
+
+    def _pop_stamp(self, light_source: LightSource) -> LightStamp | None:
         """
-        Iterates over all tiles that are affected by the light source.
-        Each iterations returns an affected tile and the distance to that tile squared.
+        Forgets the stamp of a light source, returning it.
         """
 
+        self._stamp_index.remove(light_source)
+        return self._light_stamps.pop(light_source, None)
+
+    def _overlapping_stamps(self, x: int, y: int, x_end: int, y_end: int) -> list[LightStamp]:
+        """
+        Returns the stamps that overlap the region of tiles, the end coordinates are exclusive.
+        """
+
+        overlapping_stamps = []
+        for light_source in self._stamp_index.query(x, y, x_end, y_end):
+            stamp = self._light_stamps[light_source]
+
+            if stamp.overlaps(x, y, x_end, y_end):
+                overlapping_stamps.append(stamp)
+
+        return overlapping_stamps
+
+    def _stamp_for(self, light_source: LightSource) -> LightStamp | None:
+        """
+        Finds the reduction in darkness the light source applies to the tiles it touches.
+        Returns None if the light source does not touch any tile.
+        """
+
+        if light_source.radius <= 0:
+            return None
+
         # Convert the position into a tile
         base_tile_x = int(light_source.x // self.TILE_SIZE)
         base_tile_y = int(light_source.y // self.TILE_SIZE)
 
-        # Convert the radius into tile sizes
-        light_radius_tiles = int(light_source.radius // self.TILE_SIZE) + 1
+        stencil = self.stencil_cache.stencil_for(
+            light_source.radius, light_source.brightness,
+            int(light_source.x - base_tile_x * self.TILE_SIZE), int(light_source.y - base_tile_y * self.TILE_SIZE)
+        )
+        light_radius_tiles = self.stencil_cache.radius_in_tiles(light_source.radius)
 
-        # Square the light radius
-        light_radius_squared = light_source.radius * light_source.radius
+        if self.occlusion:
+            stencil = stencil * self.visibility_cache.visibility_for(base_tile_x, base_tile_y, light_radius_tiles)
 
-        # Loop over the tiles and yield if they touch the light source
-        for x_diff in range(-light_radius_tiles, light_radius_tiles + 1):
-            tile_x = base_tile_x + x_diff
+        # Clip the stencil to the map
+        tile_x_min = max(base_tile_x - light_radius_tiles, 0)
+        tile_x_max = min(base_tile_x + light_radius_tiles + 1, self.width)
+        tile_y_min = max(base_tile_y - light_radius_tiles, 0)
+        tile_y_max = min(base_tile_y + light_radius_tiles + 1, self.height)
 
-            if tile_x < 0 or tile_x >= self.width:
-                continue
+        if tile_x_min >= tile_x_max or tile_y_min >= tile_y_max:
+            return None
 
-            x_distance_tile = tile_x * self.TILE_SIZE + self.TILE_SIZE_2 \
-                              - light_source.x  # NOQA - PEP 8: E127 continuation line over-indented for visual indent
+        stencil_x = tile_x_min - base_tile_x + light_radius_tiles
+        stencil_y = tile_y_min - base_tile_y + light_radius_tiles
 
-            for y_diff in range(-light_radius_tiles, light_radius_tiles + 1):
-                tile_y = base_tile_y + y_diff
+        values = stencil[stencil_y:stencil_y + tile_y_max - tile_y_min, stencil_x:stencil_x + tile_x_max - tile_x_min]
 
-                if tile_y < 0 or tile_y >= self.height:
-                    continue
+        return LightStamp(tile_x_min, tile_y_min, values, self._stamp_key(light_source))
+
+    def _stamp_key(self, light_source: LightSource) -> StampKey:
+        """
+        The stamp of a light source only changes when its key does.
+        """
+
+        return (int(light_source.x // self.TILE_SIZE), int(light_source.y // self.TILE_SIZE),
+                light_source.radius, light_source.brightness)
+
+    def _update_darkness(self, x: int, y: int, x_end: int, y_end: int) -> None:
+        """
+        Recalculates the darkness of a region of tiles from their brightness.
+        """
+
+        brightness = self.brightness[y:y_end, x:x_end]
+        numpy.subtract(255, numpy.minimum(brightness, 255), out=self.darkness[y:y_end, x:x_end], casting="unsafe")
+
+        self._mark_dirty(x, y, x_end, y_end)
+
+    def _mark_dirty(self, x: int, y: int, x_end: int, y_end: int) -> None:
+        self.dirty_regions.append((x, y, x_end, y_end))
+
+        # Lots of small regions are cheaper to write as the one region covering them all
+        if len(self.dirty_regions) > self.MAX_DIRTY_REGIONS:
+            self.dirty_regions = [(
+                min(region[0] for region in self.dirty_regions),
+                min(region[1] for region in self.dirty_regions),
+                max(region[2] for region in self.dirty_regions),
+                max(region[3] for region in self.dirty_regions)
+            )]
+
+    @staticmethod
+    def _lift(brightness: numpy.ndarray, brightness_count: numpy.ndarray, values: numpy.ndarray) -> None:
+        """
+        Combines the values of a stamp into a region of brightness and brightness counts of the same shape.
+        """
+
+        brighter = values > brightness
+        as_bright = (values == brightness) & (values > 0)
+
+        brightness_count += as_bright
+        numpy.copyto(brightness_count, 1, where=brighter)
+        numpy.maximum(brightness, values, out=brightness)
+
+    def _apply_stamp(self, stamp: LightStamp) -> None:
+        self._lift(self.brightness[stamp.y:stamp.y_end, stamp.x:stamp.x_end],
+                   self._brightness_count[stamp.y:stamp.y_end, stamp.x:stamp.x_end],
+                   stamp.values)
+
+        self._update_darkness(stamp.x, stamp.y, stamp.x_end, stamp.y_end)
+
+    def _lift_off_stamp(self, stamp: LightStamp) -> None:
+        """
+        Takes the stamp out of the count of stamps giving each tile its brightness.
+        Tiles where the stamp was the only brightest one are left with a count of zero, these are stale.
+        """
+
+        brightness = self.brightness[stamp.y:stamp.y_end, stamp.x:stamp.x_end]
+        brightness_count = self._brightness_count[stamp.y:stamp.y_end, stamp.x:stamp.x_end]
+
+        brightness_count -= (stamp.values == brightness) & (stamp.values > 0)
+
+    def _recalculate_region(self, x: int, y: int, x_end: int, y_end: int) -> None:
+        """
+        Recalculates the brightness of a region of tiles from the base brightness and every stamp that overlaps it.
+        """
+
+        overlapping_stamps = self._overlapping_stamps(x, y, x_end, y_end)
+
+        # Layer the base brightness and the overlapping part of each stamp,
+        # so the brightest can be found for all of them at once
+        layers = numpy.zeros((len(overlapping_stamps) + 1, y_end - y, x_end - x), dtype=numpy.int16)
+        layers[0] = self._base_brightness[y:y_end, x:x_end]
+
+        for layer, stamp in zip(layers[1:], overlapping_stamps):
+            overlap_x = max(x, stamp.x)
+            overlap_x_end = min(x_end, stamp.x_end)
+            overlap_y = max(y, stamp.y)
+            overlap_y_end = min(y_end, stamp.y_end)
+
+            layer[overlap_y - y:overlap_y_end - y, overlap_x - x:overlap_x_end - x] = \
+                stamp.values[overlap_y - stamp.y:overlap_y_end - stamp.y, overlap_x - stamp.x:overlap_x_end - stamp.x]
+
+        brightness = self.brightness[y:y_end, x:x_end]
+        layers.max(axis=0, out=brightness)
+
+        brightness_count = self._brightness_count[y:y_end, x:x_end]
+        numpy.sum((layers == brightness) & (layers > 0), axis=0, out=brightness_count)
+
+        self._update_darkness(x, y, x_end, y_end)
+
+    def _recalculate_stale(self, x: int, y: int, x_end: int, y_end: int) -> None:
+        """
+        Recalculates the tiles in the region that lost their only brightest stamp.
+        """
+
+        brightness = self.brightness[y:y_end, x:x_end]
+        brightness_count = self._brightness_count[y:y_end, x:x_end]
+
+        stale = (brightness_count == 0) & (brightness > 0)
+        if not stale.any():
+            return
 
-                y_distance_tile = tile_y * self.TILE_SIZE + self.TILE_SIZE_2 \
-                                  - light_source.y  # NOQA - PEP 8: E127 continuation line over-indented for visual indent
+        stale_ys, stale_xs = numpy.nonzero(stale)
+        self._recalculate_region(x + int(stale_xs.min()), y + int(stale_ys.min()),
+                                 x + int(stale_xs.max()) + 1, y + int(stale_ys.max()) + 1)
 
-                # Get the distance to the tile
-                distance_to_tile_squared = x_distance_tile * x_distance_tile + y_distance_tile * y_distance_tile
+    def _stamp_light_source(self, light_source: LightSource) -> None:
+        """
+        Stamps a light source that has not been stamped yet.
+        """
+
+        stamp = self._stamp_for(light_source)
+        self._set_stamp(light_source, stamp)
+
+        if stamp is not None:
+            self._apply_stamp(stamp)
 
-                # If close enough yield
-                if distance_to_tile_squared <= light_radius_squared:
-                    yield self.tiles[tile_y][tile_x], distance_to_tile_squared
+    def _unstamp_light_source(self, light_source: LightSource) -> None:
+        stamp = self._pop_stamp(light_source)
+        if stamp is None:
+            return
+
+        self._lift_off_stamp(stamp)
+        self._recalculate_stale(stamp.x, stamp.y, stamp.x_end, stamp.y_end)
+        self._update_darkness(stamp.x, stamp.y, stamp.x_end, stamp.y_end)
+
+    def _swap_stamps(self, old_stamp: LightStamp | None, new_stamp: LightStamp | None) -> TileRegion | None:
+        """
+        Lifts the old stamp off and lifts the new stamp in, without recalculating anything.
+        Returns the region covering both stamps, which has to be recalculated, or None if neither touches any tile.
+        """
+
+        if old_stamp is not None:
+            self._lift_off_stamp(old_stamp)
+
+        if new_stamp is not None:
+            self._lift(self.brightness[new_stamp.y:new_stamp.y_end, new_stamp.x:new_stamp.x_end],
+                       self._brightness_count[new_stamp.y:new_stamp.y_end, new_stamp.x:new_stamp.x_end],
+                       new_stamp.values)
+
+        stamps = [stamp for stamp in (old_stamp, new_stamp) if stamp is not None]
+        if not stamps:
+            return None
+
+        return (min(stamp.x for stamp in stamps), min(stamp.y for stamp in stamps),
+                max(stamp.x_end for stamp in stamps), max(stamp.y_end for stamp in stamps))
+
+    @staticmethod
+    def _merge_regions(regions: list[TileRegion]) -> list[TileRegion]:
+        """
+        Merges overlapping regions into the regions covering them, until none of the regions overlap.
+        """
+
+        merged_regions: list[TileRegion] = []
+
+        for x, y, x_end, y_end in regions:
+            # Keep absorbing merged regions, the grown region might overlap ones it did not before
+            absorbed = True
+            while absorbed:
+                absorbed = False
+
+                for i, (other_x, other_y, other_x_end, other_y_end) in enumerate(merged_regions):
+                    if other_x < x_end and x < other_x_end and other_y < y_end and y < other_y_end:
+                        x, y = min(x, other_x), min(y, other_y)
+                        x_end, y_end = max(x_end, other_x_end), max(y_end, other_y_end)
+
+                        merged_regions.pop(i)
+                        absorbed = True
+                        break
+
+            merged_regions.append((x, y, x_end, y_end))
+
+        return merged_regions
+
+    def _move_stamp(self, light_source: LightSource) -> None:
+        """
+        Moves the stamp of an already stamped light source to where the light source now is.
+        Tiles that got brighter take the new value, only tiles that lost their only brightest stamp are recalculated.
+        """
+
+        old_stamp = self._light_stamps[light_source]
+        new_stamp = self._stamp_for(light_source)
+
+        self._set_stamp(light_source, new_stamp)
+
+        region = self._swap_stamps(old_stamp, new_stamp)
+        if region is None:
+            return
+
+        self._recalculate_stale(*region)
+        self._update_darkness(*region)
 
     def add_light_source(self, light_source: LightSource) -> None:
+        # Skip if already present
+        if light_source in self.light_sources:
+            return
+
         # Add the light source
-        self.light_sources.append(light_source)
+        self.light_sources.add(light_source)
 
         # Update any affected tiles
-        for affected_tile, distance_squared in self._tiles_affected_by(light_source):
-            affected_tile.add_light_source(light_source, math.sqrt(distance_squared))
+        self._stamp_light_source(light_source)
 
     def remove_light_source(self, light_source: LightSource) -> None:
         # Skip if not present
@@ -98,14 +515,37 @@ class Shadows:
         self.light_sources.remove(light_source)
 
         # Update any affected tiles
-        for affected_tile, _ in self._tiles_affected_by(light_source):
-            affected_tile.remove_light_source(light_source)
+        self._unstamp_light_source(light_source)
+
+    def move_light_source(self, light_source: LightSource, x: int | float, y: int | float) -> None:
+        """
+        Moves the light source to the given coordinates, adding it if it is not present.
+        Nothing is recalculated if the light source stays in the same tile with the same radius and brightness.
+        Otherwise, only the tiles whose darkness changed are touched.
+        """
+
+        light_source.x = x
+        light_source.y = y
+
+        if light_source not in self.light_sources:
+            self.add_light_source(light_source)
+            return
+
+        stamp = self._light_stamps[light_source]
+        if stamp is not None and stamp.key == self._stamp_key(light_source):
+            return
+
+        self._move_stamp(light_source)
 
     def add_updating_light_source(self, updating_light_source: UpdatingLightSource) -> None:
-        self.updating_light_sources.append(updating_light_source)
+        """
+        Adds the light source, it is stamped by the next update together with the changes of the others.
+        """
 
-        for affected_tile, distance_squared in self._tiles_affected_by(updating_light_source):
-            affected_tile.add_light_source(updating_light_source, math.sqrt(distance_squared))
+        if updating_light_source in self.updating_light_sources:
+            return
+
+        self.updating_light_sources.add(updating_light_source)
 
     def remove_updating_light_source(self, updating_light_source: UpdatingLightSource) -> None:
         if updating_light_source not in self.updating_light_sources:
@@ -113,23 +553,83 @@ class Shadows:
 
         self.updating_light_sources.remove(updating_light_source)
 
-        for affected_tile, _ in self._tiles_affected_by(updating_light_source):
-            affected_tile.remove_light_source(updating_light_source)
+        self._unstamp_light_source(updating_light_source)
 
     def update(self) -> None:
+        """
+        Updates the updating light sources and removes the ones to be removed, then applies all their changes at once.
+        Light sources added since the last update are stamped here too, so a burst of them is applied in one go.
+        Every old stamp is lifted off and every new stamp lifted in first,
+        then each group of overlapping changed regions is recalculated once.
+        """
+
+        changed_regions: list[TileRegion] = []
+
         light_source: UpdatingLightSource
-        for light_source_index, light_source in iter_list_reverse(self.updating_light_sources):
+        for light_source in list(self.updating_light_sources):
             if light_source.to_remove:
-                self.remove_updating_light_source(light_source)
-                continue
+                self.updating_light_sources.discard(light_source)
+                region = self._swap_stamps(self._pop_stamp(light_source), None)
+            else:
+                light_source.update()
+
+                # Light sources added since the last update have no stamp yet
+                old_stamp = self._light_stamps.get(light_source)
+                if old_stamp is not None and old_stamp.key == self._stamp_key(light_source):
+                    continue
 
-            self.remove_updating_light_source(light_source)
-            light_source.update()
-            self.add_updating_light_source(light_source)
+                new_stamp = self._stamp_for(light_source)
+                self._set_stamp(light_source, new_stamp)
 
-    def render(self, camera: Camera) -> None:
-        tile_surface = pygame.Surface((self.TILE_SIZE, self.TILE_SIZE))
-        tile_rect = tile_surface.get_rect()
+                region = self._swap_stamps(old_stamp, new_stamp)
+
+            if region is not None:
+                changed_regions.append(region)
+
+        for region in self._merge_regions(changed_regions):
+            self._recalculate_stale(*region)
+            self._update_darkness(*region)
+
+    def set_occlusion(self, occlusion: bool) -> None:
+        """
+        Turns occlusion by the walls of the map on or off.
+        The static light sources are baked again and every light source is restamped.
+        """
+
+        self.occlusion = occlusion
+
+        self._bake_static_light_sources()
+
+        for light_source in list(self._light_stamps):
+            self._set_stamp(light_source, self._stamp_for(light_source))
+
+        self._recalculate_region(0, 0, self.width, self.height)
+
+    def set_render_mode(self, render_mode: _RenderMode) -> None:
+        """
+        Sets how the shadows are rendered.
+        'tiles' fills and blits a surface for every visible tile.
+        'texture' keeps the darkness in a texture, one pixel per tile, and blits the visible part scaled up once.
+        'smooth texture' does the same as 'texture' but scales the texture up bilinearly.
+        """
+
+        if render_mode == "tiles":
+            self.render = self._render_tiles
+        elif render_mode == "texture":
+            self.render = self._render_texture
+        elif render_mode == "smooth texture":
+            self.render = self._render_smooth_texture
+        else:
+            raise ValueError(f"Unknown render mode '{render_mode}'")
+
+        self.render_mode = render_mode
+
+    def _visible_tile_range(self, camera: Camera) -> tuple[int, int, int, int]:
+        """
+        Returns the range of tiles the camera can see, with a tile of padding, clipped to the map.
+
+        :return: the range as (tile_x_min, tile_x_max, tile_y_min, tile_y_max), the max values are exclusive
+        """
 
         tile_x_min = int(camera.rect.left // self.TILE_SIZE) - 1
         tile_x_max = int(camera.rect.right // self.TILE_SIZE) + 1
@@ -147,6 +647,21 @@ class Shadows:
         if tile_y_max >= self.height:
             tile_y_max = self.height
 
+        return tile_x_min, tile_x_max, tile_y_min, tile_y_max
+
+    def _prepare_visible_tiles(self, tile_x_min: int, tile_x_max: int, tile_y_min: int, tile_y_max: int) -> None:
+        """
+        Called before rendering with the range of visible tiles, the max values are exclusive.
+        The darkness of every tile is always up to date here, so there is nothing to do.
+        """
+
+    def _render_tiles(self, camera: Camera) -> None:
+        tile_surface = pygame.Surface((self.TILE_SIZE, self.TILE_SIZE))
+        tile_rect = tile_surface.get_rect()
+
+        tile_x_min, tile_x_max, tile_y_min, tile_y_max = self._visible_tile_range(camera)
+        self._prepare_visible_tiles(tile_x_min, tile_x_max, tile_y_min, tile_y_max)
+
         for tile_x in range(tile_x_min, tile_x_max):
             tile_x_position = tile_x * self.TILE_SIZE
 
@@ -160,7 +675,63 @@ class Shadows:
 
                 camera.convert_rect_to_camera_coordinates(tile_rect)
 
-                tile_darkness = self.tiles[tile_y][tile_x].darkness
+                tile_darkness = int(self.darkness[tile_y, tile_x])
                 tile_surface.fill((tile_darkness, tile_darkness, tile_darkness))
 
                 camera.window.blit(tile_surface, tile_rect, special_flags=pygame.BLEND_RGB_SUB)
+
+    def _update_darkness_texture(self) -> None:
+        """
+        Writes the darkness of the dirty regions into the darkness texture.
+        """
+
+        if not self.dirty_regions:
+            return
+
+        for x, y, x_end, y_end in self.dirty_regions:
+            if x >= x_end or y >= y_end:
+                continue
+
+            # Surface arrays are indexed as [x, y], each grey pixel is mapped as 0xDDDDDD
+            pixels = self.darkness[y:y_end, x:x_end].T * numpy.uint32(0x010101)
+            pygame.surfarray.blit_array(self._darkness_texture.subsurface((x, y, x_end - x, y_end - y)), pixels)
+
+        self.dirty_regions = []
+
+    def _render_darkness_texture(self, camera: Camera, smooth: bool) -> None:
+        """
+        Scales the visible part of the darkness texture up to the size of the tiles.
+        It is then subtracted from the window in a single blit.
+        """
+
+        tile_x_min, tile_x_max, tile_y_min, tile_y_max = self._visible_tile_range(camera)
+
+        if tile_x_min >= tile_x_max or tile_y_min >= tile_y_max:
+            return
+
+        self._prepare_visible_tiles(tile_x_min, tile_x_max, tile_y_min, tile_y_max)
+        self._update_darkness_texture()
+
+        texture_size = tile_x_max - tile_x_min, tile_y_max - tile_y_min
+        texture = self._darkness_texture.subsurface((tile_x_min, tile_y_min, *texture_size))
+
+        scaled_size = texture_size[0] * self.TILE_SIZE, texture_size[1] * self.TILE_SIZE
+        if self._scaled_texture is None or self._scaled_texture.get_size() != scaled_size:
+            self._scaled_texture = pygame.Surface(scaled_size, 0, texture)
+
+        if smooth:
+            pygame.transform.smoothscale(texture, scaled_size, self._scaled_texture)
+        else:
+            pygame.transform.scale(texture, scaled_size, self._scaled_texture)
+
+        display_coords = camera.coordinates_to_display_coordinates(
+            (tile_x_min * self.TILE_SIZE, tile_y_min * self.TILE_SIZE)
+        )
+
+        camera.window.blit(self._scaled_texture, display_coords, special_flags=pygame.BLEND_RGB_SUB)
+
+    def _render_texture(self, camera: Camera) -> None:
+        self._render_darkness_texture(camera, False)
+
+    def _render_smooth_texture(self, camera: Camera) -> None:
+        self._render_darkness_texture(camera, True)
@@ -0,0 +1,106 @@
+import random
+
+import pygame
+
+_AnimationKey = tuple[int, int, int]
+
+
+class SmokeAnimation:
+    FRAME_COUNT: int = 100
+    """
+    The amount of frames in the loop of the animation, the same as the circle lifespan so each circle is seen once.
+    Each frame of a 152 by 152 animation takes 92 KB, so the loop takes 9 MB.
+    """
+
+    CIRCLE_LIFESPAN: int = 100
+    """How many frames a circle takes to shrink away to nothing."""
+
+    CIRCLE_SPEED: float = 0.5
+    """The most a circle moves in x and in y each frame."""
+
+    CIRCLE_COLOUR: tuple[int, int, int] = (10, 10, 10)
+    """The colour each circle adds to the frame, overlapping circles make darker smoke."""
+
+    _SHARED: dict[_AnimationKey, "SmokeAnimation"] = {}
+    """The animations made by shared, by their size, circle radius and spawn interval."""
+
+    def __init__(self, size: int, circle_radius: int, spawn_interval: int):
+        """
+        Pre-renders a loop of smoke frames: circles spawned at the middle every few frames,
+        drifting away in a random direction while shrinking.
+        The frames are meant to be blitted with BLEND_RGB_SUB, darkening what is behind them.
+        Every enemy of a size shares the one loop, starting at a random frame so enemies are not in step.
+        They are converted to the pixel format of the display if there is one, so blitting them needs no conversion.
+
+        :param size: The width and height of each frame.
+        :param circle_radius: The radius of each circle when it is spawned.
+        :param spawn_interval: How many frames apart the circles are spawned.
+        """
+
+        if self.FRAME_COUNT % spawn_interval:
+            raise ValueError(f"The spawn interval {spawn_interval} must divide the {self.FRAME_COUNT} frames evenly "
+                             f"for the animation to loop")
+
+        self.size: int = size
+        self.circle_radius: int = circle_radius
+        self.spawn_interval: int = spawn_interval
+
+        self.frames: list[pygame.Surface] = self._render_loop()
+        """The frames of the loop, shared by every enemy using the animation."""
+
+    @classmethod
+    def shared(cls, size: int, circle_radius: int, spawn_interval: int) -> "SmokeAnimation":
+        """
+        Returns the animation for the arguments, only rendering it the first time it is asked for.
+        """
+
+        key = size, circle_radius, spawn_interval
+
+        if key not in cls._SHARED:
+            cls._SHARED[key] = cls(size, circle_radius, spawn_interval)
+
+        return cls._SHARED[key]
+
+    def _render_loop(self) -> list[pygame.Surface]:
+        """
+        Renders the loop, seeded so it is the same every time.
+        Every circle is spawned once per loop, a circle spawned at frame `spawn` is `frame - spawn` frames old,
+        wrapping around the loop, and older by whole loops for circles that live longer than a loop.
+        """
+
+        loop_random = random.Random(0)
+        can_convert = pygame.display.get_surface() is not None
+
+        spawns = [(spawn, loop_random.uniform(-self.CIRCLE_SPEED, self.CIRCLE_SPEED),
+                   loop_random.uniform(-self.CIRCLE_SPEED, self.CIRCLE_SPEED))
+                  for spawn in range(0, self.FRAME_COUNT, self.spawn_interval)]
+
+        circle_sprite = pygame.Surface((self.circle_radius * 2 + 1, self.circle_radius * 2 + 1))
+        circle_sprite_rect = circle_sprite.get_rect()
+        middle = self.size // 2
+        radius_decay = self.circle_radius / self.CIRCLE_LIFESPAN
+
+        frames = []
+        for frame_index in range(self.FRAME_COUNT):
+            frame = pygame.Surface((self.size, self.size))
+            frame.fill((0, 0, 0))
+
+            for spawn, vx, vy in spawns:
+                for age in range((frame_index - spawn) % self.FRAME_COUNT, self.CIRCLE_LIFESPAN, self.FRAME_COUNT):
+                    circle_sprite.fill((0, 0, 0))
+                    pygame.draw.circle(circle_sprite, self.CIRCLE_COLOUR, (self.circle_radius, self.circle_radius),
+                                       self.circle_radius - radius_decay * age)
+
+                    circle_sprite_rect.center = middle + vx * age, middle + vy * age
+                    frame.blit(circle_sprite, circle_sprite_rect, special_flags=pygame.BLEND_RGB_ADD)
+
+            frames.append(frame.convert() if can_convert else frame)
+
+        return frames
+
+    def frame(self, frame_index: int) -> pygame.Surface:
+        """
+        Returns the frame, frame indexes past the end of the loop wrap around.
+        """
+
+        return self.frames[frame_index % self.FRAME_COUNT]
@@ -0,0 +1,189 @@
+from typing import Hashable
+
+import pygame
+
+_CellKey = tuple[int, int]
+_CellRange = tuple[int, int, int, int]
+
+
+class SpatialHash:
+    def __init__(self, cell_size: int):
+        """
+        A uniform grid of cells, each holding the items whose bounds touch it.
+        Used to find the items near a region without looking at every item.
+        Queries return the items in the order they were first inserted, so the results do not depend on their hashes.
+
+        :param cell_size: The size of each cell, in the same units as the bounds of the items.
+        """
+
+        self.cell_size: int = cell_size
+
+        self._cells: dict[_CellKey, set[Hashable]] = {}
+        """The items touching each cell, empty cells are not stored."""
+
+        self._item_cell_ranges: dict[Hashable, _CellRange] = {}
+        """The range of cells each item touches as (x_min, y_min, x_max, y_max), the max values are inclusive."""
+
+        self._item_orders: dict[Hashable, int] = {}
+        """When each item was inserted, counting up, kept while the item moves so queries are in insertion order."""
+
+        self._next_order: int = 0
+
+        self.candidates: int = 0
+        """
+        The amount of items returned by queries since the counters were reset.
+        Each is a pair check for whoever made the query.
+        """
+
+    def __len__(self) -> int:
+        return len(self._item_cell_ranges)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._item_cell_ranges
+
+    def clear(self) -> None:
+        self._cells = {}
+        self._item_cell_ranges = {}
+        self._item_orders = {}
+        self._next_order = 0
+
+    def reset_counters(self) -> None:
+        self.candidates = 0
+
+    def _cell_range(self, x: int | float, y: int | float, x_end: int | float, y_end: int | float) -> _CellRange:
+        """
+        The end coordinates are exclusive, bounds with no width or height still touch the cell they are in.
+        """
+
+        cell_x_min = int(x // self.cell_size)
+        cell_y_min = int(y // self.cell_size)
+
+        # Rounding the end up then stepping back a cell keeps the end exclusive for floats as well as integers
+        cell_x_max = int(-(-x_end // self.cell_size)) - 1
+        cell_y_max = int(-(-y_end // self.cell_size)) - 1
+
+        return (cell_x_min, cell_y_min,
+                cell_x_max if cell_x_max > cell_x_min else cell_x_min,
+                cell_y_max if cell_y_max > cell_y_min else cell_y_min)
+
+    def _add_to_cells(self, item: Hashable, cell_range: _CellRange) -> None:
+        for cell_x in range(cell_range[0], cell_range[2] + 1):
+            for cell_y in range(cell_range[1], cell_range[3] + 1):
+                cell_key = cell_x, cell_y
+
+                if cell_key in self._cells:
+                    self._cells[cell_key].add(item)
+                else:
+                    self._cells[cell_key] = {item}
+
+    def _remove_from_cells(self, item: Hashable, cell_range: _CellRange) -> None:
+        for cell_x in range(cell_range[0], cell_range[2] + 1):
+            for cell_y in range(cell_range[1], cell_range[3] + 1):
+                cell_key = cell_x, cell_y
+
+                cell = self._cells[cell_key]
+                cell.discard(item)
+
+                if not cell:
+                    del self._cells[cell_key]
+
+    def _place(self, item: Hashable, cell_range: _CellRange) -> None:
+        """
+        Puts the item in the range of cells, taking it out of the cells it was in.
+        Nothing changes if the item is already in exactly that range of cells.
+        """
+
+        old_cell_range = self._item_cell_ranges.get(item)
+        if old_cell_range == cell_range:
+            return
+
+        if old_cell_range is not None:
+            self._remove_from_cells(item, old_cell_range)
+        else:
+            self._item_orders[item] = self._next_order
+            self._next_order += 1
+
+        self._item_cell_ranges[item] = cell_range
+        self._add_to_cells(item, cell_range)
+
+    def insert(self, item: Hashable, x: int | float, y: int | float, x_end: int | float, y_end: int | float) -> None:
+        """
+        Inserts the item with the given bounds, moving it if it is already present.
+        Nothing changes if the item still touches the same cells.
+        The end coordinates are exclusive.
+        """
+
+        self._place(item, self._cell_range(x, y, x_end, y_end))
+
+    def insert_rect(self, item: Hashable, rect: pygame.Rect) -> None:
+        """
+        Inserts the item with the bounds of the rectangle, moving it if it is already present.
+        """
+
+        # Called for every moving entity every frame, and they rarely change cells,
+        # so work out the cells here with integer division, rectangles always have integer coordinates
+        cell_size = self.cell_size
+
+        cell_x_min = rect.left // cell_size
+        cell_y_min = rect.top // cell_size
+        cell_x_max = (rect.right - 1) // cell_size
+        cell_y_max = (rect.bottom - 1) // cell_size
+
+        self._place(item, (cell_x_min, cell_y_min,
+                           cell_x_max if cell_x_max > cell_x_min else cell_x_min,
+                           cell_y_max if cell_y_max > cell_y_min else cell_y_min))
+
+    def remove(self, item: Hashable) -> None:
+        """
+        Removes the item, if present.
+        """
+
+        cell_range = self._item_cell_ranges.pop(item, None)
+        if cell_range is None:
+            return
+
+        del self._item_orders[item]
+        self._remove_from_cells(item, cell_range)
+
+    def move(self, item: Hashable, x: int | float, y: int | float, x_end: int | float, y_end: int | float) -> None:
+        """
+        Gives the item new bounds, inserting it if it is not present.
+        The same as `insert`.
+        """
+
+        self.insert(item, x, y, x_end, y_end)
+
+    def query(self, x: int | float, y: int | float, x_end: int | float, y_end: int | float) -> list[Hashable]:
+        """
+        Returns the items touching the cells that the given bounds touch, in the order they were first inserted.
+        The items are not guaranteed to touch the bounds themselves.
+        The end coordinates are exclusive.
+        """
+
+        cell_x_min, cell_y_min, cell_x_max, cell_y_max = self._cell_range(x, y, x_end, y_end)
+
+        items = set()
+        for cell_x in range(cell_x_min, cell_x_max + 1):
+            for cell_y in range(cell_y_min, cell_y_max + 1):
+                cell = self._cells.get((cell_x, cell_y))
+
+                if cell:
+                    items.update(cell)
+
+        self.candidates += len(items)
+
+        return sorted(items, key=self._item_orders.__getitem__)
+
+    def query_rect(self, rect: pygame.Rect) -> list[Hashable]:
+        """
+        Returns the items touching the cells that the rectangle touches.
+        """
+
+        return self.query(rect.left, rect.top, rect.right, rect.bottom)
+
+    def query_range(self, x: int | float, y: int | float, range_: int | float) -> list[Hashable]:
+        """
+        Returns the items touching the cells within the range of the position, in every direction.
+        """
+
+        return self.query(x - range_, y - range_, x + range_, y + range_)
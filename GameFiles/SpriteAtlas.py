@@ -0,0 +1,89 @@
+import pygame
+
+
+class SpriteAtlas:
+    PAGE_SIZE: int = 512
+    """The width and height of each atlas surface, sprites larger than this are given a page of their own."""
+
+    def __init__(self):
+        """
+        Packs many small sprites into a few large surfaces, the pages, in rows from the top left.
+        Each sprite is handed back as a subsurface of its page, which draws the same as the sprite it was made from.
+        The pages have per-pixel alpha, so opaque sprites are better left out, they would be blended pixel by pixel.
+        """
+
+        self.pages: list[pygame.Surface] = []
+
+        self._regions: dict[str, pygame.Surface] = {}
+        """The subsurface of each sprite key."""
+
+        self._page: pygame.Surface | None = None
+        """The page sprites are being packed into, None before the first sprite."""
+        self._x: int = 0
+        """Where the next sprite goes in the current row of the page."""
+        self._y: int = 0
+        """The top of the current row of the page."""
+        self._row_height: int = 0
+        """The height of the tallest sprite in the current row of the page."""
+
+    def __len__(self) -> int:
+        return len(self._regions)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._regions
+
+    def get(self, key: str) -> pygame.Surface:
+        if key not in self._regions:
+            raise ValueError(f"Sprite key {key} cannot be found in the atlas")
+
+        return self._regions[key]
+
+    def _new_page(self, width: int, height: int) -> pygame.Surface:
+        page = pygame.Surface((width, height), flags=pygame.SRCALPHA)
+        self.pages.append(page)
+
+        return page
+
+    def _place(self, width: int, height: int) -> tuple[pygame.Surface, int, int]:
+        """
+        Finds space for a sprite of the given size, starting a new row or page when it does not fit.
+        """
+
+        if width > self.PAGE_SIZE or height > self.PAGE_SIZE:
+            return self._new_page(width, height), 0, 0
+
+        if self._x + width > self.PAGE_SIZE:
+            self._x = 0
+            self._y += self._row_height
+            self._row_height = 0
+
+        if self._page is None or self._y + height > self.PAGE_SIZE:
+            self._page = self._new_page(self.PAGE_SIZE, self.PAGE_SIZE)
+            self._x = 0
+            self._y = 0
+            self._row_height = 0
+
+        x = self._x
+        self._x += width
+        self._row_height = max(self._row_height, height)
+
+        return self._page, x, self._y
+
+    def add(self, key: str, sprite: pygame.Surface) -> pygame.Surface:
+        """
+        Copies the sprite into the atlas and returns its subsurface.
+        Adding a key again with a sprite of the same size replaces the pixels of its subsurface in place.
+        """
+
+        region = self._regions.get(key)
+
+        if region is None or region.get_size() != sprite.get_size():
+            page, x, y = self._place(*sprite.get_size())
+            region = page.subsurface((x, y), sprite.get_size())
+            self._regions[key] = region
+
+        # Copy every channel as is, rather than blending with what is under it
+        region.fill((0, 0, 0, 0))
+        region.blit(sprite, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)
+
+        return region
@@ -0,0 +1,56 @@
+from typing import Iterable
+
+import pygame
+
+from .Camera import Camera
+
+_Blit = tuple[pygame.Surface, tuple[int, int]]
+
+
+class SpriteBatch:
+    USE_FBLITS: bool = hasattr(pygame.Surface, "fblits")
+    """If the batch is submitted with Surface.fblits, only pygame-ce has it, otherwise Surface.blits is used."""
+
+    def __init__(self):
+        """
+        Collects the sprites of one layer during a frame, then draws them all with a single call.
+        Sprites are drawn in the order they were added, so later sprites are drawn on top.
+        """
+
+        self.blit_sequence: list[_Blit] = []
+        """The sprites to draw and the window coordinates of their top left corners."""
+
+    def __len__(self) -> int:
+        return len(self.blit_sequence)
+
+    def add(self, sprite: pygame.Surface, rect: pygame.Rect, camera: Camera) -> None:
+        """
+        Adds the sprite at the rect, in world coordinates, if the camera can see it.
+        """
+
+        if not camera.can_see(rect):
+            return
+
+        self.blit_sequence.append((sprite, camera.coordinates_to_display_coordinates(rect.topleft)))
+
+    def extend(self, blit_sequence: Iterable[_Blit]) -> None:
+        """
+        Adds sprites that are already culled and in window coordinates.
+        """
+
+        self.blit_sequence.extend(blit_sequence)
+
+    def submit(self, surface: pygame.Surface) -> None:
+        """
+        Draws every sprite added since the last submit onto the surface, and empties the batch.
+        """
+
+        if not self.blit_sequence:
+            return
+
+        if self.USE_FBLITS:
+            surface.fblits(self.blit_sequence)
+        else:
+            surface.blits(self.blit_sequence, doreturn=False)
+
+        self.blit_sequence = []
@@ -6,6 +6,7 @@ from .Camera import Camera
 from .Helpers.CommonTypes import Number, Coordinates
 from .ParticleHandler import ParticleHandler
 from .Player import Player
+from .SpriteBatch import SpriteBatch
 
 
 class UpgradeBase(ABC):
@@ -39,10 +40,11 @@ class UpgradeBase(ABC):
 
         raise NotImplementedError
 
-    def draw(self, camera: Camera) -> None:
-        if not camera.can_see(self.rect):
-            return
+    def draw(self, camera: Camera, sprite_batch: SpriteBatch) -> None:
+        """
+        Adds the sprite to the batch, it is drawn when the batch is submitted.
+        """
 
-        camera.convert_rect_to_camera_coordinates(self.rect)
+        self.rect.center = self.position
 
-        camera.window.blit(self.sprite, self.rect)
+        sprite_batch.add(self.sprite, self.rect, camera)
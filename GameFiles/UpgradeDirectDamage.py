@@ -1,6 +1,3 @@
-import math
-import random
-
 import pygame
 
 from .Helpers.CommonTypes import Number
@@ -20,16 +17,4 @@ class UpgradeDirectDamage(UpgradeBase):
     def effect(self, particle_handler: ParticleHandler) -> None:
         PotionUnexploded.increase_damage()
 
-        for _ in range(50):
-            velocity = random.uniform(0.1, 2)
-            angle = random.uniform(0, 2 * math.pi)
-
-            vx = math.cos(angle) * velocity
-            vy = math.sin(angle) * velocity
-
-            particle_handler.create_particle(
-                "direct damage",
-                self.rect.centerx, self.rect.centery,
-                vx, vy,
-                random.randint(5, 30)
-            )
+        particle_handler.emit("direct damage", self.rect.centerx, self.rect.centery)
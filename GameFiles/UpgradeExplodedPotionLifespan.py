@@ -1,6 +1,3 @@
-import math
-import random
-
 import pygame
 
 from .Helpers.CommonTypes import Number
@@ -20,16 +17,4 @@ class UpgradeExplodedPotionLifespan(UpgradeBase):
     def effect(self, particle_handler: ParticleHandler) -> None:
         PotionExploded.increase_health()
 
-        for _ in range(50):
-            velocity = random.uniform(0.1, 2)
-            angle = random.uniform(0, 2 * math.pi)
-
-            vx = math.cos(angle) * velocity
-            vy = math.sin(angle) * velocity
-
-            particle_handler.create_particle(
-                "explode potion lifespan",
-                self.rect.centerx, self.rect.centery,
-                vx, vy,
-                random.randint(5, 30)
-            )
+        particle_handler.emit("explode potion lifespan", self.rect.centerx, self.rect.centery)
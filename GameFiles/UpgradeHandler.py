@@ -6,6 +6,8 @@ from .Map import Map
 from .MapData import MapData
 from .ParticleHandler import ParticleHandler
 from .Player import Player
+from .SpatialHash import SpatialHash
+from .SpriteBatch import SpriteBatch
 from .UpgradeBase import UpgradeBase
 from .UpgradeDirectDamage import UpgradeDirectDamage
 from .UpgradeExplodedPotionLifespan import UpgradeExplodedPotionLifespan
@@ -31,14 +33,21 @@ class UpgradeHandler:
     def __init__(self):
         self.upgrades: list[UpgradeBase] = []
 
+        self.upgrade_index: SpatialHash = SpatialHash(Map.TILE_SIZE)
+        """The upgrades indexed by the map tiles they touch, only upgrades near the player need updating."""
+
         self.most_recent_collected_upgrade: UpgradeBase | None = None
 
+        self.sprite_batch: SpriteBatch = SpriteBatch()
+        """The sprites of the upgrades, drawn together once every upgrade is updated."""
+
     def setup_upgrades_from(self, map_data: MapData, map_: Map) -> None:
         """
         Clears the current upgrades list and create new upgrades from the map data.
         """
 
         self.upgrades = []
+        self.upgrade_index.clear()
 
         for upgrade_key, tile_key, tile_offset in map_data.upgrades:
             if upgrade_key not in _UPGRADE_KEY_TO_CLASS:
@@ -52,12 +61,22 @@ class UpgradeHandler:
 
             self.upgrades.append(new_upgrade)
 
+            new_upgrade.rect.center = new_upgrade.position
+            self.upgrade_index.insert_rect(new_upgrade, new_upgrade.rect)
+
     def update_and_draw_upgrades(self, player: Player, particle_handler: ParticleHandler, camera: Camera) -> None:
+        # Upgrades never move, so only the ones near the player can be collected
+        nearby_upgrades = self.upgrade_index.query_rect(player.rect)
+
         upgrade: UpgradeBase
         for upgrade_index, upgrade in iter_list_reverse(self.upgrades):
-            upgrade.update(player, particle_handler)
-            upgrade.draw(camera)
+            if upgrade in nearby_upgrades:
+                upgrade.update(player, particle_handler)
+            upgrade.draw(camera, self.sprite_batch)
 
             if upgrade.used:
                 self.most_recent_collected_upgrade = upgrade
                 del self.upgrades[upgrade_index]
+                self.upgrade_index.remove(upgrade)
+
+        self.sprite_batch.submit(camera.window)
@@ -1,11 +1,15 @@
 from . import Helpers
 
 from .Camera import Camera
+from .SpatialHash import SpatialHash
+from .SpriteAtlas import SpriteAtlas
+from .SpriteBatch import SpriteBatch
 
 from .ParticleHandler import ParticleHandler
 
 from .MapData import MapData
 from .Map import Map
+from .MapGenerator import MapGenerator
 
 from .Entity import Entity
 
@@ -14,7 +18,11 @@ from .UpdatingLightSource import UpdatingLightSource
 from .ShrinkingLightSource import ShrinkingLightSource
 
 from .ShadowTile import ShadowTile
+from .LightStamp import LightStamp
+from .LightStencilCache import LightStencilCache
+from .LightVisibilityCache import LightVisibilityCache
 from .Shadows import Shadows
+from .LazyShadows import LazyShadows
 
 from .PotionUnexploded import PotionUnexploded
 from .PotionExploded import PotionExploded
@@ -30,6 +38,8 @@ from .UpgradeThrowVelocity import UpgradeThrowVelocity
 
 from .UpgradeHandler import UpgradeHandler
 
+from .SmokeAnimation import SmokeAnimation
+
 from .BasicEnemy import BasicEnemy
 from .EnemyStalker import EnemyStalker
 from .EnemyConsumer import EnemyConsumer